@@ -19,6 +19,8 @@ import sys
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from core.db_pool import connect as db_connect
+
 # Import existing components with error handling
 try:
     from core.claude_orchestrator import ClaudeNativeOrchestrator
@@ -28,8 +30,10 @@ except ImportError:
     orchestrator = None
 
 try:
-    from core.tmux_client import TMUXClient
+    from core.tmux_client import AsyncTMUXClient, TMUXClient
     tmux_client = TMUXClient()
+    # Handlers await tmux instead of blocking the event loop
+    async_tmux = AsyncTMUXClient()
 except ImportError:
     print("Warning: TMUXClient not available")
     class TMUXClient:
@@ -41,7 +45,13 @@ except ImportError:
             return False
         def get_output(self, session):
             return ""
+    class AsyncTMUXClient:
+        async def snapshot(self, sessions, lines=10, max_age=None):
+            return {session: None for session in sessions}
+        async def send_keys(self, session, keys):
+            return False
     tmux_client = TMUXClient()
+    async_tmux = AsyncTMUXClient()
 
 try:
     from task_queue.client import QueueClient
@@ -175,12 +185,8 @@ async def health():
 @app.get("/api/agents")
 async def get_agents():
     """List all available agents with their current status from database"""
-    import sqlite3
-
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get agents from database
@@ -192,8 +198,14 @@ async def get_agents():
         GROUP BY a.agent
         ''')
 
+        rows = cursor.fetchall()
+
+        # Liveness of every agent session from one (briefly cached) tmux call
+        session_names = [f"claude-{row[0]}" for row in rows]
+        live_sessions = await async_tmux.snapshot(session_names, lines=0)
+
         agents = []
-        for row in cursor.fetchall():
+        for row in rows:
             agent_id, status, last_seen, current_task, activity_count = row
 
             # Determine agent type and name based on ID
@@ -217,7 +229,7 @@ async def get_agents():
 
             # Check tmux session status
             session_name = f"claude-{agent_id}"
-            tmux_status = tmux_client.check_session(session_name) if hasattr(tmux_client, 'check_session') else False
+            tmux_status = live_sessions.get(session_name) is not None
 
             # Determine final status
             if tmux_status:
@@ -244,18 +256,20 @@ async def get_agents():
         print(f"Error getting agents: {e}")
         return []
 
+async def capture_session(session_name: str, lines: int):
+    """Recent output of a session, or None if it is not running"""
+    # Liveness and output from one (briefly cached) tmux call
+    return (await async_tmux.snapshot([session_name], lines=lines)).get(session_name)
+
 @app.get("/api/agents/{agent_id}")
 async def get_agent(agent_id: str):
     """Get detailed information about a specific agent"""
     session_name = f"claude-{agent_id}"
-    exists = tmux_client.check_session(session_name) if hasattr(tmux_client, 'check_session') else False
+    output = await capture_session(session_name, lines=50)
 
-    if not exists:
+    if output is None:
         raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
 
-    # Get recent output from agent
-    output = tmux_client.capture_pane(session_name, lines=50)
-
     return {
         "id": agent_id,
         "sessionId": session_name,
@@ -297,11 +311,11 @@ async def get_agent_status(agent_id: str):
     """Get real-time status of an agent"""
     session_name = f"claude-{agent_id}"
 
-    if not (tmux_client.check_session(session_name) if hasattr(tmux_client, 'check_session') else False):
+    output = await capture_session(session_name, lines=5)
+    if output is None:
         return {"status": "offline", "agentId": agent_id}
 
     # Check if agent is processing
-    output = tmux_client.capture_pane(session_name, lines=5)
     is_busy = "processing" in output.lower() or "executing" in output.lower()
 
     return {
@@ -391,11 +405,8 @@ async def add_task(task: Dict[str, Any]):
 @app.get("/api/queue/tasks")
 async def get_tasks():
     """List queued tasks"""
-    import sqlite3
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
         cursor.execute('''
             SELECT t.id, t.title, t.component as name, t.status, t.priority,
@@ -523,7 +534,6 @@ async def handle_workflow_execute(sid, data):
     workflow_id = data.get('workflowId')
 
     if workflow_id:
-        import sqlite3
         import json
 
         # Start workflow execution
@@ -531,9 +541,7 @@ async def handle_workflow_execute(sid, data):
 
         try:
             # Create task in database for workflow
-            # Use parent directory's database
-            db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-            conn = sqlite3.connect(db_path)
+            conn = db_connect()
             cursor = conn.cursor()
 
             # Get workflow details
@@ -617,13 +625,10 @@ async def get_inbox_messages(
     agent: Optional[str] = None
 ):
     """Get inbox messages from database with optional filters"""
-    import sqlite3
     import json
 
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Build query with filters
@@ -677,13 +682,10 @@ async def get_inbox_messages(
 @app.post("/api/inbox/messages")
 async def create_inbox_message(message: Dict[str, Any]):
     """Create a new inbox message in database"""
-    import sqlite3
     import json
 
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Extract metadata
@@ -741,12 +743,8 @@ async def create_inbox_message(message: Dict[str, Any]):
 @app.patch("/api/inbox/messages/{message_id}/read")
 async def mark_message_as_read(message_id: str):
     """Mark a message as read in database"""
-    import sqlite3
-
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -768,13 +766,10 @@ async def mark_message_as_read(message_id: str):
 @app.patch("/api/inbox/messages/{message_id}/archive")
 async def archive_message(message_id: str):
     """Archive a message in database"""
-    import sqlite3
     import json
 
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get current metadata
@@ -896,16 +891,14 @@ async def execute_task(task: dict):
         description = task.get("description", "")
         agents = task.get("agents", [])
 
-        # Send task to each selected agent
-        results = []
-        for agent_id in agents:
-            session_name = f"claude-{agent_id}"
-            if tmux_client.check_session(session_name):
-                # Send command to agent via tmux
-                tmux_client.send_keys(session_name, description)
-                results.append({"agent": agent_id, "status": "sent"})
-            else:
-                results.append({"agent": agent_id, "status": "offline"})
+        # Send task to every selected agent that is running, concurrently
+        sessions = {agent_id: f"claude-{agent_id}" for agent_id in agents}
+        live = await async_tmux.snapshot(list(sessions.values()), lines=0)
+        online = [agent_id for agent_id in agents if live.get(sessions[agent_id]) is not None]
+        await asyncio.gather(*(async_tmux.send_keys(sessions[agent_id], description)
+                               for agent_id in online))
+        results = [{"agent": agent_id, "status": "sent" if agent_id in online else "offline"}
+                   for agent_id in agents]
 
         return {
             "success": True,
@@ -920,15 +913,12 @@ async def execute_task(task: dict):
 @app.post("/api/langgraph/execute")
 async def execute_langgraph(request: dict):
     """Execute task via LangGraph"""
-    import sqlite3
     import json
     try:
         task = request.get("task", "")
 
         # Create real task in database
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Insert task
@@ -1036,12 +1026,9 @@ async def get_system_status():
 @app.get("/api/logs")
 async def get_logs(agent: str = None, level: str = None, limit: int = 100):
     """Get system logs"""
-    import sqlite3
     import json
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Build query based on filters
@@ -1128,12 +1115,9 @@ async def get_logs(agent: str = None, level: str = None, limit: int = 100):
 @app.get("/api/messages")
 async def get_messages(agent: str = None):
     """Get inter-agent messages"""
-    import sqlite3
     import json
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Query messages from database
@@ -1188,12 +1172,9 @@ async def get_messages(agent: str = None):
 @app.get("/api/tasks/pending")
 async def get_pending_tasks(agent: str = None):
     """Get pending tasks"""
-    import sqlite3
     import json
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Query pending tasks
@@ -1291,8 +1272,9 @@ async def send_terminal_command(agent_id: str, request: dict):
         session_name = f"claude-{agent_id}"
 
         # Send command via tmux if session exists
-        if tmux_client.check_session(session_name):
-            tmux_client.send_keys(session_name, command)
+        live = await async_tmux.snapshot([session_name], lines=0)
+        if live.get(session_name) is not None:
+            await async_tmux.send_keys(session_name, command)
             return {"status": "sent", "command": command}
         else:
             return {"status": "error", "message": "Agent session not found"}
@@ -1306,8 +1288,8 @@ async def get_terminal_output(agent_id: str):
         session_name = f"claude-{agent_id}"
 
         # Get output from tmux if session exists
-        if tmux_client.check_session(session_name):
-            output = tmux_client.get_output(session_name)
+        output = await capture_session(session_name, lines=100)
+        if output is not None:
             return {"output": output, "status": "active"}
         else:
             return {"output": "", "status": "inactive"}
@@ -1318,12 +1300,9 @@ async def get_terminal_output(agent_id: str):
 @app.get("/api/queue/tasks")
 async def get_queue_tasks():
     """Get all tasks in the queue"""
-    import sqlite3
     import json
     try:
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get all tasks that are in queue-related statuses
@@ -1404,7 +1383,6 @@ async def get_queue_status():
 @app.get("/api/queue/stats")
 async def get_queue_stats():
     """Get queue statistics"""
-    import sqlite3
     try:
         # First try to get real stats from queue client
         if hasattr(queue_client, 'get_stats'):
@@ -1420,9 +1398,7 @@ async def get_queue_stats():
             }
 
         # Get real stats from database
-        # Use parent directory's database
-        db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mcp_system.db')
-        conn = sqlite3.connect(db_path)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Count tasks by status
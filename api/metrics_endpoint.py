@@ -156,6 +156,15 @@ async def get_json_metrics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics/message-bus")
+async def get_message_bus_metrics():
+    """Get message bus queue depths, drops and handler latency"""
+    try:
+        return message_bus.get_metrics()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/metrics/{metric_name}")
 async def get_specific_metric(metric_name: str, time_range: int = 300):
     """Get specific metric data"""
@@ -18,6 +18,7 @@ from core.workflow_engine import get_workflow_engine
 from agents.agent_bridge import get_bridge_manager
 from config.settings import AGENT_SESSIONS
 from core.auth_manager import AuthManager
+from core.db_pool import connect as db_connect
 from enum import Enum
 
 # Simple UserRole enum
@@ -316,11 +317,10 @@ async def get_logs(
     offset: int = 0
 ):
     """Get system logs"""
-    import sqlite3
     import json
 
     try:
-        conn = sqlite3.connect('../mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Build query with filters
@@ -415,11 +415,10 @@ async def get_messages(
     offset: int = 0
 ):
     """Get system messages"""
-    import sqlite3
     import json
 
     try:
-        conn = sqlite3.connect('../mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Build query with filters
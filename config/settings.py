@@ -36,6 +36,13 @@ AUTH_DIR = PROJECT_ROOT / ".auth"
 AUTH_DB_PATH = AUTH_DIR / "auth.db"
 AUTH_SECRET_KEY = os.getenv("AUTH_SECRET_KEY", "change-this-in-production")
 
+# MCP state database, shared through core.db_pool
+MCP_DB_PATH = Path(os.getenv("MCP_DB_PATH", PROJECT_ROOT / "mcp_system.db"))
+SQLITE_TIMEOUT = float(os.getenv("SQLITE_TIMEOUT", "30"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # Bytes
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_CACHED_STATEMENTS = int(os.getenv("SQLITE_CACHED_STATEMENTS", "256"))
+
 # Logs
 LOG_DIR = PROJECT_ROOT / "logs"
 LOG_DIR.mkdir(exist_ok=True)
@@ -58,6 +65,20 @@ if not TMUX_BIN:
 # TMUX command delay (CRITICAL - DO NOT REDUCE)
 TMUX_COMMAND_DELAY = 0.1  # seconds
 
+# Route TMUXClient through one persistent `tmux -C` connection instead of a
+# subprocess per command (the delay above still applies)
+TMUX_CONTROL_MODE = os.getenv("TMUX_CONTROL_MODE", "false").lower() == "true"
+
+# send_command delivery: "delay" waits TMUX_COMMAND_DELAY before Enter, "ack"
+# waits until the pane echoes the text (retrying up to TMUX_ACK_ATTEMPTS times,
+# the first wait being TMUX_ACK_TIMEOUT seconds and doubling after each)
+TMUX_DELIVERY_MODE = os.getenv("TMUX_DELIVERY_MODE", "delay")
+TMUX_ACK_TIMEOUT = float(os.getenv("TMUX_ACK_TIMEOUT", "0.25"))
+TMUX_ACK_ATTEMPTS = int(os.getenv("TMUX_ACK_ATTEMPTS", "3"))
+
+# Seconds a bulk pane snapshot (liveness + recent output) is shared between callers
+TMUX_SNAPSHOT_TTL = float(os.getenv("TMUX_SNAPSHOT_TTL", "1.0"))
+
 # ============================================================================
 # AGENT CONFIGURATION
 # ============================================================================
@@ -108,6 +129,14 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
 REDIS_URL = os.getenv("REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}")
 
+# Comma-separated Redis URLs to shard DistributedQueue across (empty = single instance)
+REDIS_SHARD_URLS = [url.strip() for url in os.getenv("REDIS_SHARD_URLS", "").split(",") if url.strip()]
+
+# DistributedQueue backend: "redis" or "local" (in-process, single node)
+QUEUE_BACKEND = os.getenv("QUEUE_BACKEND", "redis")
+# Optional SQLite append log for the local backend
+QUEUE_LOG_PATH = os.getenv("QUEUE_LOG_PATH", "")
+
 # Queue names
 QUEUE_DEFAULT = "default"
 QUEUE_PRIORITY = "priority"
@@ -252,6 +281,7 @@ CONFIG = {
     "TMUX_BIN": TMUX_BIN,
     "SHARED_STATE_FILE": str(SHARED_STATE_FILE),
     "AUTH_DB_PATH": str(AUTH_DB_PATH),
+    "MCP_DB_PATH": str(MCP_DB_PATH),
     "REDIS_URL": REDIS_URL,
     "AGENT_SESSIONS": AGENT_SESSIONS,
     "AGENT_PORTS": AGENT_PORTS,
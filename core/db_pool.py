@@ -0,0 +1,143 @@
+"""
+Pooled SQLite access for mcp_system.db
+Connections are opened once per thread, tuned (WAL, synchronous=NORMAL, mmap,
+page cache) and reused, so each keeps its parsed schema and prepared statements
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import weakref
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config.settings import (
+    MCP_DB_PATH, SQLITE_TIMEOUT, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KB, SQLITE_CACHED_STATEMENTS
+)
+
+logger = logging.getLogger(__name__)
+
+# Idle connections kept per thread and database (nested users need more than one)
+MAX_IDLE_PER_THREAD = 4
+
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+    f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+    "PRAGMA temp_store=MEMORY",
+]
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection whose close() hands it back to the pool
+
+    Call sites keep the usual connect / commit / close pattern; like a real
+    close, returning a connection rolls back anything left uncommitted, and
+    the attributes callers commonly change are restored to their defaults.
+    """
+
+    def close(self):
+        _release(self)
+
+    def close_for_real(self):
+        sqlite3.Connection.close(self)
+
+
+_local = threading.local()
+_stats = Counter()
+_connections = weakref.WeakSet()
+_lock = threading.Lock()
+
+
+def _idle(path: str) -> List[PooledConnection]:
+    """This thread's idle connections to path"""
+    pools: Optional[Dict[str, List[PooledConnection]]] = getattr(_local, "pools", None)
+    if pools is None:
+        pools = _local.pools = {}
+    return pools.setdefault(path, [])
+
+
+def _open(path: str) -> PooledConnection:
+    conn = sqlite3.connect(path, timeout=SQLITE_TIMEOUT, factory=PooledConnection,
+                           cached_statements=SQLITE_CACHED_STATEMENTS, check_same_thread=False)
+    conn.pool_path = path
+    for pragma in PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.OperationalError as e:
+            # e.g. WAL on a read-only database; the connection still works
+            logger.debug(f"{pragma} failed on {path}: {e}")
+    with _lock:
+        _stats["opened"] += 1
+        _connections.add(conn)
+    return conn
+
+
+def _release(conn: PooledConnection):
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        # Reset after the rollback: changing isolation_level mid-transaction commits
+        conn.isolation_level = ""
+        conn.text_factory = str
+        conn.row_factory = None
+    except sqlite3.ProgrammingError:
+        return  # Already closed for real
+
+    idle = _idle(conn.pool_path)
+    if conn in idle:
+        return
+    if len(idle) < MAX_IDLE_PER_THREAD:
+        idle.append(conn)
+    else:
+        conn.close_for_real()
+
+
+def connect(db_path: Union[str, Path, None] = None) -> PooledConnection:
+    """
+    Get a connection to db_path (default MCP_DB_PATH) from this thread's pool
+
+    Use it like sqlite3.connect(): close() returns the connection instead of
+    closing it. Each checkout starts outside a transaction with the default
+    isolation_level, text_factory and row_factory.
+    """
+    path = str(db_path or MCP_DB_PATH)
+    if path != ":memory:":
+        path = os.path.abspath(path)
+    idle = _idle(path)
+    while idle:
+        conn = idle.pop()
+        try:
+            conn.in_transaction  # Raises once close_all() closed it
+        except sqlite3.ProgrammingError:
+            continue
+        with _lock:
+            _stats["reused"] += 1
+        return conn
+    return _open(path)
+
+
+def pool_stats() -> Dict[str, int]:
+    """Connections opened and checkouts served by a pooled connection"""
+    with _lock:
+        return {"opened": _stats["opened"], "reused": _stats["reused"],
+                "open": len(_connections)}
+
+
+def close_all():
+    """Close every pooled connection, in every thread"""
+    with _lock:
+        connections = list(_connections)
+    for conn in connections:
+        try:
+            conn.close_for_real()
+        except sqlite3.ProgrammingError:
+            pass
+    logger.info(f"🗄️ Closed {len(connections)} pooled SQLite connections")
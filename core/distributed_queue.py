@@ -6,15 +6,28 @@ import json
 import time
 import uuid
 import threading
-import heapq
 from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from enum import IntEnum
-import redis
 import logging
 from datetime import datetime, timedelta
 import pickle
 import hashlib
+import struct
+import bisect
+from collections import Counter, OrderedDict, defaultdict
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +74,30 @@ class Task:
     metadata: Dict[str, Any] = field(default_factory=dict)
     ttl: int = 86400  # Time to live in seconds
 
+    # payload is a property (defined below the class) over _payload; a task
+    # decoded by BinaryTaskCodec keeps the encoded bytes in _encoded_payload
+    # until payload is first read
+    def _get_payload(self) -> Dict[str, Any]:
+        if self._encoded_payload is not None:
+            self._payload = _unpack(*self._encoded_payload) or {}
+            self._encoded_payload = None
+        return self._payload
+
+    def _set_payload(self, payload: Dict[str, Any]):
+        self._payload = payload
+        self._encoded_payload = None
+
+    @property
+    def payload_decoded(self) -> bool:
+        return self._encoded_payload is None
+
+    def __setstate__(self, state: Dict):
+        # Tasks pickled before payload became a property store it directly
+        if 'payload' in state:
+            state['_payload'] = state.pop('payload')
+        state.setdefault('_encoded_payload', None)
+        self.__dict__.update(state)
+
     def __lt__(self, other):
         """For priority queue sorting"""
         return (self.priority, self.created_at) < (other.priority, other.created_at)
@@ -98,13 +135,395 @@ class Task:
         return task
 
 
+Task.payload = property(Task._get_payload, Task._set_payload)
+
+
+# ============================================================================
+# SERIALIZATION
+# ============================================================================
+
+class CodecError(Exception):
+    """Raised when a stored task cannot be encoded or decoded"""
+    pass
+
+
+TASK_SCHEMA_VERSION = 1
+BODY_JSON = 0
+BODY_MSGPACK = 1
+PICKLE_MARKER = 0x80  # First byte of pickle protocol 2+ data
+
+# version, body codec, priority, state, optional-field flags, max_retries,
+# retry_count, timeout, ttl, created_at, scheduled_at, started_at, completed_at
+# (DEQUEUE_SCRIPT reads timeout from bytes 10-13)
+_TASK_HEADER = struct.Struct("!BBBBBHHIIdddd")
+_LENGTH = struct.Struct("!I")
+_OPTIONAL_TIMES = ('scheduled_at', 'started_at', 'completed_at')
+
+
+def _pack(obj: Any, body_codec: int) -> bytes:
+    if body_codec == BODY_MSGPACK:
+        return msgpack.packb(obj, default=str, use_bin_type=True)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+def _unpack(data: bytes, body_codec: int) -> Any:
+    if body_codec == BODY_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise CodecError("Task was encoded with msgpack, which is not installed")
+        return msgpack.unpackb(data, raw=False)
+    if body_codec == BODY_JSON:
+        return json.loads(data)
+    raise CodecError(f"Unknown body codec {body_codec}")
+
+
+class TaskCodec:
+    """Serializes Task records stored in Redis"""
+
+    name = "base"
+
+    def encode(self, task: 'Task') -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> 'Task':
+        raise NotImplementedError
+
+
+class PickleTaskCodec(TaskCodec):
+    """Legacy pickle encoding (unsafe with untrusted Redis contents)"""
+
+    name = "pickle"
+
+    def encode(self, task: 'Task') -> bytes:
+        return pickle.dumps(task)
+
+    def decode(self, data: bytes) -> 'Task':
+        return pickle.loads(data)
+
+
+class BinaryTaskCodec(TaskCodec):
+    """
+    Compact, versioned task encoding
+
+    Layout: fixed struct header (schema version, body codec, numeric fields),
+    a length-prefixed msgpack/JSON list of the small variable fields, then the
+    payload bytes, which are decoded lazily.
+    """
+
+    name = "binary"
+
+    def __init__(self, lazy_payload: bool = True, legacy_pickle: bool = True):
+        self.body_codec = BODY_MSGPACK if MSGPACK_AVAILABLE else BODY_JSON
+        self.lazy_payload = lazy_payload
+        # Read records written before the codec existed; disable once migrated
+        self.legacy_pickle = legacy_pickle
+
+    def encode(self, task: 'Task') -> bytes:
+        flags = 0
+        times = []
+        for bit, attr in enumerate(_OPTIONAL_TIMES):
+            value = getattr(task, attr)
+            if value is not None:
+                flags |= 1 << bit
+            times.append(value or 0.0)
+
+        try:
+            header = _TASK_HEADER.pack(
+                TASK_SCHEMA_VERSION, self.body_codec, int(task.priority), int(task.state),
+                flags, task.max_retries, task.retry_count, int(task.timeout), int(task.ttl),
+                task.created_at, *times
+            )
+        except struct.error as e:
+            raise CodecError(f"Task {task.id} has out-of-range fields: {e}")
+
+        fields = _pack([task.id, task.name, task.agent, task.error, task.dependencies,
+                        task.metadata, task.result], self.body_codec)
+
+        # Untouched payloads keep their original bytes
+        encoded = task._encoded_payload
+        if encoded and encoded[1] == self.body_codec:
+            raw = encoded[0]
+        else:
+            raw = _pack(task.payload, self.body_codec)
+
+        return header + _LENGTH.pack(len(fields)) + fields + raw
+
+    def decode(self, data: bytes) -> 'Task':
+        if data[0] == PICKLE_MARKER:
+            if not self.legacy_pickle:
+                raise CodecError("Refusing to unpickle legacy task record")
+            return pickle.loads(data)
+
+        version = data[0]
+        if version != TASK_SCHEMA_VERSION:
+            raise CodecError(f"Unsupported task schema version {version}")
+
+        (_, body_codec, priority, state, flags, max_retries, retry_count, timeout, ttl,
+         created_at, scheduled_at, started_at, completed_at) = _TASK_HEADER.unpack_from(data)
+
+        offset = _TASK_HEADER.size
+        (fields_len,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        (task_id, name, agent, error, dependencies, metadata,
+         result) = _unpack(data[offset:offset + fields_len], body_codec)
+        raw_payload = data[offset + fields_len:]
+
+        times = [scheduled_at, started_at, completed_at]
+        for bit in range(len(times)):
+            if not flags & (1 << bit):
+                times[bit] = None
+
+        task = Task(
+            id=task_id, name=name, agent=agent,
+            priority=TaskPriority(priority), state=TaskState(state),
+            max_retries=max_retries, retry_count=retry_count, timeout=timeout,
+            created_at=created_at, scheduled_at=times[0], started_at=times[1],
+            completed_at=times[2], result=result, error=error,
+            dependencies=dependencies, metadata=metadata, ttl=ttl
+        )
+        if self.lazy_payload:
+            # Decoded into a plain dict when task.payload is first read
+            task._encoded_payload = (raw_payload, body_codec)
+        else:
+            task.payload = _unpack(raw_payload, body_codec) or {}
+        return task
+
+
+# Add tasks to their tenant queues; the first task of an idle tenant puts the
+# tenant on the agent's round-robin ring.
+# KEYS: queue lengths hash
+# ARGV: queue, signal, deficit and ring key prefixes, then groups of
+#       task id, agent, tenant, score
+ENQUEUE_SCRIPT = """
+local added = 0
+for i = 5, #ARGV, 4 do
+    local task_id, agent, tenant = ARGV[i], ARGV[i + 1], ARGV[i + 2]
+    local queue = ARGV[1] .. agent
+    if tenant ~= '' then
+        queue = queue .. ':' .. tenant
+    end
+    if redis.call('ZADD', queue, ARGV[i + 3], task_id) == 1 then
+        redis.call('HINCRBY', KEYS[1], agent, 1)
+        -- One token per queued task wakes exactly one blocked worker
+        redis.call('RPUSH', ARGV[2] .. agent, '1')
+        if redis.call('HSETNX', ARGV[3] .. agent, tenant, 0) == 1 then
+            redis.call('RPUSH', ARGV[4] .. agent, tenant)
+        end
+        added = added + 1
+    end
+end
+return added
+"""
+
+# Deficit round robin over an agent's tenants, then priority order within the
+# chosen tenant; pops the task and leases it atomically.
+# KEYS: tenant ring (list), deficits (hash), agent signal list,
+#       processing leases (zset), tenant weights (hash), queue lengths (hash)
+# ARGV: task key prefix, '1' if the caller already consumed a signal token,
+#       now, agent queue key, agent, task schema version, fallback timeout
+DEQUEUE_SCRIPT = """
+local function queue_key(tenant)
+    if tenant == '' then
+        return ARGV[4]
+    end
+    return ARGV[4] .. ':' .. tenant
+end
+
+-- Lease for the task's own timeout: binary records carry it as a uint32 at
+-- bytes 10-13; other records (legacy pickle) get the fallback
+local function lease_expiry(data)
+    if data and string.byte(data, 1) == tonumber(ARGV[6]) then
+        local b1, b2, b3, b4 = string.byte(data, 10, 13)
+        return tonumber(ARGV[3]) + ((b1 * 256 + b2) * 256 + b3) * 256 + b4
+    end
+    return tonumber(ARGV[3]) + tonumber(ARGV[7])
+end
+
+-- Tasks queued before fair scheduling sit in the default tenant queue
+if redis.call('LLEN', KEYS[1]) == 0 and redis.call('ZCARD', ARGV[4]) > 0 then
+    redis.call('HSETNX', KEYS[2], '', 0)
+    redis.call('RPUSH', KEYS[1], '')
+end
+
+for _ = 1, 1000 do
+    local tenant = redis.call('LINDEX', KEYS[1], 0)
+    if not tenant then
+        return nil
+    end
+
+    local queue = queue_key(tenant)
+    if redis.call('ZCARD', queue) == 0 then
+        redis.call('LPOP', KEYS[1])
+        redis.call('HDEL', KEYS[2], tenant)
+    else
+        local deficit = tonumber(redis.call('HGET', KEYS[2], tenant) or '0')
+        if deficit >= 1 then
+            local popped = redis.call('ZPOPMIN', queue)
+            if redis.call('ZCARD', queue) == 0 then
+                redis.call('LPOP', KEYS[1])
+                redis.call('HDEL', KEYS[2], tenant)
+            else
+                redis.call('HSET', KEYS[2], tenant, deficit - 1)
+            end
+            if ARGV[2] ~= '1' then
+                redis.call('LPOP', KEYS[3])
+            end
+            redis.call('HINCRBY', KEYS[6], ARGV[5], -1)
+            local data = redis.call('GET', ARGV[1] .. popped[1])
+            redis.call('ZADD', KEYS[4], lease_expiry(data), popped[1])
+            return {popped[1], data, tenant, popped[2]}
+        end
+
+        -- Out of credit: top up by the tenant's weight and go to the back
+        local weight = tonumber(redis.call('HGET', KEYS[5], tenant) or '1')
+        redis.call('HSET', KEYS[2], tenant, deficit + weight)
+        redis.call('RPUSH', KEYS[1], redis.call('LPOP', KEYS[1]))
+    end
+end
+return nil
+"""
+
+# Index a task under each dependency that has not completed yet.
+# KEYS: completed set, remaining-dependency hash
+# ARGV: task id, waiting-set key prefix, dependency ids...
+REGISTER_DEPENDENCIES_SCRIPT = """
+local remaining = 0
+for i = 3, #ARGV do
+    if redis.call('SISMEMBER', KEYS[1], ARGV[i]) == 0 then
+        redis.call('SADD', ARGV[2] .. ARGV[i], ARGV[1])
+        remaining = remaining + 1
+    end
+end
+if remaining > 0 then
+    redis.call('HSET', KEYS[2], ARGV[1], remaining)
+end
+return remaining
+"""
+
+# Add tasks to the delayed queue and wake a scheduler if one of them is now
+# the earliest entry.
+# KEYS: delayed queue (zset), scheduler signal list
+# ARGV: pairs of task id, due time
+SCHEDULE_SCRIPT = """
+local earliest = nil
+for i = 1, #ARGV, 2 do
+    local due = tonumber(ARGV[i + 1])
+    redis.call('ZADD', KEYS[1], due, ARGV[i])
+    if earliest == nil or due < earliest then
+        earliest = due
+    end
+end
+local head = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if earliest ~= nil and tonumber(head[2]) >= earliest then
+    redis.call('RPUSH', KEYS[2], '1')
+    redis.call('LTRIM', KEYS[2], -1, -1)
+end
+return 1
+"""
+
+# Claim up to ARGV[2] delayed tasks due by ARGV[1] and return their records.
+# KEYS: delayed queue (zset)
+# ARGV: now, batch size, task key prefix
+MOVE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+local out = {}
+for _, task_id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], task_id)
+    table.insert(out, task_id)
+    table.insert(out, redis.call('GET', ARGV[3] .. task_id) or '')
+end
+return out
+"""
+
+# Claim up to ARGV[2] leases that expired before ARGV[1]; removing them here
+# guarantees each expired task is reclaimed by exactly one monitor.
+# KEYS: processing leases (zset)
+RECLAIM_LEASES_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #expired > 0 then
+    redis.call('ZREM', KEYS[1], unpack(expired))
+end
+return expired
+"""
+
+# Decrement the counters of every task waiting on a completed dependency
+# and return the ids whose last dependency just completed.
+# KEYS: waiting set of the completed task, remaining-dependency hash
+RELEASE_DEPENDENTS_SCRIPT = """
+local ready = {}
+for _, task_id in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    if redis.call('HEXISTS', KEYS[2], task_id) == 1 then
+        if redis.call('HINCRBY', KEYS[2], task_id, -1) <= 0 then
+            redis.call('HDEL', KEYS[2], task_id)
+            table.insert(ready, task_id)
+        end
+    end
+end
+redis.call('DEL', KEYS[1])
+return ready
+"""
+
+
+# Queue score = priority * PRIORITY_BAND + enqueue time (ms)
+PRIORITY_BAND = 1e13
+DEFAULT_TENANT = "default"
+TENANT_FIELDS = ("tenant", "workflow_id", "submitted_by")
+MIN_TENANT_WEIGHT = 0.1
+RECLAIM_BATCH = 100  # Expired leases claimed per reclaim_expired() call
+
+
+def task_tenant(task: "Task", fields=TENANT_FIELDS) -> str:
+    """First tenant-naming metadata field of a task ('' for the default tenant)"""
+    for name in fields:
+        value = task.metadata.get(name)
+        if value:
+            return '' if value == DEFAULT_TENANT else str(value)
+    return ''
+
+
+def tenant_stats(metrics: Dict[str, float], weights: Dict[str, float]) -> Dict[str, Dict]:
+    """Per-tenant dequeue count, wait time and weight from flat tenant metrics"""
+    tenants = {}
+    for key, value in metrics.items():
+        tenant, _, field_name = key.rpartition(':')
+        tenants.setdefault(tenant, {'dequeued': 0, 'wait_ms_sum': 0.0})[field_name] = value
+
+    for tenant, stats in tenants.items():
+        stats['dequeued'] = int(stats['dequeued'])
+        stats['avg_wait_ms'] = stats['wait_ms_sum'] / stats['dequeued'] if stats['dequeued'] else 0.0
+        stats['weight'] = weights.get('' if tenant == DEFAULT_TENANT else tenant, 1.0)
+    return tenants
+
+
 class DistributedQueue:
     """
     Distributed task queue with Redis backend
+
+    Each agent has one sorted set per tenant, scored by (priority, enqueue
+    time). Dequeue picks the tenant by deficit round robin, weighted per
+    tenant, so one tenant's flood cannot starve the others; within a tenant
+    tasks still come out in priority order. A companion signal list holds one
+    token per queued task so idle workers can block in BLPOP instead of
+    polling.
+
+    Delayed tasks (retries, future scheduled_at) sit in DELAYED_QUEUE. The
+    scheduler sleeps in BLPOP on DELAYED_SIGNAL until the earliest one is due;
+    inserting a new earliest task pushes a token that wakes it early.
+
+    Dequeued tasks hold a lease in PROCESSING_SET, a sorted set scored by
+    lease expiry. Workers extend it with heartbeat(); the monitor reclaims
+    expired leases with one ZRANGEBYSCORE instead of loading every task.
+
+    Tasks with unmet dependencies are indexed under each dependency
+    (deps_waiting:<dep_id>) with a remaining counter in DEPS_REMAINING, so
+    completing a task only touches the tasks that actually wait on it.
     """
 
-    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=1):
-        self.redis = redis.StrictRedis(
+    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=1,
+                 redis_client=None, codec: TaskCodec = None, status_cache_ttl: float = 1.0):
+        if redis_client is None and not REDIS_AVAILABLE:
+            raise ImportError("redis is required for DistributedQueue; "
+                              "use core.local_queue.LocalTaskQueue for single-node setups")
+        self.redis = redis_client or redis.StrictRedis(
             host=redis_host,
             port=redis_port,
             db=redis_db,
@@ -115,15 +534,43 @@ class DistributedQueue:
         self.QUEUE_PREFIX = "queue:"
         self.TASK_PREFIX = "task:"
         self.AGENT_QUEUE_PREFIX = "agent_queue:"
+        self.AGENT_SIGNAL_PREFIX = "agent_signal:"
+        self.QUEUE_LENGTHS = "agent_queue_lengths"  # Hash: agent -> queued tasks
+        self.LEGACY_QUEUE_PREFIX = "legacy:"  # List queues being migrated
+        self.FAIR_RING_PREFIX = "fair_ring:"
+        self.FAIR_DEFICIT_PREFIX = "fair_deficit:"
+        self.TENANT_WEIGHTS = "tenant_weights"
+        self.TENANT_METRICS = "tenant_metrics"
         self.DELAYED_QUEUE = "delayed_queue"
-        self.PROCESSING_SET = "processing"
+        self.DELAYED_SIGNAL = "delayed_signal"
+        self.PROCESSING_SET = "processing"  # Sorted set: task id -> lease expiry
         self.COMPLETED_SET = "completed"
         self.FAILED_SET = "failed"
         self.METRICS_KEY = "queue_metrics"
-
-        # In-memory priority queues per agent
-        self.priority_queues: Dict[str, List[Task]] = {}
-        self.queue_locks: Dict[str, threading.Lock] = {}
+        self.DEPS_WAITING_PREFIX = "deps_waiting:"
+        self.DEPS_REMAINING = "deps_remaining"
+
+        self.codec = codec or BinaryTaskCodec()
+        self._enqueue_script = self.redis.register_script(ENQUEUE_SCRIPT)
+        self._dequeue_script = self.redis.register_script(DEQUEUE_SCRIPT)
+        self._register_deps_script = self.redis.register_script(REGISTER_DEPENDENCIES_SCRIPT)
+        self._release_deps_script = self.redis.register_script(RELEASE_DEPENDENTS_SCRIPT)
+        self._reclaim_script = self.redis.register_script(RECLAIM_LEASES_SCRIPT)
+        self._schedule_script = self.redis.register_script(SCHEDULE_SCRIPT)
+        self._move_due_script = self.redis.register_script(MOVE_DUE_SCRIPT)
+
+        # Scheduler: batch size per move and longest sleep between head checks
+        self.scheduler_batch_size = 500
+        self.scheduler_max_sleep = 5.0
+
+        # Metadata fields naming a task's tenant, first match wins
+        self.tenant_fields = TENANT_FIELDS
+
+        # Short-lived get_queue_status snapshot shared by concurrent callers
+        self.status_cache_ttl = status_cache_ttl
+        self._status_lock = threading.Lock()
+        self._status_snapshot = None
+        self._status_time = 0.0
 
         # Background threads
         self.scheduler_thread = None
@@ -139,6 +586,8 @@ class DistributedQueue:
             return
 
         self._running = True
+        self._migrate_processing_set()
+        self._migrate_agent_queues()
 
         # Start scheduler thread
         self.scheduler_thread = threading.Thread(target=self._scheduler_loop)
@@ -162,6 +611,8 @@ class DistributedQueue:
         self._running = False
 
         if self.scheduler_thread:
+            # Wake the scheduler out of its BLPOP
+            self.redis.rpush(self.DELAYED_SIGNAL, b'1')
             self.scheduler_thread.join(timeout=2)
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
@@ -172,141 +623,288 @@ class DistributedQueue:
 
     def submit(self, task: Task) -> str:
         """Submit task to queue"""
-        # Validate task
-        if not task.agent:
-            raise ValueError("Task must specify target agent")
-
-        # Set task ID if not set
-        if not task.id:
-            task.id = str(uuid.uuid4())
+        waiting = self._submit_batch([task])
+        if waiting:
+            logger.info(f"Task {task.id} delayed due to dependencies")
+        else:
+            logger.info(f"Task {task.id} submitted to {task.agent} with priority {task.priority.name}")
+        return task.id
 
-        # Check dependencies
-        if task.dependencies:
-            if not self._check_dependencies(task.dependencies):
+    def submit_many(self, tasks: List[Task]) -> List[str]:
+        """Submit a batch of tasks in a couple of pipelined round trips"""
+        tasks = list(tasks)
+        if not tasks:
+            return []
+
+        waiting = self._submit_batch(tasks)
+        logger.info(f"Submitted {len(tasks)} tasks ({waiting} waiting on dependencies)")
+        return [task.id for task in tasks]
+
+    def broadcast(self, name: str, payload: Dict[str, Any], agents: List[str],
+                  priority: TaskPriority = TaskPriority.NORMAL) -> Dict[str, str]:
+        """Submit one copy of a task to each agent, returns agent -> task id"""
+        tasks = [Task(name=name, agent=agent, payload=dict(payload), priority=priority)
+                 for agent in agents]
+        self.submit_many(tasks)
+        return {task.agent: task.id for task in tasks}
+
+    def _submit_batch(self, tasks: List[Task]) -> int:
+        """Validate, index dependencies and enqueue; returns the number left waiting"""
+        for task in tasks:
+            # Validate task
+            if not task.agent:
+                raise ValueError("Task must specify target agent")
+
+            # Set task ID if not set
+            if not task.id:
+                task.id = str(uuid.uuid4())
+
+        # Future scheduled_at: wait in the delayed queue, dependencies are
+        # checked when they come due
+        now = time.time()
+        delayed = [task for task in tasks if task.scheduled_at and task.scheduled_at > now]
+        if delayed:
+            for task in delayed:
                 task.state = TaskState.PENDING
-                # Store in delayed queue
-                self._add_to_delayed_queue(task)
-                logger.info(f"Task {task.id} delayed due to dependencies")
-                return task.id
+            self._schedule_tasks(delayed)
 
-        # Add to Redis
-        self._save_task(task)
-
-        # Add to agent's queue
-        self._enqueue_task(task)
+        delayed_ids = {task.id for task in delayed}
+        ready = [task for task in tasks if not task.dependencies and task.id not in delayed_ids]
+        blocked = [task for task in tasks if task.dependencies and task.id not in delayed_ids]
+        if blocked:
+            ready.extend(self._register_dependencies(blocked))
 
-        # Update metrics
-        self._increment_metric('tasks_submitted')
-        self._increment_metric(f'tasks_submitted_{task.priority.name.lower()}')
+        # Save tasks, add them to agents' queues and count them in one pipeline
+        submitted = Counter()
+        for task in ready:
+            submitted['tasks_submitted'] += 1
+            submitted[f'tasks_submitted_{task.priority.name.lower()}'] += 1
+        self._enqueue_tasks(ready, metrics=submitted)
 
-        logger.info(f"Task {task.id} submitted to {task.agent} with priority {task.priority.name}")
-        return task.id
+        return len(tasks) - len(ready)
 
     def get(self, agent: str, block: bool = True, timeout: int = 1) -> Optional[Task]:
-        """Get next task for agent"""
-        # Initialize queue if needed
-        if agent not in self.queue_locks:
-            self.queue_locks[agent] = threading.Lock()
-            self.priority_queues[agent] = []
-
-        start_time = time.time()
+        """Get next task for agent, blocking server-side until one is queued"""
+        signal_key = f"{self.AGENT_SIGNAL_PREFIX}{agent}"
+        deadline = time.time() + timeout if timeout else None
+        token_consumed = False
 
         while True:
-            # Try to get task from priority queue
-            with self.queue_locks[agent]:
-                if self.priority_queues[agent]:
-                    task = heapq.heappop(self.priority_queues[agent])
-
-                    # Update task state
-                    task.state = TaskState.RUNNING
-                    task.started_at = time.time()
+            task = self._pop_task(agent, token_consumed)
+            if task:
+                return task
 
-                    # Save to Redis
-                    self._save_task(task)
-
-                    # Add to processing set
-                    self.redis.sadd(self.PROCESSING_SET, task.id.encode())
-
-                    # Update metrics
-                    self._increment_metric('tasks_started')
-
-                    logger.debug(f"Task {task.id} dequeued for {agent}")
-                    return task
-
-            # Try to load from Redis
-            self._load_agent_queue(agent)
-
-            # Check if we should continue waiting
             if not block:
                 return None
 
-            if timeout and (time.time() - start_time) >= timeout:
+            wait = 0
+            if deadline is not None:
+                wait = deadline - time.time()
+                if wait <= 0:
+                    return None
+                wait = max(wait, 0.01)
+
+            # Wake as soon as a task is queued; no client-side polling
+            token_consumed = self.redis.blpop(signal_key, timeout=wait) is not None
+            if not token_consumed and deadline is not None:
                 return None
 
-            time.sleep(0.1)
+    def _pop_task(self, agent: str, token_consumed: bool = False) -> Optional[Task]:
+        """Pop by priority and mark processing in one round trip"""
+        result = self._dequeue_script(
+            keys=[f"{self.FAIR_RING_PREFIX}{agent}",
+                  f"{self.FAIR_DEFICIT_PREFIX}{agent}",
+                  f"{self.AGENT_SIGNAL_PREFIX}{agent}",
+                  self.PROCESSING_SET,
+                  self.TENANT_WEIGHTS,
+                  self.QUEUE_LENGTHS],
+            args=[self.TASK_PREFIX, '1' if token_consumed else '0', time.time(),
+                  f"{self.AGENT_QUEUE_PREFIX}{agent}", agent, TASK_SCHEMA_VERSION, Task.timeout]
+        )
+        if not result:
+            return None
+
+        task_id, task_data = result[0].decode(), result[1]
+        tenant = result[2].decode() or DEFAULT_TENANT
+        # Queue scores carry the enqueue time in ms below the priority band
+        wait_ms = max(time.time() * 1000 - float(result[3]) % PRIORITY_BAND, 0)
+        task = self._decode_task(task_id, task_data)
+        if not task:
+            # Task record expired or is unreadable; nothing to run
+            self.redis.zrem(self.PROCESSING_SET, task_id)
+            return None
+
+        # Update task state
+        task.state = TaskState.RUNNING
+        task.started_at = time.time()
+
+        pipe = self.redis.pipeline()
+        pipe.setex(f"{self.TASK_PREFIX}{task.id}", task.ttl, self.codec.encode(task))
+        if task_data[0] != TASK_SCHEMA_VERSION:
+            # The script could not read this record's timeout
+            pipe.zadd(self.PROCESSING_SET, {task.id: task.started_at + task.timeout})
+        pipe.hincrby(self.METRICS_KEY, 'tasks_started', 1)
+        pipe.hincrby(self.TENANT_METRICS, f"{tenant}:dequeued", 1)
+        pipe.hincrbyfloat(self.TENANT_METRICS, f"{tenant}:wait_ms_sum", wait_ms)
+        pipe.execute()
+
+        logger.debug(f"Task {task.id} dequeued for {agent} (tenant {tenant}, waited {wait_ms:.0f}ms)")
+        return task
 
     def complete(self, task_id: str, result: Any = None):
         """Mark task as completed"""
-        task = self._load_task(task_id)
-        if not task:
-            logger.error(f"Task {task_id} not found")
+        self.complete_many({task_id: result})
+
+    def complete_many(self, results: Dict[str, Any]):
+        """Mark a batch of tasks completed (task id -> result)"""
+        tasks = self._load_tasks(list(results))
+        if not tasks:
             return
 
-        task.state = TaskState.COMPLETED
-        task.completed_at = time.time()
-        task.result = result
+        now = time.time()
+        duration_sum = 0.0
+        pipe = self.redis.pipeline()
+        for task in tasks:
+            task.state = TaskState.COMPLETED
+            task.completed_at = now
+            task.result = results[task.id]
+            duration_sum += task.completed_at - task.started_at if task.started_at else 0
 
-        # Save task
-        self._save_task(task)
+            # Save task
+            pipe.setex(f"{self.TASK_PREFIX}{task.id}", task.ttl, self.codec.encode(task))
 
         # Move from processing to completed
-        self.redis.srem(self.PROCESSING_SET, task_id.encode())
-        self.redis.sadd(self.COMPLETED_SET, task_id.encode())
+        task_ids = [task.id for task in tasks]
+        pipe.zrem(self.PROCESSING_SET, *task_ids)
+        pipe.sadd(self.COMPLETED_SET, *task_ids)
 
         # Update metrics
-        self._increment_metric('tasks_completed')
-        duration = task.completed_at - task.started_at if task.started_at else 0
-        self._update_metric('task_duration_sum', duration)
+        pipe.hincrby(self.METRICS_KEY, 'tasks_completed', len(tasks))
+        pipe.hincrbyfloat(self.METRICS_KEY, 'task_duration_sum', duration_sum)
+
+        # Release tasks whose last dependency this batch completed
+        for task_id in task_ids:
+            self._release_deps_script(
+                keys=[f"{self.DEPS_WAITING_PREFIX}{task_id}", self.DEPS_REMAINING],
+                client=pipe
+            )
 
-        # Check dependent tasks
-        self._check_dependent_tasks(task_id)
+        released = pipe.execute()[-len(task_ids):]
+        self._schedule_ready([task_id for ready in released for task_id in ready])
 
-        logger.info(f"Task {task_id} completed in {duration:.2f}s")
+        if len(tasks) == 1:
+            logger.info(f"Task {tasks[0].id} completed in {duration_sum:.2f}s")
+        else:
+            logger.info(f"{len(tasks)} tasks completed")
 
     def fail(self, task_id: str, error: str):
         """Mark task as failed"""
-        task = self._load_task(task_id)
-        if not task:
-            logger.error(f"Task {task_id} not found")
-            return
-
-        task.error = error
-        task.retry_count += 1
+        self.fail_many({task_id: error})
 
-        # Check if should retry
-        if task.retry_count < task.max_retries:
-            task.state = TaskState.RETRYING
-            # Re-queue with delay
-            delay = min(2 ** task.retry_count, 60)  # Exponential backoff
-            task.scheduled_at = time.time() + delay
-            self._add_to_delayed_queue(task)
-
-            logger.info(f"Task {task_id} failed, retry {task.retry_count}/{task.max_retries} in {delay}s")
-        else:
-            task.state = TaskState.FAILED
-            task.completed_at = time.time()
+    def fail_many(self, errors: Dict[str, str]):
+        """Mark a batch of tasks failed (task id -> error), retrying where allowed"""
+        tasks = self._load_tasks(list(errors))
+        if not tasks:
+            return
 
+        failed = []
+        pipe = self.redis.pipeline()
+        for task in tasks:
+            task.error = errors[task.id]
+            task.retry_count += 1
+
+            # Check if should retry
+            if task.retry_count < task.max_retries:
+                task.state = TaskState.RETRYING
+                # Re-queue with delay
+                delay = min(2 ** task.retry_count, 60)  # Exponential backoff
+                task.scheduled_at = time.time() + delay
+                self._schedule_script(keys=[self.DELAYED_QUEUE, self.DELAYED_SIGNAL],
+                                      args=[task.id, task.scheduled_at], client=pipe)
+                pipe.zrem(self.PROCESSING_SET, task.id)
+
+                logger.info(f"Task {task.id} failed, retry {task.retry_count}/{task.max_retries} in {delay}s")
+            else:
+                task.state = TaskState.FAILED
+                task.completed_at = time.time()
+                failed.append(task.id)
+
+                logger.error(f"Task {task.id} failed permanently: {task.error}")
+
+            # Save task
+            pipe.setex(f"{self.TASK_PREFIX}{task.id}", task.ttl, self.codec.encode(task))
+
+        if failed:
             # Move to failed set
-            self.redis.srem(self.PROCESSING_SET, task_id.encode())
-            self.redis.sadd(self.FAILED_SET, task_id.encode())
+            pipe.zrem(self.PROCESSING_SET, *failed)
+            pipe.sadd(self.FAILED_SET, *failed)
 
             # Update metrics
-            self._increment_metric('tasks_failed')
-
-            logger.error(f"Task {task_id} failed permanently: {error}")
+            pipe.hincrby(self.METRICS_KEY, 'tasks_failed', len(failed))
+
+        pipe.execute()
+
+    def extend_lease(self, task_id: str, seconds: float) -> bool:
+        """Push a running task's lease expiry to now + seconds; False if not leased"""
+        return bool(self.redis.zadd(self.PROCESSING_SET, {task_id: time.time() + seconds},
+                                    xx=True, ch=True))
+
+    def heartbeat(self, task: Task, seconds: Optional[float] = None) -> bool:
+        """Keep a running task's lease alive (defaults to its timeout)"""
+        return self.extend_lease(task.id, seconds or task.timeout)
+
+    def reclaim_expired(self, limit: int = RECLAIM_BATCH) -> List[str]:
+        """Fail (and retry) tasks whose lease expired without a heartbeat"""
+        expired = self._reclaim_script(keys=[self.PROCESSING_SET], args=[time.time(), limit])
+        if not expired:
+            return []
+
+        task_ids = [task_id.decode() for task_id in expired]
+        for task_id in task_ids:
+            logger.warning(f"Task {task_id} lease expired")
+        self.fail_many({task_id: "Timeout: lease expired without heartbeat"
+                        for task_id in task_ids})
+        return task_ids
+
+    def _migrate_processing_set(self):
+        """Convert a pre-lease PROCESSING_SET (plain set) into a lease zset"""
+        if self.redis.type(self.PROCESSING_SET) != b'set':
+            return
 
-        # Save task
-        self._save_task(task)
+        members = self.redis.smembers(self.PROCESSING_SET)
+        expiry = time.time() + Task.timeout
+        pipe = self.redis.pipeline()
+        pipe.delete(self.PROCESSING_SET)
+        pipe.zadd(self.PROCESSING_SET, {member: expiry for member in members})
+        pipe.execute()
+        logger.info(f"Migrated {len(members)} in-flight tasks to leases")
+
+    def _migrate_agent_queues(self):
+        """Move tasks from pre-zset agent queues (lists of pickled tasks) into the zset queues"""
+        # Renamed aside first, so submits racing the migration get a fresh zset
+        for key in self.redis.scan_iter(match=f"{self.AGENT_QUEUE_PREFIX}*"):
+            if self.redis.type(key) == b'list':
+                self.redis.rename(key, f"{self.LEGACY_QUEUE_PREFIX}{key.decode()}")
+
+        migrated = 0
+        for key in self.redis.scan_iter(match=f"{self.LEGACY_QUEUE_PREFIX}*"):
+            tasks = []
+            for data in self.redis.lrange(key, 0, -1):
+                task = self._decode_task(key.decode(), data)
+                if not task:
+                    continue
+                # The task record is newer than the copy queued with it
+                task = self._load_task(task.id) or task
+                if task.state in (TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED):
+                    continue
+                task.state = TaskState.SCHEDULED
+                tasks.append(task)
+            self._enqueue_tasks(tasks)
+            self.redis.delete(key)
+            migrated += len(tasks)
+
+        if migrated:
+            logger.info(f"Migrated {migrated} queued tasks from list queues")
 
     def cancel(self, task_id: str):
         """Cancel a task"""
@@ -325,8 +923,15 @@ class DistributedQueue:
         # Save task
         self._save_task(task)
 
-        # Remove from queues
-        self.redis.srem(self.PROCESSING_SET, task_id.encode())
+        # Remove from queues (and the matching signal token if still queued)
+        self.redis.zrem(self.PROCESSING_SET, task_id)
+        self.redis.zrem(self.DELAYED_QUEUE, task_id)
+        self.redis.hdel(self.DEPS_REMAINING, task_id)
+        if self.redis.zrem(self._queue_key(task.agent, self.tenant_of(task)), task_id):
+            pipe = self.redis.pipeline()
+            pipe.lpop(f"{self.AGENT_SIGNAL_PREFIX}{task.agent}")
+            pipe.hincrby(self.QUEUE_LENGTHS, task.agent, -1)
+            pipe.execute()
 
         # Update metrics
         self._increment_metric('tasks_cancelled')
@@ -354,81 +959,120 @@ class DistributedQueue:
         }
 
     def get_queue_status(self) -> Dict:
-        """Get overall queue status"""
-        metrics = self._get_metrics()
-
-        # Count tasks by state
-        pending = self.redis.scard(self.DELAYED_QUEUE)
-        processing = self.redis.scard(self.PROCESSING_SET)
-        completed = self.redis.scard(self.COMPLETED_SET)
-        failed = self.redis.scard(self.FAILED_SET)
+        """Get overall queue status (cached for status_cache_ttl seconds)"""
+        with self._status_lock:
+            if self._status_snapshot and time.time() - self._status_time < self.status_cache_ttl:
+                return self._status_snapshot
+
+            self._status_snapshot = self._collect_queue_status()
+            self._status_time = time.time()
+            return self._status_snapshot
+
+    def _collect_queue_status(self) -> Dict:
+        """Gather counts with two pipelined round trips (no KEYS scan)"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(self.METRICS_KEY)
+        pipe.zcard(self.DELAYED_QUEUE)
+        pipe.hlen(self.DEPS_REMAINING)
+        pipe.zcard(self.PROCESSING_SET)
+        pipe.scard(self.COMPLETED_SET)
+        pipe.scard(self.FAILED_SET)
+        pipe.hgetall(self.QUEUE_LENGTHS)
+        pipe.hgetall(self.TENANT_METRICS)
+        pipe.hgetall(self.TENANT_WEIGHTS)
+        (metrics, delayed, waiting, processing, completed, failed,
+         lengths, tenant_metrics, weights) = pipe.execute()
 
         # Get queue sizes per agent
-        agent_queues = {}
-        for key in self.redis.keys(f"{self.AGENT_QUEUE_PREFIX}*"):
-            agent = key.decode().replace(self.AGENT_QUEUE_PREFIX, "")
-            agent_queues[agent] = self.redis.llen(key)
+        agent_queues = {agent.decode(): int(size) for agent, size in sorted(lengths.items())}
 
         return {
-            'pending': pending,
+            'pending': delayed + waiting,
+            'waiting_on_dependencies': waiting,
             'processing': processing,
             'completed': completed,
             'failed': failed,
             'agent_queues': agent_queues,
-            'metrics': metrics
+            'tenants': tenant_stats(
+                {k.decode(): float(v) for k, v in tenant_metrics.items()},
+                {k.decode(): float(v) for k, v in weights.items()}),
+            'metrics': {k.decode(): float(v) for k, v in metrics.items()}
         }
 
-    def _enqueue_task(self, task: Task):
-        """Add task to agent's queue"""
-        # Add to Redis list
-        queue_key = f"{self.AGENT_QUEUE_PREFIX}{task.agent}"
-        task_data = pickle.dumps(task)
-
-        # Add based on priority
-        if task.priority <= TaskPriority.HIGH:
-            # High priority: add to front
-            self.redis.lpush(queue_key, task_data)
-        else:
-            # Normal/Low priority: add to back
-            self.redis.rpush(queue_key, task_data)
+    def _agent_queue_sizes(self) -> Dict[str, int]:
+        """Queued tasks per agent from the maintained length counters"""
+        return {agent.decode(): int(size)
+                for agent, size in sorted(self.redis.hgetall(self.QUEUE_LENGTHS).items())}
 
-        # Also add to in-memory queue if agent is active
-        if task.agent in self.queue_locks:
-            with self.queue_locks[task.agent]:
-                heapq.heappush(self.priority_queues[task.agent], task)
+    def tenant_of(self, task: Task) -> str:
+        """Fair-scheduling tenant of a task ('' for the default tenant)"""
+        return task_tenant(task, self.tenant_fields)
 
-    def _load_agent_queue(self, agent: str):
-        """Load tasks from Redis to in-memory queue"""
-        queue_key = f"{self.AGENT_QUEUE_PREFIX}{agent}"
+    def set_tenant_weight(self, tenant: str, weight: float):
+        """Share of dequeues a tenant gets relative to others (default 1)"""
+        if weight < MIN_TENANT_WEIGHT:
+            raise ValueError(f"Tenant weight must be at least {MIN_TENANT_WEIGHT}")
+        self.redis.hset(self.TENANT_WEIGHTS, '' if tenant == DEFAULT_TENANT else tenant, weight)
 
-        # Load up to 10 tasks
-        tasks_data = self.redis.lrange(queue_key, 0, 9)
+    def _queue_key(self, agent: str, tenant: str) -> str:
+        base = f"{self.AGENT_QUEUE_PREFIX}{agent}"
+        return f"{base}:{tenant}" if tenant else base
 
-        if tasks_data:
-            with self.queue_locks[agent]:
-                for task_data in tasks_data:
-                    try:
-                        task = pickle.loads(task_data)
-                        heapq.heappush(self.priority_queues[agent], task)
-                    except Exception as e:
-                        logger.error(f"Failed to load task: {e}")
+    def _queue_score(self, task: Task) -> float:
+        """Sort key: priority first, then FIFO by enqueue time (ms)"""
+        return int(task.priority) * PRIORITY_BAND + int(time.time() * 1000)
+
+    def _enqueue_task(self, task: Task):
+        """Save task and add it to agent's queue"""
+        self._enqueue_tasks([task])
+
+    def _enqueue_tasks(self, tasks: List[Task], metrics: Optional[Dict[str, int]] = None):
+        """Save tasks, add them to their agents' queues and bump metrics in one pipeline"""
+        if not tasks and not metrics:
+            return
 
-                # Remove loaded tasks from Redis
-                self.redis.ltrim(queue_key, len(tasks_data), -1)
+        pipe = self.redis.pipeline()
+        args = [self.AGENT_QUEUE_PREFIX, self.AGENT_SIGNAL_PREFIX,
+                self.FAIR_DEFICIT_PREFIX, self.FAIR_RING_PREFIX]
+        for task in tasks:
+            pipe.setex(f"{self.TASK_PREFIX}{task.id}", task.ttl, self.codec.encode(task))
+            args.extend([task.id, task.agent, self.tenant_of(task), self._queue_score(task)])
+        if tasks:
+            self._enqueue_script(keys=[self.QUEUE_LENGTHS], args=args, client=pipe)
+        for key, value in (metrics or {}).items():
+            pipe.hincrby(self.METRICS_KEY, key, value)
+        pipe.execute()
 
     def _save_task(self, task: Task):
         """Save task to Redis"""
         key = f"{self.TASK_PREFIX}{task.id}"
-        self.redis.setex(key, task.ttl, pickle.dumps(task))
+        self.redis.setex(key, task.ttl, self.codec.encode(task))
 
     def _load_task(self, task_id: str) -> Optional[Task]:
         """Load task from Redis"""
         key = f"{self.TASK_PREFIX}{task_id}"
-        task_data = self.redis.get(key)
-
+        return self._decode_task(task_id, self.redis.get(key))
+
+    def _load_tasks(self, task_ids: List[str]) -> List[Task]:
+        """Load several tasks with one MGET, skipping missing ones"""
+        if not task_ids:
+            return []
+
+        records = self.redis.mget([f"{self.TASK_PREFIX}{task_id}" for task_id in task_ids])
+        tasks = []
+        for task_id, data in zip(task_ids, records):
+            task = self._decode_task(task_id, data)
+            if task:
+                tasks.append(task)
+            else:
+                logger.error(f"Task {task_id} not found")
+        return tasks
+
+    def _decode_task(self, task_id: str, task_data: Optional[bytes]) -> Optional[Task]:
+        """Deserialize a stored task"""
         if task_data:
             try:
-                return pickle.loads(task_data)
+                return self.codec.decode(task_data)
             except Exception as e:
                 logger.error(f"Failed to load task {task_id}: {e}")
 
@@ -436,90 +1080,133 @@ class DistributedQueue:
 
     def _add_to_delayed_queue(self, task: Task):
         """Add task to delayed queue"""
-        scheduled_time = task.scheduled_at or time.time()
-        self.redis.zadd(self.DELAYED_QUEUE, {task.id: scheduled_time})
-        self._save_task(task)
+        task.scheduled_at = task.scheduled_at or time.time()
+        self._schedule_tasks([task])
+
+    def _schedule_tasks(self, tasks: List[Task]):
+        """Save tasks and add them to the delayed queue in one pipeline"""
+        pipe = self.redis.pipeline()
+        args = []
+        for task in tasks:
+            pipe.setex(f"{self.TASK_PREFIX}{task.id}", task.ttl, self.codec.encode(task))
+            args.extend([task.id, task.scheduled_at])
+        self._schedule_script(keys=[self.DELAYED_QUEUE, self.DELAYED_SIGNAL], args=args, client=pipe)
+        pipe.execute()
 
     def _check_dependencies(self, dependencies: List[str]) -> bool:
         """Check if all dependencies are completed"""
+        pipe = self.redis.pipeline()
         for dep_id in dependencies:
-            dep_task = self._load_task(dep_id)
-            if not dep_task or dep_task.state != TaskState.COMPLETED:
-                return False
-        return True
-
-    def _check_dependent_tasks(self, completed_task_id: str):
-        """Check and schedule tasks dependent on completed task"""
-        # Get all tasks in delayed queue
-        delayed_tasks = self.redis.zrange(self.DELAYED_QUEUE, 0, -1)
-
-        for task_id_bytes in delayed_tasks:
-            task_id = task_id_bytes.decode()
-            task = self._load_task(task_id)
-
-            if task and completed_task_id in task.dependencies:
-                # Check if all dependencies are now satisfied
-                if self._check_dependencies(task.dependencies):
-                    # Remove from delayed queue
-                    self.redis.zrem(self.DELAYED_QUEUE, task_id)
-
-                    # Schedule task
-                    task.state = TaskState.SCHEDULED
-                    self._enqueue_task(task)
-
-                    logger.info(f"Task {task_id} scheduled after dependency {completed_task_id} completed")
+            pipe.sismember(self.COMPLETED_SET, dep_id)
+        return all(pipe.execute())
+
+    def _register_dependencies(self, tasks: List[Task]) -> List[Task]:
+        """Index tasks under their unmet dependencies; returns the ones already ready"""
+        pipe = self.redis.pipeline()
+        for task in tasks:
+            task.state = TaskState.PENDING
+            # Save first so a dependency completing right after registration
+            # always finds the task record
+            pipe.setex(f"{self.TASK_PREFIX}{task.id}", task.ttl, self.codec.encode(task))
+            self._register_deps_script(
+                keys=[self.COMPLETED_SET, self.DEPS_REMAINING],
+                args=[task.id, self.DEPS_WAITING_PREFIX, *dict.fromkeys(task.dependencies)],
+                client=pipe
+            )
+        remaining = pipe.execute()[1::2]
+
+        ready = []
+        for task, count in zip(tasks, remaining):
+            if not count:
+                task.state = TaskState.SCHEDULED
+                ready.append(task)
+
+        waiting = len(tasks) - len(ready)
+        if waiting:
+            self._increment_metric('tasks_waiting', waiting)
+        return ready
+
+    def _schedule_ready(self, task_ids: List[bytes]) -> List[str]:
+        """Enqueue tasks released from the dependency index"""
+        if not task_ids:
+            return []
+
+        ready = []
+        for task in self._load_tasks([task_id.decode() for task_id in task_ids]):
+            if task.state == TaskState.PENDING:
+                task.state = TaskState.SCHEDULED
+                ready.append(task)
+
+        if ready:
+            self._enqueue_tasks(ready)
+            logger.info(f"{len(ready)} task(s) scheduled after their dependencies completed")
+
+        return [task.id for task in ready]
 
     def _scheduler_loop(self):
-        """Background thread for scheduling delayed tasks"""
+        """Background thread moving due tasks, sleeping until the next due time"""
         while self._running:
             try:
-                # Get tasks ready to be scheduled
-                now = time.time()
-                ready_tasks = self.redis.zrangebyscore(self.DELAYED_QUEUE, 0, now)
-
-                for task_id_bytes in ready_tasks:
-                    task_id = task_id_bytes.decode()
-                    task = self._load_task(task_id)
-
-                    if task:
-                        # Remove from delayed queue
-                        self.redis.zrem(self.DELAYED_QUEUE, task_id)
+                # Move everything already due, one batch per round trip
+                while self._move_due_tasks() == self.scheduler_batch_size:
+                    pass
 
-                        # Check dependencies
-                        if not task.dependencies or self._check_dependencies(task.dependencies):
-                            task.state = TaskState.SCHEDULED
-                            self._enqueue_task(task)
-                            logger.debug(f"Scheduled task {task_id}")
+                head = self.redis.zrange(self.DELAYED_QUEUE, 0, 0, withscores=True)
+                wait = self.scheduler_max_sleep
+                if head:
+                    wait = min(max(head[0][1] - time.time(), 0.001), wait)
 
-                time.sleep(1)
+                # An earlier insert (or stop) pushes a token and wakes us early
+                self.redis.blpop(self.DELAYED_SIGNAL, timeout=wait)
 
             except Exception as e:
                 logger.error(f"Scheduler error: {e}")
                 time.sleep(5)
 
-    def _monitor_loop(self):
-        """Background thread for monitoring tasks"""
-        while self._running:
-            try:
-                # Check for timed out tasks
-                processing = self.redis.smembers(self.PROCESSING_SET)
+    def _move_due_tasks(self, now: Optional[float] = None) -> int:
+        """Move one batch of due delayed tasks to their queues; returns tasks claimed"""
+        claimed = self._move_due_script(
+            keys=[self.DELAYED_QUEUE],
+            args=[now or time.time(), self.scheduler_batch_size, self.TASK_PREFIX]
+        )
 
-                for task_id_bytes in processing:
-                    task_id = task_id_bytes.decode()
-                    task = self._load_task(task_id)
+        ready, blocked = [], []
+        for task_id, data in zip(claimed[::2], claimed[1::2]):
+            task = self._decode_task(task_id.decode(), data)
+            if not task or task.state == TaskState.CANCELLED:
+                continue
 
-                    if task and task.started_at:
-                        elapsed = time.time() - task.started_at
+            # Never-run tasks with unmet dependencies wait in the
+            # dependency index; retries already had theirs met
+            if task.state == TaskState.PENDING and task.dependencies:
+                blocked.append(task)
+            else:
+                task.state = TaskState.SCHEDULED
+                ready.append(task)
 
-                        if elapsed > task.timeout:
-                            # Task timed out
-                            logger.warning(f"Task {task_id} timed out after {elapsed:.2f}s")
-                            self.fail(task_id, f"Timeout after {task.timeout}s")
+        if blocked:
+            ready.extend(self._register_dependencies(blocked))
+        self._enqueue_tasks(ready)
+
+        if ready:
+            logger.debug(f"Scheduled {len(ready)} delayed tasks")
+        return len(claimed) // 2
+
+    def _monitor_loop(self):
+        """Background thread reclaiming expired leases"""
+        last_metrics = 0.0
+        while self._running:
+            try:
+                # Claim expired leases in batches until none are left
+                while len(self.reclaim_expired(RECLAIM_BATCH)) == RECLAIM_BATCH:
+                    pass
 
                 # Update queue metrics
-                self._update_queue_metrics()
+                if time.time() - last_metrics >= 10:
+                    self._update_queue_metrics()
+                    last_metrics = time.time()
 
-                time.sleep(10)
+                time.sleep(1)
 
             except Exception as e:
                 logger.error(f"Monitor error: {e}")
@@ -579,19 +1266,22 @@ class DistributedQueue:
 
     def _update_queue_metrics(self):
         """Update queue size metrics"""
-        for key in self.redis.keys(f"{self.AGENT_QUEUE_PREFIX}*"):
-            agent = key.decode().replace(self.AGENT_QUEUE_PREFIX, "")
-            queue_size = self.redis.llen(key)
-            self.redis.hset(self.METRICS_KEY, f"queue_size_{agent}", queue_size)
+        sizes = self._agent_queue_sizes()
+        if sizes:
+            self.redis.hset(self.METRICS_KEY,
+                            mapping={f"queue_size_{agent}": size for agent, size in sizes.items()})
 
 
 class TaskWorker:
     """Worker for processing tasks from queue"""
 
-    def __init__(self, agent_id: str, queue: DistributedQueue, handler: Callable[[Task], Any]):
+    def __init__(self, agent_id: str, queue: DistributedQueue, handler: Callable[[Task], Any],
+                 heartbeat_interval: Optional[float] = None):
         self.agent_id = agent_id
         self.queue = queue
         self.handler = handler
+        # Defaults to a third of each task's timeout
+        self.heartbeat_interval = heartbeat_interval
         self._running = False
         self._thread = None
 
@@ -630,7 +1320,7 @@ class TaskWorker:
 
                     try:
                         # Process task
-                        result = self.handler(task)
+                        result = self._run_with_heartbeat(task)
 
                         # Mark as completed
                         self.queue.complete(task.id, result)
@@ -643,6 +1333,441 @@ class TaskWorker:
                 logger.error(f"Worker {self.agent_id} error: {e}")
                 time.sleep(1)
 
+    def _run_with_heartbeat(self, task: Task) -> Any:
+        """Run the handler while a side thread keeps the task's lease alive"""
+        interval = self.heartbeat_interval or max(task.timeout / 3, 1)
+        done = threading.Event()
+
+        def beat():
+            while not done.wait(interval):
+                if not self.queue.heartbeat(task):
+                    return
+
+        beater = threading.Thread(target=beat, daemon=True)
+        beater.start()
+        try:
+            return self.handler(task)
+        finally:
+            done.set()
+
+
+# ============================================================================
+# SHARDING
+# ============================================================================
+
+# Index a waiter under dependencies owned by this shard.
+# KEYS: completed-dependency zset
+# ARGV: waiter id, waiting-set key prefix, dependency ids...
+# Returns how many of the dependencies had already completed.
+SHARD_INDEX_WAITER_SCRIPT = """
+local done = 0
+for i = 3, #ARGV do
+    if redis.call('ZSCORE', KEYS[1], ARGV[i]) then
+        done = done + 1
+    else
+        redis.call('SADD', ARGV[2] .. ARGV[i], ARGV[1])
+    end
+end
+return done
+"""
+
+# Record completed dependencies and pop everything waiting on them.
+# KEYS: completed-dependency zset
+# ARGV: waiting-set key prefix, completion time, retention (s), dependency ids...
+SHARD_COMPLETE_DEPS_SCRIPT = """
+local waiters = {}
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2] - ARGV[3])
+for i = 4, #ARGV do
+    redis.call('ZADD', KEYS[1], ARGV[2], ARGV[i])
+    local key = ARGV[1] .. ARGV[i]
+    for _, waiter in ipairs(redis.call('SMEMBERS', key)) do
+        table.insert(waiters, waiter)
+    end
+    redis.call('DEL', key)
+end
+return waiters
+"""
+
+# Decrement remaining-dependency counters; returns ids that reached zero.
+# KEYS: remaining-dependency hash
+# ARGV: pairs of task id, decrement
+SHARD_DECREMENT_SCRIPT = """
+local ready = {}
+for i = 1, #ARGV, 2 do
+    if redis.call('HEXISTS', KEYS[1], ARGV[i]) == 1 then
+        if redis.call('HINCRBY', KEYS[1], ARGV[i], -tonumber(ARGV[i + 1])) <= 0 then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+            table.insert(ready, ARGV[i])
+        end
+    end
+end
+return ready
+"""
+
+
+class ConsistentHashRing:
+    """Consistent hash ring mapping keys to shard indexes"""
+
+    def __init__(self, shards: int, replicas: int = 64):
+        self._ring = sorted(
+            (self._hash(f"{shard}:{replica}"), shard)
+            for shard in range(shards) for replica in range(replicas)
+        )
+        self._hashes = [h for h, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+    def get(self, key: str) -> int:
+        """Shard index owning key"""
+        i = bisect.bisect(self._hashes, self._hash(key)) % len(self._ring)
+        return self._ring[i][1]
+
+
+class ShardedDistributedQueue:
+    """
+    DistributedQueue partitioned across several Redis instances
+
+    Agent queues and their task records live on the shard that owns the
+    agent name, so dequeue stays a single-shard script. Everything else is
+    keyed by id: a task's location record lives on the shard owning its id,
+    and dependency waiters are indexed on the shard owning the dependency
+    id, so releasing dependents never needs a lookup.
+    """
+
+    LOCATION_PREFIX = "task_shard:"
+    WAITING_PREFIX = "shard_deps_waiting:"
+    DEPS_DONE = "shard_deps_done"
+    DEPS_DONE_RETENTION = 86400
+
+    def __init__(self, redis_clients: List, codec: TaskCodec = None, replicas: int = 64,
+                 status_cache_ttl: float = 1.0, location_cache_size: int = 100000):
+        if not redis_clients:
+            raise ValueError("ShardedDistributedQueue needs at least one Redis client")
+
+        codec = codec or BinaryTaskCodec()
+        self.shards = [DistributedQueue(redis_client=client, codec=codec, status_cache_ttl=0)
+                       for client in redis_clients]
+        self.ring = ConsistentHashRing(len(self.shards), replicas)
+
+        self._index_scripts = [s.redis.register_script(SHARD_INDEX_WAITER_SCRIPT) for s in self.shards]
+        self._complete_scripts = [s.redis.register_script(SHARD_COMPLETE_DEPS_SCRIPT) for s in self.shards]
+        self._decrement_scripts = [s.redis.register_script(SHARD_DECREMENT_SCRIPT) for s in self.shards]
+
+        # task id -> home shard, filled by submit/get so workers rarely look up
+        self._locations = OrderedDict()
+        self._location_cache_size = location_cache_size
+        self._locations_lock = threading.Lock()
+
+        self.status_cache_ttl = status_cache_ttl
+        self._status_lock = threading.Lock()
+        self._status_snapshot = None
+        self._status_time = 0.0
+
+        logger.info(f"ShardedDistributedQueue initialized with {len(self.shards)} shards")
+
+    @classmethod
+    def from_urls(cls, urls: List[str], **kwargs) -> 'ShardedDistributedQueue':
+        """Build from redis:// URLs"""
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis is required for ShardedDistributedQueue; "
+                              "use core.local_queue.LocalTaskQueue for single-node setups")
+        return cls([redis.StrictRedis.from_url(url) for url in urls], **kwargs)
+
+    def start(self):
+        """Start every shard's background threads"""
+        for shard in self.shards:
+            shard.start()
+
+    def stop(self):
+        """Stop every shard's background threads"""
+        for shard in self.shards:
+            shard.stop()
+
+    # ---------------------------------------------------------------- routing
+
+    def shard_index_for_agent(self, agent: str) -> int:
+        return self.ring.get(f"agent:{agent}")
+
+    def shard_for_agent(self, agent: str) -> DistributedQueue:
+        return self.shards[self.shard_index_for_agent(agent)]
+
+    def _id_shard(self, task_id: str) -> int:
+        return self.ring.get(f"id:{task_id}")
+
+    def _remember(self, task_id: str, home: int):
+        with self._locations_lock:
+            self._locations[task_id] = home
+            self._locations.move_to_end(task_id)
+            if len(self._locations) > self._location_cache_size:
+                self._locations.popitem(last=False)
+
+    def _locate(self, task_ids: List[str]) -> Dict[int, List[str]]:
+        """Group task ids by home shard, looking up uncached ones per id shard"""
+        by_home = defaultdict(list)
+        missing = defaultdict(list)
+        with self._locations_lock:
+            for task_id in task_ids:
+                home = self._locations.get(task_id)
+                if home is None:
+                    missing[self._id_shard(task_id)].append(task_id)
+                else:
+                    by_home[home].append(task_id)
+
+        for index, ids in missing.items():
+            keys = [f"{self.LOCATION_PREFIX}{task_id}" for task_id in ids]
+            for task_id, home in zip(ids, self.shards[index].redis.mget(keys)):
+                if home is None:
+                    logger.error(f"Task {task_id} not found")
+                    continue
+                self._remember(task_id, int(home))
+                by_home[int(home)].append(task_id)
+
+        return by_home
+
+    # ------------------------------------------------------------ submission
+
+    def submit(self, task: Task) -> str:
+        """Submit task to its agent's shard"""
+        self.submit_many([task])
+        return task.id
+
+    def submit_many(self, tasks: List[Task]) -> List[str]:
+        """Submit a batch; one pipeline per shard plus dependency indexing"""
+        tasks = list(tasks)
+        for task in tasks:
+            if not task.agent:
+                raise ValueError("Task must specify target agent")
+            if not task.id:
+                task.id = str(uuid.uuid4())
+
+        # Location records, grouped by the shard owning each id
+        locations = defaultdict(dict)
+        for task in tasks:
+            home = self.shard_index_for_agent(task.agent)
+            self._remember(task.id, home)
+            locations[self._id_shard(task.id)][task.id] = (home, task.ttl)
+        for index, entries in locations.items():
+            pipe = self.shards[index].redis.pipeline(transaction=False)
+            for task_id, (home, ttl) in entries.items():
+                pipe.setex(f"{self.LOCATION_PREFIX}{task_id}", ttl, home)
+            pipe.execute()
+
+        ready = defaultdict(list)
+        blocked = []
+        for task in tasks:
+            if task.dependencies:
+                blocked.append(task)
+            else:
+                ready[self.shard_index_for_agent(task.agent)].append(task)
+
+        for task in self._register_dependencies(blocked):
+            ready[self.shard_index_for_agent(task.agent)].append(task)
+
+        for index, shard_tasks in ready.items():
+            shard = self.shards[index]
+            submitted = Counter()
+            for task in shard_tasks:
+                task.state = TaskState.SCHEDULED
+                submitted['tasks_submitted'] += 1
+                submitted[f'tasks_submitted_{task.priority.name.lower()}'] += 1
+            self._enqueue_on(shard, shard_tasks, metrics=submitted)
+
+        return [task.id for task in tasks]
+
+    def broadcast(self, name: str, payload: Dict[str, Any], agents: List[str],
+                  priority: TaskPriority = TaskPriority.NORMAL) -> Dict[str, str]:
+        """Submit one copy of a task to each agent, returns agent -> task id"""
+        tasks = [Task(name=name, agent=agent, payload=dict(payload), priority=priority)
+                 for agent in agents]
+        self.submit_many(tasks)
+        return {task.agent: task.id for task in tasks}
+
+    def _register_dependencies(self, tasks: List[Task]) -> List[Task]:
+        """Park tasks until their (possibly remote) dependencies complete"""
+        if not tasks:
+            return []
+
+        # Counter first, on the shard owning the waiter's id, so a dependency
+        # completing mid-registration always finds it
+        counters = defaultdict(dict)
+        for task in tasks:
+            task.state = TaskState.PENDING
+            self.shard_for_agent(task.agent)._save_task(task)
+            counters[self._id_shard(task.id)][task.id] = len(set(task.dependencies))
+        for index, values in counters.items():
+            self.shards[index].redis.hset(self.shards[index].DEPS_REMAINING, mapping=values)
+
+        # Index under each dependency's id shard, one pipeline per shard
+        calls = defaultdict(list)
+        for task in tasks:
+            by_shard = defaultdict(list)
+            for dep_id in dict.fromkeys(task.dependencies):
+                by_shard[self._id_shard(dep_id)].append(dep_id)
+            for index, dep_ids in by_shard.items():
+                calls[index].append((task.id, dep_ids))
+
+        already_done = Counter()
+        for index, entries in calls.items():
+            pipe = self.shards[index].redis.pipeline(transaction=False)
+            for task_id, dep_ids in entries:
+                self._index_scripts[index](keys=[self.DEPS_DONE],
+                                           args=[task_id, self.WAITING_PREFIX, *dep_ids],
+                                           client=pipe)
+            for (task_id, _), done in zip(entries, pipe.execute()):
+                already_done[task_id] += done
+
+        ready_ids = set(self._decrement(already_done))
+        waiting = Counter(self.shard_index_for_agent(task.agent)
+                          for task in tasks if task.id not in ready_ids)
+        for home, count in waiting.items():
+            self.shards[home]._increment_metric('tasks_waiting', count)
+        return [task for task in tasks if task.id in ready_ids]
+
+    def _decrement(self, decrements: Dict[str, int]) -> List[str]:
+        """Apply counter decrements on each id shard; returns ids now ready"""
+        by_shard = defaultdict(list)
+        for task_id, count in decrements.items():
+            if count:
+                by_shard[self._id_shard(task_id)].extend([task_id, count])
+
+        ready = []
+        for index, args in by_shard.items():
+            released = self._decrement_scripts[index](
+                keys=[self.shards[index].DEPS_REMAINING], args=args)
+            ready.extend(task_id.decode() for task_id in released)
+        return ready
+
+    def _release_dependents(self, completed_ids: List[str]):
+        """Mark ids completed on their id shards and enqueue released waiters"""
+        by_shard = defaultdict(list)
+        for task_id in completed_ids:
+            by_shard[self._id_shard(task_id)].append(task_id)
+
+        decrements = Counter()
+        for index, ids in by_shard.items():
+            waiters = self._complete_scripts[index](
+                keys=[self.DEPS_DONE],
+                args=[self.WAITING_PREFIX, time.time(), self.DEPS_DONE_RETENTION, *ids]
+            )
+            decrements.update(waiter.decode() for waiter in waiters)
+
+        ready_ids = self._decrement(decrements)
+        for home, ids in self._locate(ready_ids).items():
+            shard = self.shards[home]
+            ready = [task for task in shard._load_tasks(ids) if task.state == TaskState.PENDING]
+            for task in ready:
+                task.state = TaskState.SCHEDULED
+            if ready:
+                self._enqueue_on(shard, ready)
+                logger.info(f"{len(ready)} task(s) scheduled on shard {home} after their dependencies completed")
+
+    @staticmethod
+    def _enqueue_on(shard: DistributedQueue, tasks: List[Task], metrics: Optional[Dict[str, int]] = None):
+        """Queue dependency-free tasks on their home shard, delaying future scheduled_at"""
+        now = time.time()
+        delayed = [task for task in tasks if task.scheduled_at and task.scheduled_at > now]
+        if delayed:
+            # Already SCHEDULED, so the shard's scheduler will not re-check dependencies
+            shard._schedule_tasks(delayed)
+        delayed_ids = {task.id for task in delayed}
+        shard._enqueue_tasks([task for task in tasks if task.id not in delayed_ids], metrics=metrics)
+
+    # ------------------------------------------------------------- execution
+
+    def get(self, agent: str, block: bool = True, timeout: int = 1) -> Optional[Task]:
+        """Get next task for agent from its shard"""
+        home = self.shard_index_for_agent(agent)
+        task = self.shards[home].get(agent, block=block, timeout=timeout)
+        if task:
+            self._remember(task.id, home)
+        return task
+
+    def complete(self, task_id: str, result: Any = None):
+        """Mark task as completed"""
+        self.complete_many({task_id: result})
+
+    def complete_many(self, results: Dict[str, Any]):
+        """Complete tasks on their home shards, then release dependents"""
+        completed = []
+        for home, ids in self._locate(list(results)).items():
+            self.shards[home].complete_many({task_id: results[task_id] for task_id in ids})
+            completed.extend(ids)
+        self._release_dependents(completed)
+
+    def fail(self, task_id: str, error: str):
+        """Mark task as failed"""
+        self.fail_many({task_id: error})
+
+    def fail_many(self, errors: Dict[str, str]):
+        """Fail tasks on their home shards"""
+        for home, ids in self._locate(list(errors)).items():
+            self.shards[home].fail_many({task_id: errors[task_id] for task_id in ids})
+
+    def cancel(self, task_id: str):
+        """Cancel a task"""
+        for home, _ in self._locate([task_id]).items():
+            self.shards[home].cancel(task_id)
+            self.shards[self._id_shard(task_id)].redis.hdel(
+                self.shards[home].DEPS_REMAINING, task_id)
+
+    def extend_lease(self, task_id: str, seconds: float) -> bool:
+        """Push a running task's lease expiry to now + seconds"""
+        return any(self.shards[home].extend_lease(task_id, seconds)
+                   for home in self._locate([task_id]))
+
+    def heartbeat(self, task: Task, seconds: Optional[float] = None) -> bool:
+        """Keep a running task's lease alive"""
+        return self.shard_for_agent(task.agent).heartbeat(task, seconds)
+
+    def set_tenant_weight(self, tenant: str, weight: float):
+        """Set a tenant's fair-share weight on every shard"""
+        for shard in self.shards:
+            shard.set_tenant_weight(tenant, weight)
+
+    def reclaim_expired(self, limit: int = RECLAIM_BATCH) -> List[str]:
+        """Reclaim expired leases on every shard"""
+        return [task_id for shard in self.shards for task_id in shard.reclaim_expired(limit)]
+
+    # ---------------------------------------------------------------- status
+
+    def get_status(self, task_id: str) -> Optional[Dict]:
+        """Get task status from its home shard"""
+        for home in self._locate([task_id]):
+            return self.shards[home].get_status(task_id)
+        return None
+
+    def get_queue_status(self) -> Dict:
+        """Queue status summed over all shards (cached for status_cache_ttl seconds)"""
+        with self._status_lock:
+            if self._status_snapshot and time.time() - self._status_time < self.status_cache_ttl:
+                return self._status_snapshot
+
+            status = {'pending': 0, 'waiting_on_dependencies': 0, 'processing': 0,
+                      'completed': 0, 'failed': 0, 'agent_queues': {}, 'tenants': {},
+                      'metrics': Counter()}
+            for shard in self.shards:
+                shard_status = shard._collect_queue_status()
+                for key in ('pending', 'waiting_on_dependencies', 'processing', 'completed', 'failed'):
+                    status[key] += shard_status[key]
+                status['agent_queues'].update(shard_status['agent_queues'])
+                status['metrics'].update(shard_status['metrics'])
+                for tenant, stats in shard_status['tenants'].items():
+                    total = status['tenants'].setdefault(
+                        tenant, {'dequeued': 0, 'wait_ms_sum': 0.0, 'weight': stats['weight']})
+                    total['dequeued'] += stats['dequeued']
+                    total['wait_ms_sum'] += stats['wait_ms_sum']
+
+            for stats in status['tenants'].values():
+                stats['avg_wait_ms'] = stats['wait_ms_sum'] / stats['dequeued'] if stats['dequeued'] else 0.0
+
+            status['metrics'] = dict(status['metrics'])
+            status['shards'] = len(self.shards)
+            self._status_snapshot = status
+            self._status_time = time.time()
+            return status
+
 
 # Singleton instance
 _distributed_queue = None
@@ -651,6 +1776,14 @@ def get_distributed_queue() -> DistributedQueue:
     """Get or create distributed queue instance"""
     global _distributed_queue
     if _distributed_queue is None:
-        _distributed_queue = DistributedQueue()
+        from config.settings import QUEUE_BACKEND, QUEUE_LOG_PATH, REDIS_SHARD_URLS
+
+        if QUEUE_BACKEND == "local":
+            from core.local_queue import LocalTaskQueue
+            _distributed_queue = LocalTaskQueue(log_path=QUEUE_LOG_PATH or None)
+        elif REDIS_SHARD_URLS:
+            _distributed_queue = ShardedDistributedQueue.from_urls(REDIS_SHARD_URLS)
+        else:
+            _distributed_queue = DistributedQueue()
         _distributed_queue.start()
     return _distributed_queue
\ No newline at end of file
@@ -0,0 +1,593 @@
+"""
+In-process backend for DistributedQueue
+Same API without Redis, for single-node deployments and tests
+"""
+
+import heapq
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict, deque
+from dataclasses import replace
+from typing import Any, Dict, List, Optional
+
+from core.distributed_queue import (
+    DEFAULT_TENANT, MIN_TENANT_WEIGHT, TENANT_FIELDS, BinaryTaskCodec, Task, TaskCodec,
+    TaskPriority, TaskState, task_tenant, tenant_stats
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LocalTaskQueue:
+    """
+    DistributedQueue backend held entirely in process memory
+
+    Agent queues are per-tenant heaps ordered like the Redis sorted sets
+    (priority, then FIFO), served by the same weighted deficit round robin
+    across tenants. A single timer thread sleeps until the next delayed task, lease
+    expiry or TTL is due. With log_path every state change is appended to a
+    SQLite database in WAL mode and replayed on the next start.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, codec: TaskCodec = None):
+        self.codec = codec or BinaryTaskCodec()
+
+        self._lock = threading.RLock()
+        self._timer = threading.Condition(self._lock)
+        self._agent_ready: Dict[str, threading.Condition] = {}
+        self._seq = itertools.count()
+
+        self._tasks: Dict[str, Task] = {}
+        # agent -> tenant -> [(priority, seq, enqueued_at, id)]
+        self._queues: Dict[str, Dict[str, list]] = defaultdict(lambda: defaultdict(list))
+        self._rings: Dict[str, deque] = defaultdict(deque)  # agent -> active tenants
+        self._deficits: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._tenant_weights: Dict[str, float] = {}
+        self._tenant_metrics = Counter()
+        self.tenant_fields = TENANT_FIELDS
+        self._queued: Dict[str, int] = {}                  # id -> live heap seq
+        self._queue_sizes = Counter()
+        self._delayed: list = []                           # [(due, seq, id)]
+        self._delayed_seq: Dict[str, int] = {}
+        self._leases: Dict[str, float] = {}                # id -> lease expiry
+        self._lease_heap: list = []
+        self._expires: Dict[str, float] = {}               # id -> record TTL expiry
+        self._expiry_heap: list = []
+        self._waiting: Dict[str, set] = defaultdict(set)   # dependency -> waiting ids
+        self._remaining: Dict[str, int] = {}
+        self._completed: set = set()
+        self._failed: set = set()
+        self._metrics = Counter()
+
+        self._next_wakeup = None
+        self._timer_thread = None
+        self._running = False
+
+        self._log = None
+        if log_path:
+            self._open_log(log_path)
+
+        logger.info("LocalTaskQueue initialized")
+
+    def start(self):
+        """Start the timer thread"""
+        if self._running:
+            return
+
+        self._running = True
+        self._timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
+        self._timer_thread.start()
+        logger.info("LocalTaskQueue started")
+
+    def stop(self):
+        """Stop the timer thread and flush the log"""
+        with self._timer:
+            self._running = False
+            self._timer.notify()
+        if self._timer_thread:
+            self._timer_thread.join(timeout=2)
+
+        with self._lock:
+            if self._log:
+                self._log.commit()
+                self._log.close()
+                self._log = None
+
+        logger.info("LocalTaskQueue stopped")
+
+    # ------------------------------------------------------------ submission
+
+    def submit(self, task: Task) -> str:
+        """Submit task to queue"""
+        waiting = self._submit_batch([task])
+        if waiting:
+            logger.info(f"Task {task.id} delayed due to dependencies")
+        else:
+            logger.info(f"Task {task.id} submitted to {task.agent} with priority {task.priority.name}")
+        return task.id
+
+    def submit_many(self, tasks: List[Task]) -> List[str]:
+        """Submit a batch of tasks"""
+        tasks = list(tasks)
+        if not tasks:
+            return []
+
+        waiting = self._submit_batch(tasks)
+        logger.info(f"Submitted {len(tasks)} tasks ({waiting} waiting on dependencies)")
+        return [task.id for task in tasks]
+
+    def broadcast(self, name: str, payload: Dict[str, Any], agents: List[str],
+                  priority: TaskPriority = TaskPriority.NORMAL) -> Dict[str, str]:
+        """Submit one copy of a task to each agent, returns agent -> task id"""
+        tasks = [Task(name=name, agent=agent, payload=dict(payload), priority=priority)
+                 for agent in agents]
+        self.submit_many(tasks)
+        return {task.agent: task.id for task in tasks}
+
+    def _submit_batch(self, tasks: List[Task]) -> int:
+        for task in tasks:
+            if not task.agent:
+                raise ValueError("Task must specify target agent")
+            if not task.id:
+                task.id = str(uuid.uuid4())
+
+        waiting = 0
+        with self._lock:
+            now = time.time()
+            for task in tasks:
+                self._store(task)
+                if task.scheduled_at and task.scheduled_at > now:
+                    # Dependencies are checked when it comes due
+                    task.state = TaskState.PENDING
+                    self._schedule(task)
+                    waiting += 1
+                    continue
+
+                if task.dependencies and self._register_dependencies(task):
+                    waiting += 1
+                    continue
+
+                self._enqueue(task)
+                self._metrics['tasks_submitted'] += 1
+                self._metrics[f'tasks_submitted_{task.priority.name.lower()}'] += 1
+
+            self._persist(tasks)
+        return waiting
+
+    # ------------------------------------------------------------- execution
+
+    def get(self, agent: str, block: bool = True, timeout: int = 1) -> Optional[Task]:
+        """Get next task for agent, waiting on a condition until one is queued"""
+        deadline = time.time() + timeout if timeout else None
+
+        with self._lock:
+            ready = self._agent_condition(agent)
+            while True:
+                task = self._pop(agent)
+                if task or not block:
+                    return task
+
+                wait = None
+                if deadline is not None:
+                    wait = deadline - time.time()
+                    if wait <= 0:
+                        return None
+                ready.wait(wait)
+
+    def complete(self, task_id: str, result: Any = None):
+        """Mark task as completed"""
+        self.complete_many({task_id: result})
+
+    def complete_many(self, results: Dict[str, Any]):
+        """Mark a batch of tasks completed (task id -> result)"""
+        with self._lock:
+            tasks = self._existing(results)
+            now = time.time()
+            released = []
+            for task in tasks:
+                task.state = TaskState.COMPLETED
+                task.completed_at = now
+                task.result = results[task.id]
+                self._leases.pop(task.id, None)
+                self._completed.add(task.id)
+                self._store(task)
+
+                self._metrics['tasks_completed'] += 1
+                self._metrics['task_duration_sum'] += now - task.started_at if task.started_at else 0
+                released.extend(self._release_dependents(task.id))
+
+            self._persist(tasks + released)
+
+        for task in tasks:
+            logger.info(f"Task {task.id} completed")
+
+    def fail(self, task_id: str, error: str):
+        """Mark task as failed"""
+        self.fail_many({task_id: error})
+
+    def fail_many(self, errors: Dict[str, str]):
+        """Mark a batch of tasks failed (task id -> error), retrying where allowed"""
+        with self._lock:
+            tasks = self._existing(errors)
+            for task in tasks:
+                task.error = errors[task.id]
+                task.retry_count += 1
+                self._leases.pop(task.id, None)
+
+                if task.retry_count < task.max_retries:
+                    task.state = TaskState.RETRYING
+                    delay = min(2 ** task.retry_count, 60)  # Exponential backoff
+                    task.scheduled_at = time.time() + delay
+                    self._schedule(task)
+                    logger.info(f"Task {task.id} failed, retry {task.retry_count}/{task.max_retries} in {delay}s")
+                else:
+                    task.state = TaskState.FAILED
+                    task.completed_at = time.time()
+                    self._failed.add(task.id)
+                    self._metrics['tasks_failed'] += 1
+                    logger.error(f"Task {task.id} failed permanently: {task.error}")
+
+                self._store(task)
+
+            self._persist(tasks)
+
+    def cancel(self, task_id: str):
+        """Cancel a task"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                logger.error(f"Task {task_id} not found")
+                return
+
+            if task.state in [TaskState.COMPLETED, TaskState.FAILED]:
+                logger.warning(f"Cannot cancel task {task_id} in state {task.state}")
+                return
+
+            task.state = TaskState.CANCELLED
+            task.completed_at = time.time()
+            self._leases.pop(task_id, None)
+            self._remaining.pop(task_id, None)
+            self._delayed_seq.pop(task_id, None)
+            if self._queued.pop(task_id, None) is not None:
+                self._queue_sizes[task.agent] -= 1
+
+            self._store(task)
+            self._metrics['tasks_cancelled'] += 1
+            self._persist([task])
+
+        logger.info(f"Task {task_id} cancelled")
+
+    def extend_lease(self, task_id: str, seconds: float) -> bool:
+        """Push a running task's lease expiry to now + seconds; False if not leased"""
+        with self._lock:
+            if task_id not in self._leases:
+                return False
+            self._lease(task_id, time.time() + seconds)
+            return True
+
+    def heartbeat(self, task: Task, seconds: Optional[float] = None) -> bool:
+        """Keep a running task's lease alive (defaults to its timeout)"""
+        return self.extend_lease(task.id, seconds or task.timeout)
+
+    def tenant_of(self, task: Task) -> str:
+        """Fair-scheduling tenant of a task ('' for the default tenant)"""
+        return task_tenant(task, self.tenant_fields)
+
+    def set_tenant_weight(self, tenant: str, weight: float):
+        """Share of dequeues a tenant gets relative to others (default 1)"""
+        if weight < MIN_TENANT_WEIGHT:
+            raise ValueError(f"Tenant weight must be at least {MIN_TENANT_WEIGHT}")
+        with self._lock:
+            self._tenant_weights['' if tenant == DEFAULT_TENANT else tenant] = weight
+
+    def reclaim_expired(self, limit: int = 100) -> List[str]:
+        """Fail (and retry) tasks whose lease expired without a heartbeat"""
+        now = time.time()
+        expired = []
+        with self._lock:
+            while self._lease_heap and self._lease_heap[0][0] <= now and len(expired) < limit:
+                expiry, task_id = heapq.heappop(self._lease_heap)
+                if self._leases.get(task_id) == expiry:
+                    del self._leases[task_id]
+                    expired.append(task_id)
+
+        for task_id in expired:
+            logger.warning(f"Task {task_id} lease expired")
+        if expired:
+            self.fail_many({task_id: "Timeout: lease expired without heartbeat" for task_id in expired})
+        return expired
+
+    # ---------------------------------------------------------------- status
+
+    def get_status(self, task_id: str) -> Optional[Dict]:
+        """Get task status"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                return None
+
+            return {
+                'id': task.id,
+                'name': task.name,
+                'agent': task.agent,
+                'state': TaskState(task.state).name,
+                'priority': TaskPriority(task.priority).name,
+                'retry_count': task.retry_count,
+                'created_at': task.created_at,
+                'started_at': task.started_at,
+                'completed_at': task.completed_at,
+                'result': task.result,
+                'error': task.error
+            }
+
+    def get_queue_status(self) -> Dict:
+        """Get overall queue status"""
+        with self._lock:
+            waiting = len(self._remaining)
+            return {
+                'pending': len(self._delayed_seq) + waiting,
+                'waiting_on_dependencies': waiting,
+                'processing': len(self._leases),
+                'completed': len(self._completed),
+                'failed': len(self._failed),
+                'agent_queues': dict(sorted(self._queue_sizes.items())),
+                'tenants': tenant_stats(dict(self._tenant_metrics), self._tenant_weights),
+                'metrics': {key: float(value) for key, value in self._metrics.items()}
+            }
+
+    # --------------------------------------------------------------- helpers
+
+    def _agent_condition(self, agent: str) -> threading.Condition:
+        ready = self._agent_ready.get(agent)
+        if ready is None:
+            ready = self._agent_ready[agent] = threading.Condition(self._lock)
+        return ready
+
+    def _existing(self, task_ids) -> List[Task]:
+        tasks = []
+        for task_id in task_ids:
+            task = self._tasks.get(task_id)
+            if task:
+                tasks.append(task)
+            else:
+                logger.error(f"Task {task_id} not found")
+        return tasks
+
+    def _store(self, task: Task):
+        """Keep the record and (re)start its TTL, like SETEX"""
+        self._tasks[task.id] = task
+        expiry = time.time() + task.ttl
+        self._expires[task.id] = expiry
+        heapq.heappush(self._expiry_heap, (expiry, task.id))
+
+    def _enqueue(self, task: Task):
+        task.state = TaskState.SCHEDULED
+        seq = next(self._seq)
+        self._queued[task.id] = seq
+        self._queue_sizes[task.agent] += 1
+
+        tenant = self.tenant_of(task)
+        heapq.heappush(self._queues[task.agent][tenant],
+                       (int(task.priority), seq, time.time(), task.id))
+        deficits = self._deficits[task.agent]
+        if tenant not in deficits:
+            deficits[tenant] = 0
+            self._rings[task.agent].append(tenant)
+        self._agent_condition(task.agent).notify()
+
+    def _live_head(self, heap: list) -> Optional[tuple]:
+        """Discard entries cancelled or expired (see _drop) while queued"""
+        while heap:
+            if self._queued.get(heap[0][3]) == heap[0][1]:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _pop(self, agent: str) -> Optional[Task]:
+        """Deficit round robin over the agent's tenants, priority within one"""
+        ring, deficits, queues = self._rings[agent], self._deficits[agent], self._queues[agent]
+        while ring:
+            tenant = ring[0]
+            heap = queues[tenant]
+            if self._live_head(heap) is None:
+                ring.popleft()
+                del deficits[tenant]
+                queues.pop(tenant, None)
+                continue
+
+            if deficits[tenant] < 1:
+                # Out of credit: top up by the tenant's weight and go to the back
+                deficits[tenant] += self._tenant_weights.get(tenant, 1.0)
+                ring.rotate(-1)
+                continue
+
+            deficits[tenant] -= 1
+            _, _, enqueued_at, task_id = heapq.heappop(heap)
+            del self._queued[task_id]
+            self._queue_sizes[agent] -= 1
+            if self._live_head(heap) is None:
+                ring.popleft()
+                del deficits[tenant]
+                queues.pop(tenant, None)
+
+            task = self._tasks[task_id]
+            task.state = TaskState.RUNNING
+            task.started_at = time.time()
+            self._lease(task_id, task.started_at + task.timeout)
+            self._metrics['tasks_started'] += 1
+            name = tenant or DEFAULT_TENANT
+            self._tenant_metrics[f"{name}:dequeued"] += 1
+            self._tenant_metrics[f"{name}:wait_ms_sum"] += (task.started_at - enqueued_at) * 1000
+            self._persist([task])
+            return replace(task)
+
+        return None
+
+    def _lease(self, task_id: str, expiry: float):
+        self._leases[task_id] = expiry
+        heapq.heappush(self._lease_heap, (expiry, task_id))
+        self._wake_timer(expiry)
+
+    def _schedule(self, task: Task):
+        seq = next(self._seq)
+        self._delayed_seq[task.id] = seq
+        heapq.heappush(self._delayed, (task.scheduled_at, seq, task.id))
+        self._wake_timer(task.scheduled_at)
+
+    def _register_dependencies(self, task: Task) -> bool:
+        """Index task under unmet dependencies; True if it has to wait"""
+        remaining = 0
+        for dep_id in dict.fromkeys(task.dependencies):
+            if dep_id not in self._completed:
+                self._waiting[dep_id].add(task.id)
+                remaining += 1
+
+        if not remaining:
+            return False
+
+        task.state = TaskState.PENDING
+        self._remaining[task.id] = remaining
+        self._metrics['tasks_waiting'] += 1
+        return True
+
+    def _release_dependents(self, completed_id: str) -> List[Task]:
+        released = []
+        for task_id in self._waiting.pop(completed_id, ()):
+            if task_id not in self._remaining:
+                continue
+            self._remaining[task_id] -= 1
+            if self._remaining[task_id] > 0:
+                continue
+
+            del self._remaining[task_id]
+            task = self._tasks.get(task_id)
+            if task and task.state == TaskState.PENDING:
+                self._enqueue(task)
+                released.append(task)
+        return released
+
+    # ----------------------------------------------------------------- timer
+
+    def _wake_timer(self, due: float):
+        """Wake the timer thread if due is earlier than its current sleep"""
+        if self._next_wakeup is None or due < self._next_wakeup:
+            self._next_wakeup = due
+            self._timer.notify()
+
+    def _timer_loop(self):
+        with self._timer:
+            while self._running:
+                self._fire_due(time.time())
+
+                due = [heap[0][0] for heap in (self._delayed, self._lease_heap, self._expiry_heap) if heap]
+                self._next_wakeup = min(due) if due else None
+                wait = None if self._next_wakeup is None else max(self._next_wakeup - time.time(), 0)
+                self._timer.wait(wait)
+
+        logger.debug("LocalTaskQueue timer stopped")
+
+    def _fire_due(self, now: float):
+        """Move due delayed tasks, reclaim expired leases and drop expired records"""
+        with self._lock:
+            moved = []
+            while self._delayed and self._delayed[0][0] <= now:
+                _, seq, task_id = heapq.heappop(self._delayed)
+                if self._delayed_seq.get(task_id) != seq:
+                    continue
+                del self._delayed_seq[task_id]
+
+                task = self._tasks.get(task_id)
+                if not task:
+                    continue
+                if task.state == TaskState.PENDING and task.dependencies and self._register_dependencies(task):
+                    continue
+                self._enqueue(task)
+                moved.append(task)
+            self._persist(moved)
+
+            if self._lease_heap and self._lease_heap[0][0] <= now:
+                self.reclaim_expired(limit=len(self._lease_heap))
+
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expiry, task_id = heapq.heappop(self._expiry_heap)
+                if self._expires.get(task_id) == expiry:
+                    self._drop(task_id)
+
+    def _drop(self, task_id: str):
+        """Forget an expired task everywhere, like a Redis key expiring"""
+        task = self._tasks.pop(task_id, None)
+        self._expires.pop(task_id, None)
+        self._completed.discard(task_id)
+        self._failed.discard(task_id)
+        self._leases.pop(task_id, None)
+        self._remaining.pop(task_id, None)
+        self._delayed_seq.pop(task_id, None)
+        if self._queued.pop(task_id, None) is not None and task:
+            self._queue_sizes[task.agent] -= 1
+
+        if self._log:
+            self._log.execute("INSERT INTO task_log (task_id, record) VALUES (?, NULL)", (task_id,))
+            self._log.commit()
+
+    # ------------------------------------------------------------ durability
+
+    def _open_log(self, path: str):
+        """Open the append-only log, replay it and compact it to one row per task"""
+        self._log = sqlite3.connect(path, check_same_thread=False)
+        self._log.execute("PRAGMA journal_mode=WAL")
+        self._log.execute("PRAGMA synchronous=NORMAL")
+        self._log.execute("""
+            CREATE TABLE IF NOT EXISTS task_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT NOT NULL,
+                record BLOB
+            )
+        """)
+
+        latest = {}
+        for task_id, record in self._log.execute("SELECT task_id, record FROM task_log ORDER BY seq"):
+            latest[task_id] = record
+
+        tasks = [self.codec.decode(record) for record in latest.values() if record is not None]
+        with self._lock:
+            # Finished tasks first so replayed dependents see them completed
+            for task in sorted(tasks, key=lambda t: t.state not in (TaskState.COMPLETED, TaskState.FAILED)):
+                self._restore(task)
+
+        with self._log:
+            self._log.execute("DELETE FROM task_log")
+            self._log.executemany("INSERT INTO task_log (task_id, record) VALUES (?, ?)",
+                                  [(task_id, record) for task_id, record in latest.items()
+                                   if record is not None])
+
+        logger.info(f"Replayed {len(self._tasks)} tasks from {path}")
+
+    def _restore(self, task: Task):
+        """Rebuild in-memory state for one replayed task"""
+        self._store(task)
+        if task.state == TaskState.COMPLETED:
+            self._completed.add(task.id)
+        elif task.state == TaskState.FAILED:
+            self._failed.add(task.id)
+        elif task.state == TaskState.RETRYING or (
+                task.state == TaskState.PENDING and task.scheduled_at and task.scheduled_at > time.time()):
+            self._schedule(task)
+        elif task.state == TaskState.PENDING and task.dependencies:
+            if not self._register_dependencies(task):
+                self._enqueue(task)
+        elif task.state != TaskState.CANCELLED:
+            # Scheduled, or running when the process died: queue it again
+            self._enqueue(task)
+
+    def _persist(self, tasks: List[Task]):
+        """Append current records to the log (one transaction)"""
+        if not self._log or not tasks:
+            return
+
+        self._log.executemany("INSERT INTO task_log (task_id, record) VALUES (?, ?)",
+                              [(task.id, self.codec.encode(task)) for task in tasks])
+        self._log.commit()
@@ -9,13 +9,17 @@ import json
 import logging
 import time
 import uuid
-from typing import Dict, List, Any, Callable, Optional
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 import threading
-from collections import defaultdict
-import queue
+import itertools
+import bisect
+from collections import defaultdict, deque
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -64,6 +68,684 @@ class Event:
     timestamp: float = field(default_factory=time.time)
     correlation_id: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Received from another process (see core.message_transport); not serialized
+    remote: bool = field(default=False, repr=False, compare=False)
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary"""
+        return {
+            'id': self.id,
+            'type': self.type.value,
+            'source': self.source,
+            'target': self.target,
+            'payload': self.payload,
+            'timestamp': self.timestamp,
+            'correlation_id': self.correlation_id,
+            'metadata': self.metadata
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Event':
+        """Create from dictionary"""
+        data = dict(data)
+        data['type'] = EventType(data.get('type', EventType.SYSTEM_ERROR.value))
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+# Declarative filter keys accepted by subscribe(), mapped to the Event
+# attribute they match against
+FILTER_KEYS = {
+    'source': 'source',
+    'agent': 'target',
+    'correlation_id': 'correlation_id',
+}
+
+
+# Handler latency histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+@dataclass
+class SubscriptionStats:
+    """Delivery counters and handler latency histogram for one subscription"""
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    latency_count: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    latency_buckets: List[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    )
+
+    def record_latency(self, seconds: float):
+        self.latency_count += 1
+        self.latency_sum += seconds
+        if seconds > self.latency_max:
+            self.latency_max = seconds
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Upper bound (ms) of the bucket holding the given percentile"""
+        if not self.latency_count:
+            return 0.0
+        rank = percentile / 100 * self.latency_count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.latency_buckets):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.latency_max * 1000
+
+    def to_dict(self) -> Dict:
+        histogram = {f"le_{bound:g}ms": count
+                     for bound, count in zip(LATENCY_BUCKETS_MS, self.latency_buckets)}
+        histogram['inf'] = self.latency_buckets[-1]
+
+        return {
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'latency_avg_ms': (self.latency_sum / self.latency_count * 1000
+                               if self.latency_count else 0.0),
+            'latency_p50_ms': self.latency_percentile(50),
+            'latency_p99_ms': self.latency_percentile(99),
+            'latency_max_ms': self.latency_max * 1000,
+            'latency_histogram': histogram
+        }
+
+
+@dataclass
+class Subscription:
+    """Subscription classified once at subscribe time"""
+    handler: Callable
+    event_type: EventType
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    filter_func: Optional[Callable] = None
+    filters: Dict[str, Any] = field(default_factory=dict)
+    is_async: bool = False
+    seq: int = 0
+    # Filter used as index key, and the remaining (attribute, value) checks
+    index_key: Optional[Tuple[str, Any]] = None
+    residual: Tuple[Tuple[str, Any], ...] = ()
+    stats: SubscriptionStats = field(default_factory=SubscriptionStats)
+    # Per-subscriber queue (only used when subscriber_queue_size > 0)
+    mailbox: Optional['Mailbox'] = None
+
+    def __post_init__(self):
+        handler = self.handler
+        self.is_async = (
+            asyncio.iscoroutinefunction(handler)
+            or asyncio.iscoroutinefunction(getattr(handler, '__call__', None))
+        )
+
+        checks = []
+        for key, value in self.filters.items():
+            if key not in FILTER_KEYS:
+                raise ValueError(f"Unknown filter key: {key}")
+            checks.append((FILTER_KEYS[key], value))
+
+        if checks:
+            self.index_key = checks[0]
+            self.residual = tuple(checks[1:])
+
+    def matches(self, event: Event) -> bool:
+        """Check residual filters and custom filter function"""
+        for attr, value in self.residual:
+            if getattr(event, attr) != value:
+                return False
+        if self.filter_func and not self.filter_func(event):
+            return False
+        return True
+
+
+class SubscriptionIndex:
+    """
+    Dispatch index bucketing subscriptions by event type and filter key
+
+    Dispatch cost grows with the number of matching subscriptions rather than
+    the total, and unsubscribe is O(1) by id.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, Subscription] = {}
+        # event_type -> {sub_id: sub} for subscriptions without filter keys
+        self._unkeyed: Dict[EventType, Dict[str, Subscription]] = defaultdict(dict)
+        # (event_type, attr, value) -> {sub_id: sub}
+        self._keyed: Dict[Tuple, Dict[str, Subscription]] = defaultdict(dict)
+        # event_type -> {attr: number of keyed subscriptions}
+        self._keyed_attrs: Dict[EventType, Dict[str, int]] = defaultdict(dict)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, sub: Subscription):
+        """Add subscription to the index"""
+        with self._lock:
+            sub.seq = next(self._seq)
+            self._by_id[sub.id] = sub
+
+            if sub.index_key is None:
+                self._unkeyed[sub.event_type][sub.id] = sub
+            else:
+                attr, value = sub.index_key
+                self._keyed[(sub.event_type, attr, value)][sub.id] = sub
+                attrs = self._keyed_attrs[sub.event_type]
+                attrs[attr] = attrs.get(attr, 0) + 1
+
+    def remove(self, sub_id: str) -> Optional[Subscription]:
+        """Remove subscription by id"""
+        with self._lock:
+            sub = self._by_id.pop(sub_id, None)
+            if sub is None:
+                return None
+
+            if sub.index_key is None:
+                bucket = self._unkeyed.get(sub.event_type)
+                bucket.pop(sub_id, None)
+                if not bucket:
+                    del self._unkeyed[sub.event_type]
+            else:
+                attr, value = sub.index_key
+                key = (sub.event_type, attr, value)
+                bucket = self._keyed.get(key)
+                bucket.pop(sub_id, None)
+                if not bucket:
+                    del self._keyed[key]
+
+                attrs = self._keyed_attrs[sub.event_type]
+                attrs[attr] -= 1
+                if not attrs[attr]:
+                    del attrs[attr]
+                if not attrs:
+                    del self._keyed_attrs[sub.event_type]
+
+            return sub
+
+    def get(self, sub_id: str) -> Optional[Subscription]:
+        """Get subscription by id"""
+        return self._by_id.get(sub_id)
+
+    def match(self, event: Event) -> List[Subscription]:
+        """Return subscriptions matching event, in subscription order"""
+        buckets = []
+
+        with self._lock:
+            bucket = self._unkeyed.get(event.type)
+            if bucket:
+                buckets.append(list(bucket.values()))
+
+            attrs = self._keyed_attrs.get(event.type)
+            if attrs:
+                for attr in attrs:
+                    bucket = self._keyed.get((event.type, attr, getattr(event, attr)))
+                    if bucket:
+                        buckets.append(list(bucket.values()))
+
+        if not buckets:
+            return []
+
+        if len(buckets) == 1:
+            candidates = buckets[0]
+        else:
+            candidates = sorted(itertools.chain.from_iterable(buckets),
+                                key=lambda s: s.seq)
+
+        return [sub for sub in candidates if sub.matches(event)]
+
+    def all(self) -> List[Subscription]:
+        """Snapshot of all subscriptions"""
+        with self._lock:
+            return list(self._by_id.values())
+
+    def count(self, event_type: Optional[EventType] = None) -> int:
+        """Number of subscriptions, optionally for one event type"""
+        if event_type is None:
+            return len(self._by_id)
+        return sum(1 for s in list(self._by_id.values()) if s.event_type == event_type)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, sub_id: str) -> bool:
+        return sub_id in self._by_id
+
+
+class _SeqIndex:
+    """Append-only list of sequence numbers with O(1) amortised pop from the front"""
+
+    __slots__ = ('items', 'head')
+
+    def __init__(self):
+        self.items: List[int] = []
+        self.head = 0
+
+    def append(self, seq: int):
+        self.items.append(seq)
+
+    def popleft(self):
+        self.head += 1
+        # Compact once the dead prefix dominates
+        if self.head > 64 and self.head * 2 > len(self.items):
+            del self.items[:self.head]
+            self.head = 0
+
+    def first(self) -> int:
+        return self.items[self.head]
+
+    def since(self, seq: int) -> List[int]:
+        """Sequence numbers >= seq"""
+        start = bisect.bisect_left(self.items, seq, lo=self.head)
+        return self.items[start:]
+
+    def __len__(self) -> int:
+        return len(self.items) - self.head
+
+
+class EventHistory:
+    """
+    Fixed-capacity ring buffer of events with secondary indexes
+
+    Keeps per-EventType and per-source indexes plus a monotonic time cursor,
+    so filtered queries cost the size of the result rather than the history.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive")
+
+        self.capacity = capacity
+        self._buffer: List[Optional[Event]] = [None] * capacity
+        # Running max of timestamps per slot; monotonic even if events
+        # are published slightly out of timestamp order
+        self._cursor: List[float] = [0.0] * capacity
+        self._next_seq = 0
+        self._high_water = 0.0
+        self._by_type: Dict[EventType, _SeqIndex] = {}
+        self._by_source: Dict[str, _SeqIndex] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def _first_seq(self) -> int:
+        return max(0, self._next_seq - self.capacity)
+
+    def append(self, event: Event):
+        """Add event, evicting the oldest one when full"""
+        with self._lock:
+            seq = self._next_seq
+            slot = seq % self.capacity
+
+            evicted = self._buffer[slot]
+            if evicted is not None:
+                self._evict(evicted)
+
+            self._buffer[slot] = event
+            self._high_water = max(self._high_water, event.timestamp)
+            self._cursor[slot] = self._high_water
+            self._next_seq = seq + 1
+
+            self._by_type.setdefault(event.type, _SeqIndex()).append(seq)
+            self._by_source.setdefault(event.source, _SeqIndex()).append(seq)
+
+    def _evict(self, event: Event):
+        """Drop the oldest entry from the secondary indexes"""
+        for index, key in ((self._by_type, event.type), (self._by_source, event.source)):
+            seqs = index[key]
+            seqs.popleft()
+            if not len(seqs):
+                del index[key]
+
+    def _seq_since(self, since: float) -> int:
+        """First sequence number whose cursor time is >= since"""
+        lo, hi = self._first_seq, self._next_seq
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._cursor[mid % self.capacity] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self, event_type: Optional[EventType] = None,
+              source: Optional[str] = None,
+              since: Optional[float] = None,
+              limit: Optional[int] = None) -> List[Event]:
+        """Return matching events, oldest first"""
+        with self._lock:
+            start = self._seq_since(since) if since else self._first_seq
+
+            candidates = []
+            if event_type is not None:
+                candidates.append(self._by_type.get(event_type))
+            if source is not None:
+                candidates.append(self._by_source.get(source))
+
+            if candidates:
+                if any(c is None for c in candidates):
+                    return []
+                seqs = min(candidates, key=len).since(start)
+            else:
+                seqs = range(start, self._next_seq)
+
+            both = event_type is not None and source is not None
+            if limit is not None and not (both or since):
+                # Nothing left to filter, so only materialise the tail
+                seqs = seqs[-limit:] if limit > 0 else []
+
+            events = [self._buffer[seq % self.capacity] for seq in seqs]
+
+        if both:
+            events = [e for e in events if e.type == event_type and e.source == source]
+        if since:
+            events = [e for e in events if e.timestamp >= since]
+        if limit is not None and (both or since):
+            events = events[-limit:] if limit > 0 else []
+
+        return events
+
+    def clear(self):
+        """Drop all events"""
+        with self._lock:
+            self._buffer = [None] * self.capacity
+            self._cursor = [0.0] * self.capacity
+            self._next_seq = 0
+            self._high_water = 0.0
+            self._by_type.clear()
+            self._by_source.clear()
+
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+
+    def __iter__(self):
+        return iter(self.query())
+
+
+class OverflowPolicy(Enum):
+    """What a full queue does with new events"""
+    BLOCK = "block"              # Wait for space (up to block_timeout), then drop
+    DROP_OLDEST = "drop_oldest"  # Evict the oldest queued event
+    DROP_NEWEST = "drop_newest"  # Reject the incoming event
+    SPILL = "spill"              # Overflow to a file on disk, replayed in order
+
+
+class _SpillFile:
+    """Append-only JSON-lines overflow file for an EventLane"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._writer = None
+        self._reader = None
+
+    def write(self, event: Event):
+        if self._writer is None:
+            self._writer = open(self.path, 'a', encoding='utf-8')
+            self._reader = open(self.path, 'r', encoding='utf-8')
+        self._writer.write(json.dumps(event.to_dict(), default=str) + "\n")
+        self.count += 1
+
+    def read(self, limit: int) -> List[Event]:
+        if not self.count:
+            return []
+        self._writer.flush()
+
+        events = []
+        while len(events) < limit and self.count:
+            line = self._reader.readline()
+            if not line:
+                break
+            self.count -= 1
+            try:
+                events.append(Event.from_dict(json.loads(line)))
+            except (ValueError, TypeError) as e:
+                logger.error(f"Dropping corrupt spilled event: {e}")
+
+        if not self.count:
+            self.close()
+        return events
+
+    def close(self):
+        for handle in (self._writer, self._reader):
+            if handle:
+                handle.close()
+        self._writer = self._reader = None
+        self.count = 0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class EventLane:
+    """
+    Bounded, thread-safe event queue with a selectable overflow policy
+    """
+
+    def __init__(self, name: str, capacity: int,
+                 policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 block_timeout: float = 5.0,
+                 spill_dir: Optional[str] = None):
+        if capacity <= 0:
+            raise ValueError("Lane capacity must be positive")
+
+        self.name = name
+        self.capacity = capacity
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._items: deque = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._spill = None
+        if policy == OverflowPolicy.SPILL:
+            path = os.path.join(spill_dir or tempfile.gettempdir(),
+                                f"message_bus_{name}_{os.getpid()}_{id(self)}.jsonl")
+            self._spill = _SpillFile(path)
+        # Thread that consumes this lane; it must never block on its own lane
+        self.consumer_thread: Optional[int] = None
+
+        # Metrics
+        self.published = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.high_water = 0
+
+    def put_many(self, events: List[Event], block: bool = True) -> int:
+        """Queue events, applying the overflow policy; returns number accepted"""
+        accepted = 0
+        with self._lock:
+            for event in events:
+                if self._offer(event, block):
+                    accepted += 1
+            if accepted:
+                self.published += accepted
+                self.high_water = max(self.high_water, len(self._items))
+                self._not_empty.notify()
+        return accepted
+
+    def _offer(self, event: Event, block: bool = True) -> bool:
+        """Queue one event; caller holds the lock"""
+        spill = self._spill
+        if spill is not None and spill.count:
+            # Keep ordering: once spilling, everything goes to disk until replayed
+            spill.write(event)
+            return True
+
+        if len(self._items) < self.capacity:
+            self._items.append(event)
+            return True
+
+        if self.policy == OverflowPolicy.DROP_OLDEST:
+            self._items.popleft()
+            self._items.append(event)
+            self.dropped += 1
+            return True
+
+        if self.policy == OverflowPolicy.SPILL:
+            spill.write(event)
+            return True
+
+        if self.policy == OverflowPolicy.BLOCK and block and \
+                threading.get_ident() != self.consumer_thread:
+            self.blocked += 1
+            if self._not_full.wait_for(lambda: len(self._items) < self.capacity,
+                                       timeout=self.block_timeout):
+                self._items.append(event)
+                return True
+            logger.warning(f"Lane {self.name} full for {self.block_timeout}s, dropping event")
+
+        self.dropped += 1
+        return False
+
+    def take(self, max_items: int) -> List[Event]:
+        """Remove up to max_items events without blocking"""
+        with self._lock:
+            count = min(len(self._items), max_items)
+            batch = [self._items.popleft() for _ in range(count)]
+            self._refill()
+            if batch:
+                self._not_full.notify_all()
+            return batch
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Remove one event, waiting up to timeout; None if still empty"""
+        with self._lock:
+            if not self._not_empty.wait_for(lambda: self._items, timeout=timeout):
+                return None
+            event = self._items.popleft()
+            self._refill()
+            self._not_full.notify()
+            return event
+
+    def _refill(self):
+        """Replay spilled events into freed capacity; caller holds the lock"""
+        if self._spill is not None and self._spill.count:
+            free = self.capacity - len(self._items)
+            if free > 0:
+                self._items.extend(self._spill.read(free))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'depth': len(self._items),
+                'spilled': self._spill.count if self._spill else 0,
+                'capacity': self.capacity,
+                'policy': self.policy.value,
+                'high_water': self.high_water,
+                'published': self.published,
+                'dropped': self.dropped,
+                'blocked': self.blocked
+            }
+
+    def close(self):
+        """Release the spill file, discarding spilled events"""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+
+    def __len__(self) -> int:
+        return len(self._items) + (self._spill.count if self._spill else 0)
+
+
+class Mailbox:
+    """
+    Per-subscriber queue drained by its own task on the bus loop
+
+    Isolates slow coroutine handlers: a stalled subscriber only fills its own
+    mailbox instead of holding up dispatch to everyone else.
+    """
+
+    def __init__(self, capacity: int, policy: OverflowPolicy):
+        if policy == OverflowPolicy.SPILL:
+            raise ValueError("Subscriber queues do not support spilling")
+        self.capacity = capacity
+        self.policy = policy
+        self.items: deque = deque()
+        self.not_empty = asyncio.Event()
+        self.not_full = asyncio.Event()
+        self.not_full.set()
+        self.task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    async def put(self, event: Event, stats: SubscriptionStats):
+        """Queue event on the loop thread, applying the overflow policy"""
+        if len(self.items) >= self.capacity:
+            if self.policy == OverflowPolicy.BLOCK:
+                self.not_full.clear()
+                await self.not_full.wait()
+            elif self.policy == OverflowPolicy.DROP_OLDEST:
+                self.items.popleft()
+                stats.dropped += 1
+            else:
+                stats.dropped += 1
+                return
+
+        self.items.append(event)
+        self.not_empty.set()
+
+    async def get(self) -> Event:
+        while not self.items:
+            self.not_empty.clear()
+            await self.not_empty.wait()
+        event = self.items.popleft()
+        self.not_full.set()
+        return event
+
+    def close(self):
+        self.closed = True
+        self.items.clear()
+        # Release a dispatcher blocked on this mailbox
+        self.not_full.set()
+        if self.task:
+            self.task.cancel()
+
+
+class ReplyWaiter:
+    """Pending request_reply call, resolved from the shared reply subscription"""
+
+    __slots__ = ('correlation_id', 'reply', 'done', 'future', '_loop')
+
+    def __init__(self, correlation_id: str,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.correlation_id = correlation_id
+        self.reply: Optional[Event] = None
+        self._loop = loop
+        # Async callers await a future on their own loop; sync callers block
+        self.future = loop.create_future() if loop else None
+        self.done = None if loop else threading.Event()
+
+    def resolve(self, reply: Event):
+        self.reply = reply
+        if self.future is None:
+            self.done.set()
+        else:
+            self._loop.call_soon_threadsafe(self._set_future)
+
+    def _set_future(self):
+        if not self.future.done():
+            self.future.set_result(self.reply)
+
+
+@dataclass
+class MessageBusConfig:
+    """Configuration for message bus"""
+    batch_size: int = 256          # Max events dispatched per drain
+    flush_interval: float = 0.0    # Seconds to linger for a fuller batch (0 = no linger)
+    history_size: int = 1000       # Ring buffer capacity for get_history()
+    # Backpressure
+    async_queue_size: int = 10000  # Capacity of the async lane
+    sync_queue_size: int = 10000   # Capacity of the sync lane
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK
+    block_timeout: float = 5.0     # Max seconds a publisher blocks under BLOCK
+    spill_dir: Optional[str] = None  # Directory for SPILL files (default: tempdir)
+    subscriber_queue_size: int = 0   # Per-subscriber queue size (0 = dispatch inline)
+    subscriber_overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
+    # Handler execution
+    concurrent_handlers: bool = False  # Run an event's matching handlers concurrently
+    max_concurrency: int = 64          # Max handlers in flight across the bus
+    handler_timeout: Optional[float] = None  # Per-handler timeout in seconds
+    sync_handler_threads: int = 0      # Thread pool for sync handlers (0 = run on loop)
 
 
 class MessageBus:
@@ -72,29 +754,67 @@ class MessageBus:
     _instance = None
     _lock = threading.Lock()
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
                 cls._instance._initialized = False
             return cls._instance
 
-    def __init__(self):
+    def __init__(self, config: MessageBusConfig = None):
         if self._initialized:
             return
 
         self._initialized = True
-        self.subscribers = defaultdict(list)
-        self.event_queue = asyncio.Queue()
-        self.sync_queue = queue.Queue()
-        self.event_history = []
-        self.max_history = 1000
+        self.config = config or MessageBusConfig()
+        self.subscriptions = SubscriptionIndex()
+        # Async lane: publishers append from any thread, the loop drains in batches
+        self.event_queue = self._create_lane("async", self.config.async_queue_size)
+        self._queue_lock = threading.Lock()
+        self._wakeup_pending = False
+        self._drain_ready = None
+        self.sync_queue = self._create_lane("sync", self.config.sync_queue_size)
+        self.event_history = EventHistory(self.config.history_size)
         self.running = False
         self._event_loop = None
         self._thread = None
+        self._handler_slots = None
+        self._handler_executor = None
+        # Optional cross-process transport (see core.message_transport)
+        self.transport = None
+        # request_reply waiters: correlation_id -> ReplyWaiter
+        self._waiters: Dict[str, ReplyWaiter] = {}
+        self._waiters_lock = threading.Lock()
+        self._reply_subscription = None
 
         logger.info("🚌 Message Bus initialized")
 
+    def _create_lane(self, name: str, capacity: int) -> EventLane:
+        return EventLane(name, capacity,
+                         policy=self.config.overflow_policy,
+                         block_timeout=self.config.block_timeout,
+                         spill_dir=self.config.spill_dir)
+
+    def configure(self, config: MessageBusConfig):
+        """Replace bus configuration; lanes are rebuilt only while stopped"""
+        if config.history_size != self.event_history.capacity:
+            history = EventHistory(config.history_size)
+            for event in self.event_history.query(limit=config.history_size):
+                history.append(event)
+            self.event_history = history
+
+        self.config = config
+
+        if not self.running:
+            for attr, name, capacity in (('event_queue', 'async', config.async_queue_size),
+                                         ('sync_queue', 'sync', config.sync_queue_size)):
+                old = getattr(self, attr)
+                lane = self._create_lane(name, capacity)
+                while len(old):
+                    lane.put_many(old.take(old.capacity), block=False)
+                old.close()
+                setattr(self, attr, lane)
+
     def start(self):
         """Start the message bus"""
         if self.running:
@@ -102,6 +822,12 @@ class MessageBus:
 
         self.running = True
 
+        if self.config.sync_handler_threads > 0:
+            self._handler_executor = ThreadPoolExecutor(
+                max_workers=self.config.sync_handler_threads,
+                thread_name_prefix="bus-handler"
+            )
+
         # Start async event loop in background thread
         self._thread = threading.Thread(target=self._run_event_loop, daemon=True)
         self._thread.start()
@@ -114,65 +840,151 @@ class MessageBus:
     def stop(self):
         """Stop the message bus"""
         self.running = False
-        if self._event_loop:
-            self._event_loop.call_soon_threadsafe(self._event_loop.stop)
+        self.detach_transport()
+        for sub in self.subscriptions.all():
+            self._close_mailbox(sub)
+        if self._handler_executor:
+            self._handler_executor.shutdown(wait=False)
+            self._handler_executor = None
+        if self._event_loop and not self._event_loop.is_closed():
+            # Wake the drain loop so it sees running=False and exits cleanly
+            try:
+                self._event_loop.call_soon_threadsafe(self._drain_ready.set)
+            except RuntimeError:
+                pass
         logger.info("🛑 Message Bus stopped")
 
     def _run_event_loop(self):
         """Run async event loop in thread"""
-        self._event_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self._event_loop)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._drain_ready = asyncio.Event()
+        self._handler_slots = asyncio.Semaphore(self.config.max_concurrency)
+        self.event_queue.consumer_thread = threading.get_ident()
+
+        # Pick up anything published before the loop existed
+        with self._queue_lock:
+            self._event_loop = loop
+            self._wakeup_pending = bool(self.event_queue)
+            if self._wakeup_pending:
+                self._drain_ready.set()
 
-        self._event_loop.run_until_complete(self._process_async_events())
+        try:
+            loop.run_until_complete(self._process_async_events())
+        finally:
+            with self._queue_lock:
+                if self._event_loop is loop:
+                    self._event_loop = None
+                    self._wakeup_pending = False
+            loop.close()
 
     async def _process_async_events(self):
-        """Process async events"""
+        """Process async events, draining everything pending per wakeup"""
         while self.running:
             try:
-                # Get event with timeout
-                event = await asyncio.wait_for(
-                    self.event_queue.get(),
-                    timeout=1.0
-                )
-
-                await self._dispatch_event(event)
-
+                await asyncio.wait_for(self._drain_ready.wait(), timeout=1.0)
             except asyncio.TimeoutError:
                 continue
+
+            try:
+                batch = await self._drain_batch()
+                await self._dispatch_batch(batch)
             except Exception as e:
                 logger.error(f"Error processing async event: {e}")
 
+    async def _drain_batch(self) -> List[Event]:
+        """Take up to batch_size pending events in one go"""
+        config = self.config
+
+        # Linger briefly for a fuller batch; bounded by flush_interval
+        if config.flush_interval > 0 and len(self.event_queue) < config.batch_size:
+            await asyncio.sleep(config.flush_interval)
+
+        with self._queue_lock:
+            batch = self.event_queue.take(config.batch_size)
+
+            if len(self.event_queue):
+                # More pending: keep the wakeup armed and drain again
+                self._drain_ready.set()
+            else:
+                self._drain_ready.clear()
+                self._wakeup_pending = False
+
+        return batch
+
+    async def _dispatch_batch(self, batch: List[Event]):
+        """Dispatch a drained batch in publish order"""
+        for event in batch:
+            await self._dispatch_event(event)
+
+    def _enqueue_async(self, events: List[Event]):
+        """Queue events for the async lane with at most one loop wakeup"""
+        if not self.event_queue.put_many(events):
+            return
+
+        with self._queue_lock:
+            loop = self._event_loop
+            if self._wakeup_pending or loop is None:
+                return
+            self._wakeup_pending = True
+
+        loop.call_soon_threadsafe(self._drain_ready.set)
+
     def _process_sync_events(self):
         """Process sync events"""
+        self.sync_queue.consumer_thread = threading.get_ident()
         while self.running:
             try:
                 event = self.sync_queue.get(timeout=1.0)
-                self._dispatch_sync_event(event)
-            except queue.Empty:
-                continue
+                if event is not None:
+                    self._dispatch_sync_event(event)
             except Exception as e:
                 logger.error(f"Error processing sync event: {e}")
 
     def subscribe(self, event_type: EventType, handler: Callable,
-                  filter_func: Optional[Callable] = None):
-        """Subscribe to event type"""
-        subscription = {
-            'handler': handler,
-            'filter': filter_func,
-            'id': str(uuid.uuid4())
-        }
+                  filter_func: Optional[Callable] = None, **filters):
+        """
+        Subscribe to event type
+
+        Args:
+            event_type: Event type to receive
+            handler: Sync or async callable invoked with the event
+            filter_func: Optional predicate evaluated per event
+            **filters: Declarative filters (source, agent, correlation_id);
+                these are indexed, so prefer them over filter_func
+        """
+        subscription = Subscription(
+            handler=handler,
+            event_type=event_type,
+            filter_func=filter_func,
+            filters={k: v for k, v in filters.items() if v is not None}
+        )
 
-        self.subscribers[event_type].append(subscription)
+        self.subscriptions.add(subscription)
         logger.info(f"📮 Subscribed to {event_type.value}")
 
-        return subscription['id']
+        return subscription.id
 
-    def unsubscribe(self, subscription_id: str):
+    def unsubscribe(self, subscription_id: str) -> bool:
         """Unsubscribe from events"""
-        for event_type, subs in self.subscribers.items():
-            self.subscribers[event_type] = [
-                s for s in subs if s['id'] != subscription_id
-            ]
+        sub = self.subscriptions.remove(subscription_id)
+        if sub is None:
+            return False
+        self._close_mailbox(sub)
+        return True
+
+    def _close_mailbox(self, sub: Subscription):
+        """Stop a subscriber's queue worker (on the loop thread)"""
+        mailbox = sub.mailbox
+        if mailbox is None:
+            return
+        sub.mailbox = None
+        loop = self._event_loop
+        if loop and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(mailbox.close)
+            except RuntimeError:
+                pass
 
     def publish(self, event: Event, sync: bool = False):
         """Publish an event"""
@@ -184,85 +996,179 @@ class MessageBus:
 
         # Route to appropriate queue
         if sync:
-            self.sync_queue.put(event)
-        else:
-            if self._event_loop and self.running:
-                asyncio.run_coroutine_threadsafe(
-                    self.event_queue.put(event),
-                    self._event_loop
-                )
+            self.sync_queue.put_many([event])
+        elif self.running:
+            self._enqueue_async([event])
+
+        if self.transport:
+            self.transport.send([event])
+
+    def publish_many(self, events: List[Event], sync: bool = False):
+        """Publish a burst of events with a single loop wakeup"""
+        events = list(events)
+        if not events:
+            return
+
+        for event in events:
+            self._add_to_history(event)
+
+        logger.debug(f"📤 Batch: {len(events)} events")
+
+        if sync:
+            self.sync_queue.put_many(events)
+        elif self.running:
+            self._enqueue_async(events)
+
+        if self.transport:
+            self.transport.send(events)
+
+    def attach_transport(self, transport):
+        """Share events with other processes through transport"""
+        if self.transport:
+            self.transport.close()
+        self.transport = transport
+        transport.attach(self)
+
+    def detach_transport(self):
+        """Stop sharing events with other processes"""
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+    def receive_remote(self, events: List[Event]):
+        """Deliver events published in another process to local subscribers"""
+        for event in events:
+            self._add_to_history(event)
+        if self.running:
+            self._enqueue_async(events)
 
     async def _dispatch_event(self, event: Event):
         """Dispatch event to async subscribers"""
-        subscribers = self.subscribers.get(event.type, [])
+        config = self.config
+        subs = self.subscriptions.match(event)
+
+        if config.subscriber_queue_size > 0:
+            for sub in subs:
+                await self._deliver_to_mailbox(sub, event)
+        elif config.concurrent_handlers and len(subs) > 1:
+            # Handler errors are caught in _invoke_handler, so gather never raises
+            await asyncio.gather(*(self._invoke_handler(sub, event) for sub in subs))
+        else:
+            for sub in subs:
+                await self._invoke_handler(sub, event)
 
-        for sub in subscribers:
-            try:
-                # Apply filter if provided
-                if sub['filter'] and not sub['filter'](event):
-                    continue
+    async def _invoke_handler(self, sub: Subscription, event: Event):
+        """Run one handler under the concurrency limit and timeout"""
+        slots = self._handler_slots
+        if slots is not None:
+            await slots.acquire()
 
-                handler = sub['handler']
+        start = time.perf_counter()
+        try:
+            # Call handler
+            if sub.is_async:
+                pending = sub.handler(event)
+            elif self._handler_executor is not None:
+                # Keep blocking handlers off the loop
+                pending = asyncio.get_running_loop().run_in_executor(
+                    self._handler_executor, sub.handler, event
+                )
+            else:
+                pending = None
+                sub.handler(event)
 
-                # Call handler
-                if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
+            if pending is not None:
+                if self.config.handler_timeout:
+                    await asyncio.wait_for(pending, self.config.handler_timeout)
                 else:
-                    handler(event)
+                    await pending
+            sub.stats.delivered += 1
 
-            except Exception as e:
-                logger.error(f"Error in event handler: {e}")
+        except asyncio.TimeoutError:
+            sub.stats.timeouts += 1
+            logger.warning(f"Handler for {event.type.value} timed out "
+                           f"after {self.config.handler_timeout}s")
+
+        except Exception as e:
+            sub.stats.errors += 1
+            logger.error(f"Error in event handler: {e}")
+
+        finally:
+            sub.stats.record_latency(time.perf_counter() - start)
+            if slots is not None:
+                slots.release()
+
+    async def _deliver_to_mailbox(self, sub: Subscription, event: Event):
+        """Queue event for a subscriber, starting its worker on first use"""
+        mailbox = sub.mailbox
+        if mailbox is None:
+            if sub.id not in self.subscriptions:
+                return
+            mailbox = Mailbox(self.config.subscriber_queue_size,
+                              self.config.subscriber_overflow_policy)
+            mailbox.task = asyncio.ensure_future(self._mailbox_worker(sub, mailbox))
+            sub.mailbox = mailbox
+
+        await mailbox.put(event, sub.stats)
+
+    async def _mailbox_worker(self, sub: Subscription, mailbox: Mailbox):
+        """Drain one subscriber's queue in order"""
+        while not mailbox.closed:
+            event = await mailbox.get()
+            await self._invoke_handler(sub, event)
 
     def _dispatch_sync_event(self, event: Event):
         """Dispatch event to sync subscribers"""
-        subscribers = self.subscribers.get(event.type, [])
-
-        for sub in subscribers:
+        for sub in self.subscriptions.match(event):
+            start = time.perf_counter()
             try:
-                # Apply filter if provided
-                if sub['filter'] and not sub['filter'](event):
-                    continue
-
-                handler = sub['handler']
-
                 # Call handler synchronously
-                if not asyncio.iscoroutinefunction(handler):
-                    handler(event)
+                if not sub.is_async:
+                    sub.handler(event)
+                    sub.stats.delivered += 1
+                    sub.stats.record_latency(time.perf_counter() - start)
                 else:
                     # Schedule async handler
                     if self._event_loop and self.running:
                         asyncio.run_coroutine_threadsafe(
-                            handler(event),
+                            self._invoke_handler(sub, event),
                             self._event_loop
                         )
 
             except Exception as e:
+                sub.stats.errors += 1
                 logger.error(f"Error in sync event handler: {e}")
 
+    def get_metrics(self) -> Dict:
+        """Queue depths, drops and per-subscriber handler latency"""
+        subscribers = {}
+        for sub in self.subscriptions.all():
+            stats = sub.stats.to_dict()
+            stats['event_type'] = sub.event_type.value
+            stats['queue_depth'] = len(sub.mailbox.items) if sub.mailbox else 0
+            subscribers[sub.id] = stats
+
+        return {
+            'running': self.running,
+            'lanes': {
+                'async': self.event_queue.stats(),
+                'sync': self.sync_queue.stats()
+            },
+            'subscribers': subscribers,
+            'pending_replies': len(self._waiters),
+            'history_size': len(self.event_history)
+        }
+
     def _add_to_history(self, event: Event):
         """Add event to history"""
         self.event_history.append(event)
 
-        # Trim history if needed
-        if len(self.event_history) > self.max_history:
-            self.event_history = self.event_history[-self.max_history:]
-
     def get_history(self, event_type: Optional[EventType] = None,
                     source: Optional[str] = None,
-                    since: Optional[float] = None) -> List[Event]:
-        """Get event history with optional filters"""
-        history = self.event_history
-
-        if event_type:
-            history = [e for e in history if e.type == event_type]
-
-        if source:
-            history = [e for e in history if e.source == source]
-
-        if since:
-            history = [e for e in history if e.timestamp >= since]
-
-        return history
+                    since: Optional[float] = None,
+                    limit: Optional[int] = None) -> List[Event]:
+        """Get event history with optional filters (oldest first)"""
+        return self.event_history.query(event_type, source, since, limit)
 
     def create_event(self, event_type: EventType, source: str,
                     payload: Dict[str, Any] = None,
@@ -279,32 +1185,89 @@ class MessageBus:
 
         return event
 
+    def _register_waiters(self, events: List[Event],
+                          loop: Optional[asyncio.AbstractEventLoop] = None) -> List['ReplyWaiter']:
+        """Create reply waiters keyed by correlation id"""
+        with self._waiters_lock:
+            if self._reply_subscription is None:
+                # One shared subscription routes every reply by correlation id
+                self._reply_subscription = self.subscribe(
+                    EventType.MESSAGE_RECEIVED, self._route_reply
+                )
+
+            waiters = []
+            for event in events:
+                correlation_id = event.correlation_id or event.id
+                waiter = ReplyWaiter(correlation_id, loop)
+                self._waiters[correlation_id] = waiter
+                waiters.append(waiter)
+            return waiters
+
+    def _release_waiters(self, waiters: List['ReplyWaiter']):
+        """Drop waiters that resolved or timed out"""
+        with self._waiters_lock:
+            for waiter in waiters:
+                if self._waiters.get(waiter.correlation_id) is waiter:
+                    del self._waiters[waiter.correlation_id]
+
+    def _route_reply(self, reply_event: Event):
+        """Resolve the waiter for a reply in O(1)"""
+        if reply_event.correlation_id is None:
+            return
+        with self._waiters_lock:
+            waiter = self._waiters.pop(reply_event.correlation_id, None)
+        if waiter is not None:
+            waiter.resolve(reply_event)
+
     def request_reply(self, event: Event, timeout: float = 5.0) -> Optional[Event]:
         """Send event and wait for reply"""
-        reply_queue = queue.Queue()
-        correlation_id = event.correlation_id or event.id
-
-        # Subscribe to replies
-        def reply_handler(reply_event: Event):
-            if reply_event.correlation_id == correlation_id:
-                reply_queue.put(reply_event)
+        return self.request_many([event], timeout)[0]
 
-        sub_id = self.subscribe(EventType.MESSAGE_RECEIVED, reply_handler)
+    def request_many(self, events: List[Event], timeout: float = 5.0) -> List[Optional[Event]]:
+        """Send a batch of requests and wait for their replies (None on timeout)"""
+        events = list(events)
+        waiters = self._register_waiters(events)
+        deadline = time.time() + timeout
 
         try:
-            # Publish request
-            self.publish(event)
+            self.publish_many(events)
+
+            for waiter in waiters:
+                waiter.done.wait(max(0.0, deadline - time.time()))
 
-            # Wait for reply
-            reply = reply_queue.get(timeout=timeout)
-            return reply
+        finally:
+            self._release_waiters(waiters)
+
+        replies = [waiter.reply for waiter in waiters]
+        missing = sum(1 for r in replies if r is None)
+        if missing:
+            logger.warning(f"No reply received for {missing}/{len(events)} requests")
+        return replies
+
+    async def request_reply_async(self, event: Event, timeout: float = 5.0) -> Optional[Event]:
+        """Async variant of request_reply for callers on their own event loop"""
+        return (await self.request_many_async([event], timeout))[0]
+
+    async def request_many_async(self, events: List[Event],
+                                 timeout: float = 5.0) -> List[Optional[Event]]:
+        """Async variant of request_many"""
+        events = list(events)
+        if not events:
+            return []
+        waiters = self._register_waiters(events, asyncio.get_running_loop())
 
-        except queue.Empty:
-            logger.warning(f"No reply received for {event.id}")
-            return None
+        try:
+            self.publish_many(events)
+            await asyncio.wait([w.future for w in waiters], timeout=timeout)
 
         finally:
-            self.unsubscribe(sub_id)
+            self._release_waiters(waiters)
+
+        replies = [waiter.reply for waiter in waiters]
+        missing = sum(1 for r in replies if r is None)
+        if missing:
+            logger.warning(f"No reply received for {missing}/{len(events)} requests")
+        return replies
 
 
 # Global instance
@@ -0,0 +1,494 @@
+"""
+Cross-process transport for the Message Bus
+Relays events between local processes over a Unix domain socket broker
+"""
+
+import fcntl
+import json
+import logging
+import os
+import selectors
+import socket
+import struct
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from core.message_bus import Event, EventType
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "claude_message_bus.sock")
+
+# Frame layout: body length (uint32), protocol version (uint8), codec (uint8)
+FRAME_HEADER = struct.Struct("!IBB")
+PROTOCOL_VERSION = 1
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+# Unsent bytes the broker holds for one client before dropping it as stalled
+MAX_CLIENT_BACKLOG = 2 * MAX_FRAME_SIZE
+
+
+class FrameError(Exception):
+    """Raised for malformed or unsupported frames"""
+    pass
+
+
+# ============================================================================
+# FRAMING
+# ============================================================================
+
+def _event_to_fields(event: Event) -> list:
+    """Positional encoding of an event (no repeated field names on the wire)"""
+    return [event.id, event.type.value, event.source, event.target, event.payload,
+            event.timestamp, event.correlation_id, event.metadata]
+
+
+def _event_from_fields(fields: list) -> Event:
+    event_id, type_value, source, target, payload, timestamp, correlation_id, metadata = fields
+    return Event(id=event_id, type=EventType(type_value), source=source, target=target,
+                 payload=payload, timestamp=timestamp, correlation_id=correlation_id,
+                 metadata=metadata)
+
+
+def encode_frame(event: Event) -> bytes:
+    """Encode one event as a length-prefixed binary frame"""
+    fields = _event_to_fields(event)
+    if MSGPACK_AVAILABLE:
+        body = msgpack.packb(fields, default=str, use_bin_type=True)
+        codec = CODEC_MSGPACK
+    else:
+        body = json.dumps(fields, default=str, separators=(",", ":")).encode()
+        codec = CODEC_JSON
+
+    return FRAME_HEADER.pack(len(body), PROTOCOL_VERSION, codec) + body
+
+
+def decode_body(codec: int, body: bytes) -> Event:
+    """Decode a frame body produced by encode_frame"""
+    if codec == CODEC_MSGPACK:
+        if not MSGPACK_AVAILABLE:
+            raise FrameError("Received msgpack frame but msgpack is not installed")
+        fields = msgpack.unpackb(body, raw=False)
+    elif codec == CODEC_JSON:
+        fields = json.loads(body)
+    else:
+        raise FrameError(f"Unknown codec {codec}")
+
+    return _event_from_fields(fields)
+
+
+class FrameReader:
+    """Incremental frame splitter for a byte stream"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Add received bytes, return complete raw frames (header included)"""
+        self._buffer.extend(data)
+        frames = []
+
+        while len(self._buffer) >= FRAME_HEADER.size:
+            length, version, _codec = FRAME_HEADER.unpack_from(self._buffer)
+            if version != PROTOCOL_VERSION:
+                raise FrameError(f"Unsupported protocol version {version}")
+            if length > MAX_FRAME_SIZE:
+                raise FrameError(f"Frame too large: {length} bytes")
+
+            end = FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+
+            frames.append(bytes(self._buffer[:end]))
+            del self._buffer[:end]
+
+        return frames
+
+    @staticmethod
+    def decode(frame: bytes) -> Event:
+        _length, _version, codec = FRAME_HEADER.unpack_from(frame)
+        return decode_body(codec, frame[FRAME_HEADER.size:])
+
+
+# ============================================================================
+# BROKER
+# ============================================================================
+
+class _BrokerClient:
+    """One connected process: partial inbound frames and unsent outbound bytes"""
+
+    __slots__ = ('reader', 'outbox')
+
+    def __init__(self):
+        self.reader = FrameReader()
+        self.outbox = bytearray()
+
+
+class EventBroker:
+    """
+    Unix domain socket broker relaying frames between connected processes
+
+    Frames are forwarded verbatim to every client except the sender, so the
+    broker never decodes events. Client sockets are non-blocking: bytes a
+    client cannot take yet wait in its outbox, and a client whose outbox
+    grows past MAX_CLIENT_BACKLOG is dropped, so one stalled process never
+    holds up delivery to the others.
+    """
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH):
+        self.path = path
+        self._selector = selectors.DefaultSelector()
+        self._server = None
+        self._clients: Dict[socket.socket, _BrokerClient] = {}
+        self._thread = None
+        self._running = False
+        self.frames_relayed = 0
+        self.clients_dropped = 0
+
+    def start(self):
+        """Bind the socket and relay in a background thread"""
+        if self._running:
+            return
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen(128)
+        self._server.setblocking(False)
+        self._selector.register(self._server, selectors.EVENT_READ)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+        logger.info(f"📡 Event broker listening on {self.path}")
+
+    def stop(self):
+        """Stop relaying and remove the socket file"""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=2)
+
+        # Unlink first: dropped clients reconnect at once and may bind a new
+        # broker at the same path, which must not be removed afterwards
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+        for client in list(self._clients):
+            self._drop(client)
+        if self._server:
+            self._selector.unregister(self._server)
+            self._server.close()
+            self._server = None
+        self._selector.close()
+
+        logger.info("📡 Event broker stopped")
+
+    def serve_forever(self):
+        """Run the broker in the foreground"""
+        self.start()
+        try:
+            self._thread.join()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _serve(self):
+        while self._running:
+            for key, mask in self._selector.select(timeout=0.5):
+                sock = key.fileobj
+                if sock is self._server:
+                    self._accept()
+                    continue
+                if mask & selectors.EVENT_WRITE:
+                    self._flush(sock)
+                if mask & selectors.EVENT_READ and sock in self._clients:
+                    self._relay(sock)
+
+    def _accept(self):
+        try:
+            client, _ = self._server.accept()
+        except BlockingIOError:
+            return
+        client.setblocking(False)
+        self._clients[client] = _BrokerClient()
+        self._selector.register(client, selectors.EVENT_READ)
+        logger.debug(f"Broker client connected ({len(self._clients)} total)")
+
+    def _relay(self, sock: socket.socket):
+        try:
+            data = sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        if not data:
+            self._drop(sock)
+            return
+
+        try:
+            frames = self._clients[sock].reader.feed(data)
+        except FrameError as e:
+            logger.error(f"Dropping broker client: {e}")
+            self._drop(sock)
+            return
+
+        if not frames:
+            return
+
+        payload = b"".join(frames)
+        self.frames_relayed += len(frames)
+        for client, state in list(self._clients.items()):
+            if client is sock:
+                continue
+            if len(state.outbox) + len(payload) > MAX_CLIENT_BACKLOG:
+                logger.warning(f"Dropping stalled broker client ({len(state.outbox)} bytes unsent)")
+                self.clients_dropped += 1
+                self._drop(client)
+                continue
+            was_idle = not state.outbox
+            state.outbox += payload
+            if was_idle:
+                self._flush(client)
+
+    def _flush(self, sock: socket.socket):
+        """Write as much of a client's outbox as its socket takes now"""
+        state = self._clients.get(sock)
+        if state is None:
+            return
+        try:
+            sent = sock.send(state.outbox)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(sock)
+            return
+        del state.outbox[:sent]
+
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if state.outbox else 0)
+        if self._selector.get_key(sock).events != events:
+            self._selector.modify(sock, events)
+
+    def _drop(self, sock: socket.socket):
+        if self._clients.pop(sock, None) is None:
+            return
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
+        sock.close()
+
+
+# ============================================================================
+# CLIENT TRANSPORT
+# ============================================================================
+
+class UnixSocketTransport:
+    """
+    MessageBus transport that connects to a local EventBroker
+
+    With start_broker=True the first process to connect hosts the broker
+    in a background thread; a lock file next to the socket makes sure only
+    one process does. When the connection drops (e.g. the hosting process
+    exits) the transport reconnects with backoff, hosting a new broker if
+    needed. Events published while disconnected are dropped and counted.
+    """
+
+    RECONNECT_DELAY = 0.05      # First retry delay (seconds), doubled per attempt
+    MAX_RECONNECT_DELAY = 2.0
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, start_broker: bool = True):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.start_broker = start_broker
+        self.broker: Optional[EventBroker] = None
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._reader_thread = None
+        self._bus = None
+        self._running = False
+        self._stopped = threading.Event()
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    def attach(self, bus):
+        """Connect and start delivering remote events into bus"""
+        self._bus = bus
+        self._sock = self._connect()
+        self._running = True
+        self._stopped.clear()
+        self._reader_thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader_thread.start()
+        logger.info(f"🔌 Message bus transport connected to {self.path}")
+
+    def _try_connect(self) -> Optional[socket.socket]:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.path)
+            return sock
+        except (FileNotFoundError, ConnectionRefusedError):
+            sock.close()
+            if not self.start_broker:
+                raise
+            return None
+
+    def _connect(self) -> socket.socket:
+        sock = self._try_connect()
+        if sock:
+            return sock
+
+        # No live broker: host one, holding the lock so that only one
+        # process clears the socket file and binds
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have started one while we waited
+                sock = self._try_connect()
+                if sock:
+                    return sock
+
+                try:
+                    os.unlink(self.path)
+                except FileNotFoundError:
+                    pass
+                broker = EventBroker(self.path)
+                broker.start()
+                self.broker = broker
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        return sock
+
+    def send(self, events: List[Event]):
+        """Forward locally published events to other processes"""
+        frames = [encode_frame(e) for e in events if not e.remote]
+        if not frames:
+            return
+
+        with self._send_lock:
+            sock = self._sock if self._running else None
+            if sock is None:
+                self._drop(len(frames), "transport disconnected")
+                return
+            try:
+                sock.sendall(b"".join(frames))
+                self.sent += len(frames)
+            except OSError as e:
+                self._drop(len(frames), e)
+
+    def _drop(self, count: int, reason):
+        self.dropped += count
+        logger.warning(f"Transport dropped {count} event(s) ({reason}); {self.dropped} dropped in total")
+
+    def _read_loop(self):
+        while self._running:
+            self._receive(self._sock)
+            if not self._running:
+                break
+
+            logger.warning("🔌 Message bus transport disconnected, reconnecting")
+            with self._send_lock:
+                self._close_socket()
+            self._reconnect()
+
+    def _receive(self, sock: socket.socket):
+        """Deliver events from sock until the connection ends"""
+        reader = FrameReader()
+        while self._running:
+            try:
+                data = sock.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+
+            try:
+                events = [reader.decode(frame) for frame in reader.feed(data)]
+            except FrameError as e:
+                logger.error(f"Transport frame error: {e}")
+                return
+
+            for event in events:
+                # Mark so the receiving bus does not forward it again
+                event.remote = True
+            self.received += len(events)
+            self._bus.receive_remote(events)
+
+    def _reconnect(self):
+        """Retry _connect with exponential backoff until connected or closed"""
+        delay = self.RECONNECT_DELAY
+        while self._running:
+            try:
+                sock = self._connect()
+            except OSError as e:
+                logger.debug(f"Transport reconnect failed: {e}")
+                if self._stopped.wait(delay):
+                    return
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+                continue
+
+            with self._send_lock:
+                if not self._running:
+                    sock.close()
+                    return
+                self._sock = sock
+            self.reconnects += 1
+            logger.info(f"🔌 Message bus transport reconnected to {self.path}")
+            return
+
+    def _close_socket(self):
+        if self._sock:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+
+    def close(self):
+        """Disconnect, stopping the broker if this process hosts it"""
+        self._running = False
+        self._stopped.set()
+        with self._send_lock:
+            self._close_socket()
+        if self._reader_thread:
+            self._reader_thread.join(timeout=2)
+        if self.broker:
+            self.broker.stop()
+            self.broker = None
+
+
+def connect_local_transport(path: str = DEFAULT_SOCKET_PATH) -> UnixSocketTransport:
+    """Attach the process-wide message bus to the local broker"""
+    from core.message_bus import get_message_bus
+
+    transport = UnixSocketTransport(path)
+    get_message_bus().attach_transport(transport)
+    return transport
+
+
+# CLI Interface
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Message Bus event broker")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    EventBroker(args.socket).serve_forever()
@@ -0,0 +1,267 @@
+"""
+Line-indexed pane output
+Streamed pane bytes become ANSI-stripped lines with monotonic line numbers,
+kept in a bounded ring and scanned once, as they arrive, by precompiled detectors
+"""
+
+import codecs
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, List, Optional, Pattern, Tuple, Union
+
+DEFAULT_MAX_LINES = 10000      # Lines kept per session
+DEFAULT_MAX_LINE_CHARS = 4096  # Longer lines (and unterminated output) are truncated
+
+# CSI, OSC, DCS/PM/APC strings and two-character escapes
+ANSI_ESCAPE = re.compile(
+    r"\x1b(?:\[[0-?]*[ -/]*[@-~]"
+    r"|\][^\x07\x1b]*(?:\x07|\x1b\\)"
+    r"|[PX^_][^\x1b]*\x1b\\"
+    r"|[@-Z\\-_])"
+)
+CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b-\x1f\x7f]")
+
+# Task markers echoed by AgentBridge; the typed command shows them in quotes
+TASK_MARKER = re.compile(r"(?<!')### TASK_(?:START|END):\S+")
+
+# Where a JSON object can start: "{" followed by a key, "}" or the line end
+JSON_START = re.compile(r'\{\s*(?:"|\}|$)')
+
+ERROR_PATTERNS = [
+    r"command not found",
+    r"No such file or directory",
+    r"Permission denied",
+    r"fatal:",
+    r"FATAL:",
+    r"Traceback \(most recent call last\):",
+    r"SyntaxError:",
+    r"NameError:",
+    r"ImportError:"
+]
+ERROR_PATTERN = re.compile("|".join(f"(?:{p})" for p in ERROR_PATTERNS), re.IGNORECASE)
+
+
+def strip_ansi(text: str) -> str:
+    """Remove terminal escape sequences and control characters (tabs are kept)"""
+    return CONTROL_CHARS.sub("", ANSI_ESCAPE.sub("", text))
+
+
+def clean_line(raw: str) -> str:
+    """One raw terminal line as displayed: escapes stripped, carriage returns overwrite"""
+    text = ANSI_ESCAPE.sub("", raw).rstrip("\r")
+    # Text after a bare \r redraws the line from its start
+    text = text.rsplit("\r", 1)[-1]
+    return CONTROL_CHARS.sub("", text)
+
+
+class MarkerDetector:
+    """Line number of the latest occurrence of each marker"""
+
+    def __init__(self, pattern: Pattern = TASK_MARKER, limit: int = 1000):
+        self.pattern = pattern
+        self.limit = limit
+        self._lines: "OrderedDict[str, int]" = OrderedDict()
+
+    def scan(self, number: int, line: str):
+        for match in self.pattern.finditer(line):
+            marker = match.group(0)
+            self._lines.pop(marker, None)
+            self._lines[marker] = number
+            if len(self._lines) > self.limit:
+                self._lines.popitem(last=False)
+
+    def line_of(self, marker: str, since: int = 0) -> Optional[int]:
+        number = self._lines.get(marker)
+        return number if number is not None and number >= since else None
+
+
+class ErrorDetector:
+    """Lines matching the error patterns"""
+
+    def __init__(self, pattern: Pattern = ERROR_PATTERN, limit: int = 1000):
+        self.pattern = pattern
+        self._found: deque = deque(maxlen=limit)
+
+    def scan(self, number: int, line: str):
+        if self.pattern.search(line):
+            self._found.append((number, line))
+
+    def since(self, number: int) -> List[Tuple[int, str]]:
+        return [found for found in self._found if found[0] >= number]
+
+
+class JsonBlockDetector:
+    """
+    JSON objects printed on one or more lines
+
+    A block starts at the first "{" of a line that can open an object (see
+    JSON_START) and ends when its braces balance (braces inside strings are
+    ignored); blocks that do not parse are dropped.
+    """
+
+    def __init__(self, limit: int = 100, max_block_lines: int = 200):
+        self.max_block_lines = max_block_lines
+        self._found: deque = deque(maxlen=limit)
+        self._block: List[str] = []
+        self._start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def scan(self, number: int, line: str):
+        if not self._block:
+            start = JSON_START.search(line)
+            if not start:
+                return
+            line = line[start.start():]
+            self._start = number
+            self._depth = 0
+            self._in_string = self._escaped = False
+
+        end = self._balance(line)
+        if end is None:
+            self._block.append(line)
+            if len(self._block) > self.max_block_lines:
+                self._block = []
+            return
+
+        text = "\n".join(self._block + [line[:end]])
+        self._block = []
+        try:
+            self._found.append((self._start, json.loads(text)))
+        except json.JSONDecodeError:
+            pass
+
+    def _balance(self, line: str) -> Optional[int]:
+        """Track brace depth over line; index just past the closing brace, if reached"""
+        for index, char in enumerate(line):
+            if self._escaped:
+                self._escaped = False
+            elif self._in_string:
+                if char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    return index + 1
+        return None
+
+    def since(self, number: int) -> List[Tuple[int, Any]]:
+        return [found for found in self._found if found[0] >= number]
+
+
+class PaneLineBuffer:
+    """
+    Ring buffer of one pane's output lines
+
+    Lines are numbered from 0 in arrival order; numbers keep increasing after
+    old lines are dropped. Every detector sees each complete line once.
+    """
+
+    def __init__(self, session: str, max_lines: int = DEFAULT_MAX_LINES,
+                 max_line_chars: int = DEFAULT_MAX_LINE_CHARS):
+        self.session = session
+        self.max_line_chars = max_line_chars
+        self._lines: deque = deque(maxlen=max_lines)
+        self._next = 0
+        self._partial = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._changed = threading.Condition()
+        self.closed = False
+
+        self.markers = MarkerDetector()
+        self.errors = ErrorDetector()
+        self.json_blocks = JsonBlockDetector()
+        self._detectors = [self.markers, self.errors, self.json_blocks]
+
+    @property
+    def next_line(self) -> int:
+        """Number the next complete line will get"""
+        with self._changed:
+            return self._next
+
+    @property
+    def first_line(self) -> int:
+        """Number of the oldest line still held"""
+        with self._changed:
+            return self._next - len(self._lines)
+
+    def feed(self, data: bytes):
+        """Add raw pane output"""
+        text = self._decoder.decode(data)
+        if not text:
+            return
+        with self._changed:
+            *complete, self._partial = (self._partial + text).split("\n")
+            self._partial = self._partial[-self.max_line_chars:]
+            for raw in complete:
+                line = clean_line(raw)[:self.max_line_chars]
+                for detector in self._detectors:
+                    detector.scan(self._next, line)
+                self._lines.append(line)
+                self._next += 1
+            if complete:
+                self._changed.notify_all()
+
+    def close(self):
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    def lines_since(self, number: int) -> List[Tuple[int, str]]:
+        """(line number, text) of every held line numbered number or later"""
+        with self._changed:
+            first = self._next - len(self._lines)
+            start = max(number - first, 0)
+            return [(first + index, self._lines[index]) for index in range(start, len(self._lines))]
+
+    def text_since(self, number: int, end: Optional[int] = None) -> str:
+        """Lines from number up to (not including) end, joined"""
+        return "\n".join(line for n, line in self.lines_since(number) if end is None or n < end)
+
+    def last_match(self, pattern: Union[str, Pattern],
+                   since: int = 0) -> Optional[Tuple[int, "re.Match"]]:
+        """Newest held line (numbered since or later) matching pattern, as (line number, match)"""
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        with self._changed:
+            first = self._next - len(self._lines)
+            for index in range(len(self._lines) - 1, max(since - first, 0) - 1, -1):
+                match = pattern.search(self._lines[index])
+                if match:
+                    return first + index, match
+        return None
+
+    def marker_line(self, marker: str, since: int = 0) -> Optional[int]:
+        """Line number of marker's latest (unquoted) occurrence at or after since"""
+        with self._changed:
+            return self.markers.line_of(marker, since)
+
+    def errors_since(self, number: int) -> List[Tuple[int, str]]:
+        with self._changed:
+            return self.errors.since(number)
+
+    def json_since(self, number: int) -> List[Tuple[int, Any]]:
+        """Parsed JSON objects whose first line is numbered number or later"""
+        with self._changed:
+            return self.json_blocks.since(number)
+
+    def wait_for_lines(self, number: int, timeout: Optional[float] = None) -> Optional[int]:
+        """Block until line number exists; returns next_line, or None on timeout/close"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while self._next <= number:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if self.closed or (remaining is not None and remaining <= 0):
+                    return None
+                self._changed.wait(remaining)
+            return self._next
@@ -0,0 +1,282 @@
+"""
+Streaming tmux pane output
+Pane output is piped (tmux pipe-pane) into per-session append-only buffers
+that consumers read by byte offset instead of re-capturing the whole pane
+"""
+
+import logging
+import os
+import re
+import selectors
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Pattern, Tuple, Union
+
+from core.pane_buffer import PaneLineBuffer
+from core.tmux_client import TMUXClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_LIMIT = 4 * 1024 * 1024  # Bytes of output kept per session
+
+
+class PaneStream:
+    """
+    Append-only output buffer for one pane
+
+    Offsets are absolute byte positions since watching started. When the
+    buffer exceeds its limit the oldest bytes are dropped; reads from an
+    offset that was dropped start at the oldest byte still held. The same
+    output is kept as ANSI-stripped, numbered lines in `lines`.
+    """
+
+    def __init__(self, session: str, limit: int = DEFAULT_BUFFER_LIMIT):
+        self.session = session
+        self.limit = limit
+        self._data = bytearray()
+        self._base = 0  # Offset of _data[0]
+        self._changed = threading.Condition()
+        self.closed = False
+        self.lines = PaneLineBuffer(session)
+
+    @property
+    def end_offset(self) -> int:
+        """Offset just past the newest byte"""
+        with self._changed:
+            return self._base + len(self._data)
+
+    def append(self, data: bytes):
+        with self._changed:
+            self._data.extend(data)
+            overflow = len(self._data) - self.limit
+            if overflow > 0:
+                del self._data[:overflow]
+                self._base += overflow
+            self._changed.notify_all()
+        self.lines.feed(data)
+
+    def close(self):
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+        self.lines.close()
+
+    def read(self, offset: int = 0) -> Tuple[bytes, int]:
+        """Bytes from offset to the end, and the new end offset"""
+        with self._changed:
+            start = max(offset - self._base, 0)
+            return bytes(self._data[start:]), self._base + len(self._data)
+
+    def read_lines(self, offset: int = 0) -> Tuple[str, int]:
+        """Complete lines from offset (decoded), and the offset after the last newline"""
+        with self._changed:
+            start = max(offset - self._base, 0)
+            end = self._data.rfind(b"\n", start) + 1
+            if end <= 0:
+                return "", max(offset, self._base)
+            text = self._data[start:end].decode("utf-8", errors="replace")
+            return text, self._base + end
+
+    def wait_for_output(self, offset: int, timeout: Optional[float] = None) -> Optional[int]:
+        """Block until there is output past offset; returns the end offset or None on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while self._base + len(self._data) <= offset and not self.closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+            if self._base + len(self._data) <= offset:
+                return None
+            return self._base + len(self._data)
+
+    def wait_for(self, marker: Union[str, bytes, Pattern], offset: int = 0,
+                 timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Block until marker appears after offset
+
+        marker is a literal (str/bytes) or a compiled bytes regex matched per
+        line. Returns the offset just past the match, or None on timeout.
+        Each complete line is scanned once.
+        """
+        if isinstance(marker, str):
+            marker = marker.encode()
+        if isinstance(marker, bytes):
+            marker = re.compile(re.escape(marker))
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        scan_from = offset
+        with self._changed:
+            while True:
+                start = max(scan_from - self._base, 0)
+                match = marker.search(self._data, start)
+                if match:
+                    return self._base + match.end()
+
+                # Markers never span lines: resume at the last partial line
+                last_newline = self._data.rfind(b"\n", start)
+                if last_newline >= 0:
+                    scan_from = self._base + last_newline + 1
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if self.closed or (remaining is not None and remaining <= 0):
+                    return None
+                self._changed.wait(remaining)
+
+
+class PaneOutputStreamer:
+    """
+    Feeds PaneStreams from tmux pipe-pane
+
+    Each watched pane pipes its output into a FIFO; one selector thread reads
+    every FIFO and appends to the matching stream, waking waiting consumers.
+
+    tmux allows one pipe-pane per pane, so only one process can stream a
+    given pane: watch() refuses panes that are already piped, and a stream
+    whose pipe is replaced (or whose pane dies) is closed with an error
+    instead of silently going quiet. Consumers fall back to capture_pane.
+    """
+
+    def __init__(self, buffer_limit: int = DEFAULT_BUFFER_LIMIT):
+        self.buffer_limit = buffer_limit
+        self._dir = tempfile.mkdtemp(prefix="pane_stream_")
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._streams: Dict[str, PaneStream] = {}
+        # session -> (read fd, keepalive fd until the handshake, path)
+        self._fds: Dict[str, Tuple[int, Optional[int], str]] = {}
+        self._wake_r, self._wake_w = os.pipe()
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start the reader thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._read_loop, daemon=True)
+        self._thread.start()
+        logger.info("📺 Pane output streamer started")
+
+    def stop(self):
+        """Stop piping every pane and the reader thread"""
+        for session in list(self._streams):
+            self.unwatch(session)
+        self._running = False
+        os.write(self._wake_w, b"x")
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        shutil.rmtree(self._dir, ignore_errors=True)
+        logger.info("📺 Pane output streamer stopped")
+
+    def watch(self, session: str) -> Optional[PaneStream]:
+        """Start streaming a session's pane output (returns the existing stream if watched)"""
+        with self._lock:
+            stream = self._streams.get(session)
+            if stream:
+                return stream
+
+            piped = TMUXClient.pane_piped(session)
+            if piped is None:
+                return None
+            if piped:
+                logger.error(f"📺 {session} already has a pipe-pane (another process streaming it?); "
+                             f"not streaming it here")
+                return None
+
+            path = os.path.join(self._dir, f"{len(self._fds)}-{re.sub(r'[^A-Za-z0-9_.-]', '_', session)}")
+            os.mkfifo(path)
+            read_fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            # Holding a writer open stops the FIFO reporting EOF until the
+            # pipe's handshake byte shows its writer is connected
+            keepalive_fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+
+            command = f"exec 3>'{path}' && printf '\\000' >&3 && exec cat >&3"
+            if not TMUXClient.pipe_pane(session, command):
+                os.close(read_fd)
+                os.close(keepalive_fd)
+                os.unlink(path)
+                return None
+
+            stream = PaneStream(session, self.buffer_limit)
+            self._streams[session] = stream
+            self._fds[session] = (read_fd, keepalive_fd, path)
+            self._selector.register(read_fd, selectors.EVENT_READ, stream)
+
+        self.start()
+        logger.debug(f"Streaming output of {session}")
+        return stream
+
+    def unwatch(self, session: str):
+        """Stop streaming a session"""
+        with self._lock:
+            stream = self._streams.pop(session, None)
+            fds = self._fds.pop(session, None)
+            if not stream:
+                return
+            TMUXClient.pipe_pane(session, None)
+            self._release(fds)
+        stream.close()
+
+    def _release(self, fds: Tuple[int, Optional[int], str]):
+        read_fd, keepalive_fd, path = fds
+        self._selector.unregister(read_fd)
+        os.close(read_fd)
+        if keepalive_fd is not None:
+            os.close(keepalive_fd)
+        os.unlink(path)
+
+    def get_stream(self, session: str) -> Optional[PaneStream]:
+        return self._streams.get(session)
+
+    def _read_loop(self):
+        while self._running:
+            for key, _ in self._selector.select(timeout=1.0):
+                if key.fileobj == self._wake_r:
+                    os.read(self._wake_r, 1024)
+                    continue
+                with self._lock:
+                    stream = key.data
+                    fds = self._fds.get(stream.session)
+                    if not fds or fds[0] != key.fileobj:
+                        continue  # Unwatched while selecting
+                    try:
+                        data = os.read(key.fileobj, 65536)
+                    except BlockingIOError:
+                        continue
+
+                    if fds[1] is not None and data[:1] == b"\0":
+                        # Handshake: the pipe's writer is connected, so EOF
+                        # from now on means it went away
+                        os.close(fds[1])
+                        self._fds[stream.session] = (fds[0], None, fds[2])
+                        data = data[1:]
+                    elif not data:
+                        logger.error(f"📺 Output pipe of {stream.session} closed (pane gone or "
+                                     f"its pipe-pane replaced by another process); stream closed")
+                        del self._streams[stream.session]
+                        self._release(self._fds.pop(stream.session))
+                        stream.close()
+                        continue
+                if data:
+                    stream.append(data)
+
+
+# Singleton instance
+_pane_streamer = None
+_pane_streamer_lock = threading.Lock()
+
+
+def get_pane_streamer() -> PaneOutputStreamer:
+    """Get or create the process-wide pane output streamer"""
+    global _pane_streamer
+    with _pane_streamer_lock:
+        if _pane_streamer is None:
+            _pane_streamer = PaneOutputStreamer()
+        return _pane_streamer
@@ -3,29 +3,176 @@ TMUX Client Helper - Centralized TMUX interaction with mandatory delays
 CRITICAL: The delay between send-keys commands is MANDATORY to prevent race conditions
 """
 
+import asyncio
+import atexit
+import re
 import subprocess
+import threading
 import time
 import logging
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, List, Dict, Tuple
 from pathlib import Path
 import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config.settings import TMUX_BIN, TMUX_COMMAND_DELAY, AGENT_SESSIONS, DEBUG
+from config.settings import (
+    TMUX_BIN, TMUX_COMMAND_DELAY, TMUX_CONTROL_MODE, TMUX_SNAPSHOT_TTL, TMUX_DELIVERY_MODE,
+    TMUX_ACK_TIMEOUT, TMUX_ACK_ATTEMPTS, AGENT_SESSIONS, DEBUG
+)
+from core.pane_buffer import ANSI_ESCAPE, CONTROL_CHARS
+from core.tmux_control import CONTROL_SESSION, TmuxControlClient, TmuxControlError, get_control_client
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG if DEBUG else logging.INFO)
 logger = logging.getLogger(__name__)
 
+# One single-thread lane per session: sends to a session run in submission
+# order, while different sessions run (and wait out their delay) in parallel.
+# A lane is closed when its session is killed; beyond MAX_SESSION_LANES the
+# least recently used idle lanes are closed too.
+MAX_SESSION_LANES = 64
+_session_lanes: "OrderedDict[str, ThreadPoolExecutor]" = OrderedDict()
+_lane_pending: Counter = Counter()  # Queued or running sends per session
+_session_lanes_lock = threading.Lock()
+
+
+# Bulk snapshots shared by concurrent callers: (sessions, lines) -> (taken at, snapshot)
+_snapshots: Dict[Tuple[Tuple[str, ...], int], Tuple[float, Dict[str, Optional[str]]]] = {}
+_snapshots_lock = threading.Lock()  # Guards _snapshots and _snapshots_inflight only
+# Captures in progress: later callers for the same key wait on the first one's
+_snapshots_inflight: Dict[Tuple[Tuple[str, ...], int], Future] = {}
+
+# Separates panes in a chained capture-pane invocation
+_CAPTURE_DELIMITER = "__tmux_client_capture__"
+
+
+def _chained_capture_args(sessions: List[str], lines: int) -> List[str]:
+    """tmux arguments capturing several panes in one invocation"""
+    args = []
+    for session in sessions:
+        args.extend(["display-message", "-p", _CAPTURE_DELIMITER, ";",
+                     "capture-pane", "-t", session, "-p", "-S", f"-{lines}", ";"])
+    return args[:-1]
+
+
+def _split_chained_capture(stdout: str) -> List[str]:
+    """Per-pane texts from _chained_capture_args output (stops at a failed pane)"""
+    return stdout.split(f"{_CAPTURE_DELIMITER}\n")[1:]
+
+
+# Acknowledged delivery: trailing characters of the text awaited in the echo
+ACK_TAIL_CHARS = 24
+
+# Per-session send_command outcomes for delivery_stats()
+_delivery_stats: Dict[str, Counter] = defaultdict(Counter)
+_delivery_lock = threading.Lock()
+
+
+def _rendered_echo(data: bytes) -> str:
+    """Streamed bytes as typed text: escapes, overwritten characters and line wraps removed"""
+    text = ANSI_ESCAPE.sub("", data.decode("utf-8", errors="replace"))
+    text = re.sub(r"[^\x08]\x08", "", text)
+    return CONTROL_CHARS.sub("", text).replace("\n", "")
+
+
+def _echo_seen(stream, offset: int, tail: str, timeout: float) -> bool:
+    """Wait until tail shows up in the stream's output after offset"""
+    deadline = time.monotonic() + timeout
+    while True:
+        data, end = stream.read(offset)
+        if tail in _rendered_echo(data):
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or stream.closed or stream.wait_for_output(end, remaining) is None:
+            return tail in _rendered_echo(stream.read(offset)[0])
+
+
+def _record_delivery(session: str, delivered: bool, attempts: int, seconds: float):
+    with _delivery_lock:
+        stats = _delivery_stats[session]
+        stats['sent'] += 1
+        stats['delivered' if delivered else 'failed'] += 1
+        stats['retries'] += attempts - 1
+        stats['latency_sum'] += seconds
+        stats['latency_max'] = max(stats['latency_max'], seconds)
+
+
+def _submit_to_lane(session: str, fn, *args) -> Future:
+    """Run fn(*args) on the session's lane, after everything already queued there"""
+    def run():
+        try:
+            return fn(*args)
+        finally:
+            _lane_done(session)
+
+    with _session_lanes_lock:
+        lane = _session_lanes.pop(session, None)
+        if lane is None:
+            lane = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"tmux-{session}")
+        _session_lanes[session] = lane  # Most recently used last
+        _lane_pending[session] += 1
+        future = lane.submit(run)
+        _evict_idle_lanes()
+    return future
+
+
+def _lane_done(session: str):
+    with _session_lanes_lock:
+        _lane_pending[session] -= 1
+        if _lane_pending[session] <= 0:
+            del _lane_pending[session]
+
+
+def _evict_idle_lanes():
+    """Close least recently used idle lanes over MAX_SESSION_LANES (lock held)"""
+    excess = len(_session_lanes) - MAX_SESSION_LANES
+    if excess <= 0:
+        return
+    for session in [s for s in _session_lanes if not _lane_pending.get(s)][:excess]:
+        _session_lanes.pop(session).shutdown(wait=False)
+
+
+def _close_session_lane(session: str):
+    """Let the session's lane finish its queued sends, then end its thread"""
+    with _session_lanes_lock:
+        lane = _session_lanes.pop(session, None)
+    if lane:
+        lane.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown_session_lanes():
+    with _session_lanes_lock:
+        lanes = list(_session_lanes.values())
+        _session_lanes.clear()
+    for lane in lanes:
+        lane.shutdown(wait=False)
+
 
 class TMUXClient:
     """
     Centralized TMUX client with mandatory delay enforcement
 
     CRITICAL: Never bypass the delay in send_command() - it prevents 30-40% command loss
+
+    With TMUX_CONTROL_MODE enabled, commands go over one persistent
+    `tmux -C` connection (see core.tmux_control) instead of a subprocess each.
     """
 
+    @staticmethod
+    def _control() -> Optional[TmuxControlClient]:
+        """Pooled control connection, or None to use subprocesses"""
+        if not TMUX_CONTROL_MODE:
+            return None
+        try:
+            return get_control_client()
+        except (OSError, TmuxControlError) as e:
+            logger.warning(f"tmux control mode unavailable, using subprocesses: {e}")
+            return None
+
     @staticmethod
     def send_command(session: str, command: str, delay: float = None) -> bool:
         """
@@ -40,10 +187,31 @@ class TMUXClient:
             True if successful, False otherwise
 
         WARNING: DO NOT REMOVE OR REDUCE THE DELAY - IT IS CRITICAL FOR RELIABILITY
+
+        With TMUX_DELIVERY_MODE=ack (and no explicit delay) Enter is sent
+        once the pane has echoed the text instead of after the fixed delay.
         """
+        if delay is None and TMUX_DELIVERY_MODE == "ack" and "\n" not in command:
+            return TMUXClient.send_command_acked(session, command)
         if delay is None:
             delay = TMUX_COMMAND_DELAY
 
+        start = time.perf_counter()
+        sent = TMUXClient._send_with_delay(session, command, delay)
+        _record_delivery(session, sent, 1, time.perf_counter() - start)
+        return sent
+
+    @staticmethod
+    def _send_with_delay(session: str, command: str, delay: float) -> bool:
+        """Text, delay, Enter over the control connection or subprocesses (not recorded)"""
+        control = TMUXClient._control()
+        if control and "\n" not in command:
+            return TMUXClient._send_command_control(control, session, command, delay)
+        return TMUXClient._send_command_delayed(session, command, delay)
+
+    @staticmethod
+    def _send_command_delayed(session: str, command: str, delay: float) -> bool:
+        """send_command through subprocesses: text, delay, Enter"""
         try:
             # Log the command being sent
             logger.debug(f"Sending to {session}: {command[:100]}...")
@@ -86,6 +254,125 @@ class TMUXClient:
             logger.error(f"Error sending command to {session}: {e}")
             return False
 
+    @staticmethod
+    def send_command_acked(session: str, command: str) -> bool:
+        """
+        Send command, confirming the pane echoed the text before pressing Enter
+
+        The text's tail is awaited in the pane output streamed after the keys
+        were sent (see core.pane_stream), so an earlier echo of the same
+        command never counts. If it does not show up, the input line is
+        cleared (C-u) and the text resent, doubling the wait each attempt.
+
+        Returns:
+            True if the text was echoed and Enter sent, False otherwise
+        """
+        # pane_stream imports this module
+        from core.pane_stream import get_pane_streamer
+
+        try:
+            stream = get_pane_streamer().watch(session)
+        except OSError as e:
+            logger.warning(f"Pane streaming unavailable, using the fixed delay: {e}")
+            stream = None
+        if stream is None:
+            return TMUXClient.send_command(session, command, TMUX_COMMAND_DELAY)
+
+        start = time.perf_counter()
+        tail = command.rstrip()[-ACK_TAIL_CHARS:]
+        wait = TMUX_ACK_TIMEOUT
+        attempt = 0
+        while attempt < TMUX_ACK_ATTEMPTS:
+            attempt += 1
+            offset = stream.end_offset
+            if not TMUXClient.send_keys(session, command):
+                break
+
+            if not tail or _echo_seen(stream, offset, tail, wait):
+                sent = TMUXClient.send_keys(session, "Enter")
+                _record_delivery(session, sent, attempt, time.perf_counter() - start)
+                return sent
+
+            if stream.closed:
+                logger.warning(f"Output stream of {session} closed, using the fixed delay")
+                TMUXClient.send_keys(session, "C-u")
+                attempt += 1
+                sent = TMUXClient._send_with_delay(session, command, TMUX_COMMAND_DELAY)
+                _record_delivery(session, sent, attempt, time.perf_counter() - start)
+                return sent
+
+            logger.warning(f"No echo from {session} within {wait * 1000:.0f}ms "
+                           f"(attempt {attempt}/{TMUX_ACK_ATTEMPTS})")
+            TMUXClient.send_keys(session, "C-u")
+            wait *= 2
+
+        logger.error(f"Command not delivered to {session} after {attempt} attempts")
+        _record_delivery(session, False, attempt, time.perf_counter() - start)
+        return False
+
+    @staticmethod
+    def delivery_stats() -> Dict[str, Dict]:
+        """Per-session send_command success rate and latency"""
+        with _delivery_lock:
+            return {session: {
+                'sent': int(stats['sent']),
+                'delivered': int(stats['delivered']),
+                'failed': int(stats['failed']),
+                'retries': int(stats['retries']),
+                'success_rate': stats['delivered'] / stats['sent'],
+                'avg_latency_ms': stats['latency_sum'] / stats['sent'] * 1000,
+                'max_latency_ms': stats['latency_max'] * 1000,
+            } for session, stats in sorted(_delivery_stats.items())}
+
+    @staticmethod
+    def _send_command_control(control: TmuxControlClient, session: str,
+                              command: str, delay: float) -> bool:
+        """send_command over the control connection (same text, delay, Enter)"""
+        try:
+            logger.debug(f"Sending to {session}: {command[:100]}...")
+
+            ok, output = control.try_command("send-keys", "-t", session, command)
+            if not ok:
+                logger.error(f"Failed to send command: {' '.join(output)}")
+                return False
+
+            # MANDATORY DELAY - DO NOT REMOVE
+            time.sleep(delay)
+
+            ok, output = control.try_command("send-keys", "-t", session, "Enter")
+            if not ok:
+                logger.error(f"Failed to send Enter: {' '.join(output)}")
+                return False
+
+            logger.debug(f"Command sent successfully to {session}")
+            return True
+
+        except TmuxControlError as e:
+            logger.error(f"Error sending command to {session}: {e}")
+            return False
+
+    @staticmethod
+    def send_command_async(session: str, command: str, delay: float = None) -> Future:
+        """
+        Queue send_command on the session's lane
+
+        Commands for one session are delivered in the order they were queued;
+        the returned future resolves to send_command's result.
+        """
+        return _submit_to_lane(session, TMUXClient.send_command, session, command, delay)
+
+    @staticmethod
+    def broadcast(sessions: List[str], command: str, delay: float = None) -> Dict[str, bool]:
+        """
+        Send command to several sessions concurrently
+
+        Each session still gets text, delay, Enter in order, but the delays
+        overlap, so the whole broadcast takes about one delay.
+        """
+        futures = {session: TMUXClient.send_command_async(session, command, delay)
+                   for session in dict.fromkeys(sessions)}
+        return {session: future.result() for session, future in futures.items()}
+
     @staticmethod
     def send_keys(session: str, keys: str) -> bool:
         """
@@ -98,6 +385,14 @@ class TMUXClient:
         Returns:
             True if successful, False otherwise
         """
+        control = TMUXClient._control()
+        if control and "\n" not in keys:
+            try:
+                return control.try_command("send-keys", "-t", session, keys)[0]
+            except TmuxControlError as e:
+                logger.error(f"Error sending keys to {session}: {e}")
+                return False
+
         try:
             result = subprocess.run(
                 [TMUX_BIN, "send-keys", "-t", session, keys],
@@ -136,10 +431,24 @@ class TMUXClient:
         Returns:
             Captured text or None if failed
         """
+        args = ["capture-pane", "-t", session, "-p"]
+        if lines:
+            args.extend(["-S", f"-{lines}"])
+
+        control = TMUXClient._control()
+        if control:
+            try:
+                ok, output = control.try_command(*args, timeout=10)
+            except TmuxControlError as e:
+                logger.error(f"Error capturing pane from {session}: {e}")
+                return None
+            if not ok:
+                logger.error(f"Failed to capture pane: {' '.join(output)}")
+                return None
+            return "".join(f"{line}\n" for line in output)
+
         try:
-            cmd = [TMUX_BIN, "capture-pane", "-t", session, "-p"]
-            if lines:
-                cmd.extend(["-S", f"-{lines}"])
+            cmd = [TMUX_BIN] + args
 
             result = subprocess.run(
                 cmd,
@@ -161,6 +470,62 @@ class TMUXClient:
             logger.error(f"Error capturing pane from {session}: {e}")
             return None
 
+    @staticmethod
+    def pipe_pane(session: str, command: Optional[str] = None) -> bool:
+        """
+        Pipe a pane's output into a shell command (tmux pipe-pane)
+
+        Args:
+            session: TMUX session name
+            command: Shell command receiving the output on stdin; None stops piping
+
+        Returns:
+            True if successful, False otherwise
+        """
+        args = ["pipe-pane", "-t", session]
+        if command:
+            args.append(command)
+
+        control = TMUXClient._control()
+        if control:
+            try:
+                return control.try_command(*args)[0]
+            except TmuxControlError as e:
+                logger.error(f"Error piping pane of {session}: {e}")
+                return False
+
+        try:
+            result = subprocess.run([TMUX_BIN] + args, capture_output=True, text=True, timeout=5)
+            if result.returncode != 0:
+                logger.error(f"Failed to pipe pane: {result.stderr}")
+            return result.returncode == 0
+        except Exception as e:
+            logger.error(f"Error piping pane of {session}: {e}")
+            return False
+
+    @staticmethod
+    def pane_piped(session: str) -> Optional[bool]:
+        """Whether a pane already has a pipe-pane attached (None if the session is missing)"""
+        args = ["display-message", "-p", "-t", session, "#{pane_pipe}"]
+
+        control = TMUXClient._control()
+        if control:
+            try:
+                ok, lines = control.try_command(*args)
+            except TmuxControlError as e:
+                logger.error(f"Error checking pipe of {session}: {e}")
+                return None
+            return lines == ["1"] if ok else None
+
+        try:
+            result = subprocess.run([TMUX_BIN] + args, capture_output=True, text=True, timeout=5)
+            if result.returncode != 0:
+                return None
+            return result.stdout.strip() == "1"
+        except Exception as e:
+            logger.error(f"Error checking pipe of {session}: {e}")
+            return None
+
     @staticmethod
     def session_exists(session: str) -> bool:
         """
@@ -172,6 +537,13 @@ class TMUXClient:
         Returns:
             True if session exists, False otherwise
         """
+        control = TMUXClient._control()
+        if control:
+            try:
+                return control.try_command("has-session", "-t", session)[0]
+            except TmuxControlError:
+                return False
+
         try:
             result = subprocess.run(
                 [TMUX_BIN, "has-session", "-t", session],
@@ -182,6 +554,106 @@ class TMUXClient:
         except Exception:
             return False
 
+    @staticmethod
+    def capture_all(sessions: List[str], lines: int = 10) -> Dict[str, Optional[str]]:
+        """
+        Liveness and recent output of many sessions in one tmux exchange
+
+        Args:
+            sessions: TMUX session names
+            lines: Recent lines to capture per pane (0 = liveness only)
+
+        Returns:
+            Dictionary mapping session to captured text ("" when lines=0),
+            or None if the session does not exist
+        """
+        sessions = list(dict.fromkeys(sessions))
+        control = TMUXClient._control()
+        if control:
+            try:
+                if lines:
+                    commands = [("capture-pane", "-t", s, "-p", "-S", f"-{lines}") for s in sessions]
+                else:
+                    commands = [("has-session", "-t", s) for s in sessions]
+                replies = control.try_commands(commands, timeout=10)
+                return {session: "".join(f"{line}\n" for line in output) if ok else None
+                        for session, (ok, output) in zip(sessions, replies)}
+            except TmuxControlError as e:
+                logger.error(f"Error capturing panes: {e}")
+                return {session: None for session in sessions}
+
+        # Subprocess: one list-sessions, then one chained capture of the live ones
+        alive = set(TMUXClient.list_sessions())
+        snapshot = {session: ("" if session in alive else None) for session in sessions}
+        targets = [session for session in sessions if session in alive]
+        if not lines or not targets:
+            return snapshot
+
+        try:
+            result = subprocess.run([TMUX_BIN] + _chained_capture_args(targets, lines),
+                                    capture_output=True, text=True, timeout=10)
+        except Exception as e:
+            logger.error(f"Error capturing panes: {e}")
+            return snapshot
+
+        sections = _split_chained_capture(result.stdout)
+        for session, text in zip(targets, sections):
+            snapshot[session] = text
+
+        # A session that vanished mid-chain stops the rest: capture those singly
+        for session in targets[len(sections):]:
+            snapshot[session] = TMUXClient.capture_pane(session, lines)
+        return snapshot
+
+    @staticmethod
+    def snapshot(sessions: List[str], lines: int = 10,
+                 max_age: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        capture_all() shared briefly between callers
+
+        Callers asking for the same sessions within max_age seconds (default
+        TMUX_SNAPSHOT_TTL) get the same result instead of each querying tmux.
+        """
+        if max_age is None:
+            max_age = TMUX_SNAPSHOT_TTL
+        key = (tuple(dict.fromkeys(sessions)), lines)
+
+        with _snapshots_lock:
+            cached = _snapshots.get(key)
+            if cached and time.time() - cached[0] < max_age:
+                return cached[1]
+            pending = _snapshots_inflight.get(key)
+            capturing = pending is None
+            if capturing:
+                pending = _snapshots_inflight[key] = Future()
+
+        if not capturing:
+            return pending.result()
+
+        # Captured outside the lock: requests for other sessions are not held up
+        try:
+            snapshot = TMUXClient.capture_all(list(key[0]), lines)
+        except BaseException as e:
+            with _snapshots_lock:
+                del _snapshots_inflight[key]
+            pending.set_exception(e)
+            raise
+
+        with _snapshots_lock:
+            now = time.time()
+            for stale in [k for k, (taken, _) in _snapshots.items() if now - taken > max_age]:
+                del _snapshots[stale]
+            _snapshots[key] = (now, snapshot)
+            del _snapshots_inflight[key]
+        pending.set_result(snapshot)
+        return snapshot
+
+    @staticmethod
+    def agent_snapshot(lines: int = 10, max_age: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """snapshot() of every configured agent, keyed by agent ID"""
+        captured = TMUXClient.snapshot(list(AGENT_SESSIONS.values()), lines, max_age)
+        return {agent_id: captured[session] for agent_id, session in AGENT_SESSIONS.items()}
+
     @staticmethod
     def create_session(session: str, command: Optional[str] = None,
                       detached: bool = True) -> bool:
@@ -236,6 +708,7 @@ class TMUXClient:
         Returns:
             True if successful, False otherwise
         """
+        _close_session_lane(session)
         try:
             result = subprocess.run(
                 [TMUX_BIN, "kill-session", "-t", session],
@@ -264,6 +737,15 @@ class TMUXClient:
         Returns:
             List of session names
         """
+        control = TMUXClient._control()
+        if control:
+            try:
+                ok, output = control.try_command("list-sessions", "-F", "#{session_name}")
+            except TmuxControlError as e:
+                logger.error(f"Error listing sessions: {e}")
+                return []
+            return [s.strip() for s in output if s.strip() and s.strip() != CONTROL_SESSION] if ok else []
+
         try:
             result = subprocess.run(
                 [TMUX_BIN, "list-sessions", "-F", "#{session_name}"],
@@ -362,7 +844,7 @@ class TMUXClient:
     @staticmethod
     def broadcast_to_agents(command: str, exclude: Optional[List[str]] = None) -> Dict[str, bool]:
         """
-        Broadcast command to all agents
+        Broadcast command to all agents concurrently
 
         Args:
             command: Command to broadcast
@@ -371,16 +853,12 @@ class TMUXClient:
         Returns:
             Dictionary mapping agent_id to success status
         """
-        results = {}
         exclude = exclude or []
+        targets = {agent_id: session for agent_id, session in AGENT_SESSIONS.items()
+                   if agent_id not in exclude}
 
-        for agent_id, session in AGENT_SESSIONS.items():
-            if agent_id in exclude:
-                continue
-
-            results[agent_id] = TMUXClient.send_command(session, command)
-
-        return results
+        sent = TMUXClient.broadcast(list(targets.values()), command)
+        return {agent_id: sent[session] for agent_id, session in targets.items()}
 
     @staticmethod
     def restart_session(session: str, command: Optional[str] = None) -> bool:
@@ -411,12 +889,195 @@ class TMUXClient:
         Returns:
             Dictionary mapping agent_id to health status
         """
-        health = {}
+        return {agent_id: output is not None
+                for agent_id, output in TMUXClient.agent_snapshot(lines=0).items()}
 
-        for agent_id, session in AGENT_SESSIONS.items():
-            health[agent_id] = TMUXClient.session_exists(session)
 
-        return health
+# ============================================================================
+# ASYNC CLIENT
+# ============================================================================
+
+class AsyncTMUXClient:
+    """
+    Non-blocking TMUXClient for asyncio code (FastAPI handlers)
+
+    Commands run through asyncio subprocesses (or the control connection
+    when TMUX_CONTROL_MODE is on) and the mandatory text -> Enter delay is an
+    await, so the event loop keeps serving while keystrokes are delivered.
+
+    Sends to one session are queued and delivered in order by a per-session
+    task; keystrokes queued while it is busy are coalesced, so each command's
+    Enter goes out in the same send-keys call as the next command's text.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._senders: Dict[str, asyncio.Task] = {}
+        self._snapshots: Dict[Tuple[Tuple[str, ...], int], Tuple[float, Dict[str, Optional[str]]]] = {}
+        self._snapshots_inflight: Dict[Tuple[Tuple[str, ...], int], asyncio.Future] = {}
+        self.send_keys_calls = 0
+
+    # ------------------------------------------------------------- commands
+
+    async def _run(self, args: List[str], timeout: float = 10) -> Tuple[bool, str]:
+        """Run one tmux command, returning (succeeded, stdout)"""
+        control = TMUXClient._control()
+        if control and ";" not in args:
+            try:
+                ok, output = await asyncio.to_thread(control.try_command, *args, timeout=timeout)
+                return ok, "".join(f"{line}\n" for line in output)
+            except (TmuxControlError, ValueError) as e:
+                logger.debug(f"Control mode failed, using a subprocess: {e}")
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                TMUX_BIN, *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logger.error(f"Timeout running tmux {args[0]}")
+            return False, ""
+        except OSError as e:
+            logger.error(f"Error running tmux {args[0]}: {e}")
+            return False, ""
+
+        if proc.returncode != 0:
+            logger.debug(f"tmux {args[0]} failed: {stderr.decode(errors='replace').strip()}")
+        return proc.returncode == 0, stdout.decode(errors="replace")
+
+    async def send_command(self, session: str, command: str, delay: float = None) -> bool:
+        """Send text, wait the MANDATORY delay, then Enter (delivered in order per session)"""
+        return await self._enqueue(session, ("command", command,
+                                             TMUX_COMMAND_DELAY if delay is None else delay))
+
+    async def send_keys(self, session: str, keys: str) -> bool:
+        """Send raw keys without Enter (delivered in order per session)"""
+        return await self._enqueue(session, ("keys", keys, 0))
+
+    async def capture_pane(self, session: str, lines: Optional[int] = None) -> Optional[str]:
+        """Capture output from a pane, or None if it failed"""
+        args = ["capture-pane", "-t", session, "-p"]
+        if lines:
+            args.extend(["-S", f"-{lines}"])
+        ok, output = await self._run(args)
+        return output if ok else None
+
+    async def session_exists(self, session: str) -> bool:
+        return (await self._run(["has-session", "-t", session], timeout=5))[0]
+
+    async def list_sessions(self) -> List[str]:
+        ok, output = await self._run(["list-sessions", "-F", "#{session_name}"], timeout=5)
+        return [s.strip() for s in output.splitlines()
+                if s.strip() and s.strip() != CONTROL_SESSION] if ok else []
+
+    async def capture_all(self, sessions: List[str], lines: int = 10) -> Dict[str, Optional[str]]:
+        """Async TMUXClient.capture_all (None for sessions that are not running)"""
+        sessions = list(dict.fromkeys(sessions))
+        if TMUXClient._control():
+            return await asyncio.to_thread(TMUXClient.capture_all, sessions, lines)
+
+        alive = set(await self.list_sessions())
+        snapshot = {session: ("" if session in alive else None) for session in sessions}
+        targets = [session for session in sessions if session in alive]
+        if not lines or not targets:
+            return snapshot
+
+        _, output = await self._run(_chained_capture_args(targets, lines))
+        sections = _split_chained_capture(output)
+        for session, text in zip(targets, sections):
+            snapshot[session] = text
+        for session in targets[len(sections):]:
+            snapshot[session] = await self.capture_pane(session, lines)
+        return snapshot
+
+    async def snapshot(self, sessions: List[str], lines: int = 10,
+                       max_age: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """capture_all() shared between concurrent requests for max_age seconds"""
+        if max_age is None:
+            max_age = TMUX_SNAPSHOT_TTL
+        key = (tuple(dict.fromkeys(sessions)), lines)
+
+        cached = self._snapshots.get(key)
+        if cached and time.time() - cached[0] < max_age:
+            return cached[1]
+        pending = self._snapshots_inflight.get(key)
+        if pending is not None:
+            # shield: a cancelled waiter must not cancel the shared capture
+            return await asyncio.shield(pending)
+
+        pending = self._snapshots_inflight[key] = asyncio.ensure_future(
+            self.capture_all(list(key[0]), lines))
+        try:
+            snapshot = await asyncio.shield(pending)
+        finally:
+            if self._snapshots_inflight.get(key) is pending:
+                del self._snapshots_inflight[key]
+
+        now = time.time()
+        for stale in [k for k, (taken, _) in self._snapshots.items() if now - taken > max_age]:
+            del self._snapshots[stale]
+        self._snapshots[key] = (now, snapshot)
+        return snapshot
+
+    # --------------------------------------------------------------- sending
+
+    async def _enqueue(self, session: str, item: Tuple[str, str, float]) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(session)
+        if queue is None:
+            queue = self._queues[session] = asyncio.Queue()
+        queue.put_nowait(item + (future,))
+
+        if session not in self._senders:
+            self._senders[session] = asyncio.create_task(self._sender(session, queue))
+        return await future
+
+    async def _sender(self, session: str, queue: asyncio.Queue):
+        """Deliver a session's queued keystrokes, coalescing whatever is waiting"""
+        try:
+            while not queue.empty():
+                batch = []
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                await self._deliver(session, batch)
+        finally:
+            del self._senders[session]
+
+    async def _deliver(self, session: str, batch: list):
+        args, settled_by_next_call = [], []
+        for kind, text, delay, future in batch:
+            args.append(text)
+            if kind == "keys":
+                settled_by_next_call.append(future)
+                continue
+
+            ok = await self._send_keys_args(session, args)
+            self._settle(settled_by_next_call, ok)
+            if not ok:
+                self._settle([future], False)
+                args, settled_by_next_call = [], []
+                continue
+
+            # MANDATORY DELAY - DO NOT REMOVE
+            await asyncio.sleep(delay)
+            args, settled_by_next_call = ["Enter"], [future]
+
+        if args:
+            self._settle(settled_by_next_call, await self._send_keys_args(session, args))
+
+    async def _send_keys_args(self, session: str, keys: List[str]) -> bool:
+        self.send_keys_calls += 1
+        ok, _ = await self._run(["send-keys", "-t", session] + keys, timeout=5)
+        if not ok:
+            logger.error(f"Failed to send keys to {session}")
+        return ok
+
+    @staticmethod
+    def _settle(futures: list, ok: bool):
+        for future in futures:
+            if not future.done():
+                future.set_result(ok)
 
 
 # ============================================================================
@@ -434,12 +1095,8 @@ def send_to_all_agents(command: str, exclude_supervisor: bool = True) -> Dict[st
 
 def get_all_agent_outputs(lines: int = 10) -> Dict[str, str]:
     """Get recent output from all agents"""
-    outputs = {}
-    for agent_id in AGENT_SESSIONS.keys():
-        output = TMUXClient.capture_agent_output(agent_id, lines)
-        if output:
-            outputs[agent_id] = output
-    return outputs
+    return {agent_id: output for agent_id, output in TMUXClient.agent_snapshot(lines).items()
+            if output}
 
 def restart_all_agents(command: str = "claude") -> Dict[str, bool]:
     """Restart all agent sessions"""
@@ -0,0 +1,221 @@
+"""
+Persistent tmux control-mode connection
+Multiplexes tmux commands over one `tmux -C` pipe instead of forking per command
+"""
+
+import logging
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.settings import TMUX_BIN
+
+logger = logging.getLogger(__name__)
+
+# Session the control client attaches to; destroyed with its last client
+CONTROL_SESSION = "_tmux_control"
+
+
+class TmuxControlError(Exception):
+    """Raised when the control connection is down or a command times out"""
+    pass
+
+
+def quote(arg: str) -> str:
+    """Quote one argument for the tmux command parser"""
+    if "\n" in arg:
+        raise ValueError("tmux control commands cannot contain newlines")
+    return "'" + arg.replace("'", "'\\''") + "'"
+
+
+class _Pending:
+    """Reply slot for one command, filled by the reader thread"""
+
+    __slots__ = ("done", "ok", "lines")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+        self.lines: List[str] = []
+
+
+class TmuxControlClient:
+    """
+    One long-lived `tmux -C` client
+
+    tmux answers commands in the order they were written, wrapping each reply
+    in %begin/%end (or %error), so replies are matched to a FIFO of pending
+    commands. Lines starting with % outside a reply are notifications
+    (%output, %sessions-changed, ...) and go to registered listeners.
+    """
+
+    def __init__(self, tmux_bin: str = TMUX_BIN, socket_name: Optional[str] = None,
+                 timeout: float = 5.0):
+        self.tmux_bin = tmux_bin
+        self.socket_name = socket_name
+        self.timeout = timeout
+        self._proc = None
+        self._reader = None
+        self._write_lock = threading.Lock()
+        self._pending: deque = deque()
+        self._listeners: List[Callable[[str, str], None]] = []
+        self._alive = False
+        self._attached = threading.Event()
+
+    @property
+    def alive(self) -> bool:
+        return self._alive and self._proc is not None and self._proc.poll() is None
+
+    def start(self):
+        """Spawn the control client and its reader thread"""
+        cmd = [self.tmux_bin]
+        if self.socket_name:
+            cmd.extend(["-L", self.socket_name])
+        cmd.extend(["-C", "new-session", "-A", "-s", CONTROL_SESSION])
+
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                      stderr=subprocess.DEVNULL, bufsize=0)
+        self._alive = True
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+        # Commands written before the attach completes can run ahead of it
+        if not self._attached.wait(self.timeout):
+            self.close()
+            raise TmuxControlError("tmux control client did not attach")
+        self.command("set-option", "-t", CONTROL_SESSION, "destroy-unattached", "on")
+        logger.info(f"🔌 tmux control connection started (pid {self._proc.pid})")
+
+    def close(self):
+        """Detach the control client"""
+        self._alive = False
+        if self._proc:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+        if self._reader:
+            self._reader.join(timeout=2)
+        self._fail_pending()
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """Call callback(name, rest) for every notification, e.g. ("output", "%1 text")"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, str], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def command(self, *args: str, timeout: Optional[float] = None) -> List[str]:
+        """Run one tmux command, returning its output lines (raises on %error)"""
+        ok, lines = self.try_command(*args, timeout=timeout)
+        if not ok:
+            raise TmuxControlError(" ".join(lines) or f"{args[0]} failed")
+        return lines
+
+    def try_command(self, *args: str, timeout: Optional[float] = None) -> Tuple[bool, List[str]]:
+        """Run one tmux command, returning (succeeded, output lines)"""
+        return self.try_commands([args], timeout=timeout)[0]
+
+    def try_commands(self, commands: List[Sequence[str]],
+                     timeout: Optional[float] = None) -> List[Tuple[bool, List[str]]]:
+        """
+        Run several commands in one write, returning (succeeded, output lines) each
+
+        Unlike a `;`-chained command line, a failing command does not stop
+        the ones after it.
+        """
+        data = b"".join((" ".join(quote(arg) for arg in args) + "\n").encode()
+                        for args in commands)
+        pendings = [_Pending() for _ in commands]
+
+        with self._write_lock:
+            if not self.alive:
+                raise TmuxControlError("tmux control connection is closed")
+            self._pending.extend(pendings)
+            try:
+                self._proc.stdin.write(data)
+            except OSError as e:
+                self._alive = False
+                raise TmuxControlError(f"tmux control write failed: {e}")
+
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        for args, pending in zip(commands, pendings):
+            if not pending.done.wait(max(deadline - time.monotonic(), 0)):
+                raise TmuxControlError(f"Timeout waiting for tmux {args[0]}")
+            if not self._alive and not pending.ok and not pending.lines:
+                raise TmuxControlError("tmux control connection closed")
+        return [(pending.ok, pending.lines) for pending in pendings]
+
+    def _read_loop(self):
+        current = None
+        try:
+            for raw in self._proc.stdout:
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+
+                if current is not None:
+                    if line.startswith(("%end ", "%error ")) and line.split(" ")[2:3] == [current[1]]:
+                        pending = current[0]
+                        pending.ok = line.startswith("%end ")
+                        pending.done.set()
+                        current = None
+                    else:
+                        current[0].lines.append(line)
+                    continue
+
+                if line.startswith("%begin "):
+                    _, _, number, flags = line.split(" ", 3)
+                    # Flag 1 marks replies to this client's own commands
+                    if int(flags) & 1 and self._pending:
+                        current = (self._pending.popleft(), number)
+                    else:
+                        current = (_Pending(), number)
+                elif line.startswith("%exit"):
+                    break
+                elif line.startswith("%"):
+                    name, _, rest = line[1:].partition(" ")
+                    if name == "session-changed":
+                        self._attached.set()
+                    for listener in list(self._listeners):
+                        try:
+                            listener(name, rest)
+                        except Exception as e:
+                            logger.error(f"tmux notification listener failed: {e}")
+        except (OSError, ValueError) as e:
+            logger.debug(f"tmux control reader stopped: {e}")
+
+        if self._alive:
+            logger.warning("🔌 tmux control connection closed")
+        self._alive = False
+        self._fail_pending()
+
+    def _fail_pending(self):
+        while self._pending:
+            self._pending.popleft().done.set()
+
+
+# Pool: one control connection per tmux server socket
+_clients: Dict[Optional[str], TmuxControlClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_control_client(socket_name: Optional[str] = None) -> TmuxControlClient:
+    """Shared control connection for a tmux server, reconnecting if it died"""
+    with _clients_lock:
+        client = _clients.get(socket_name)
+        if client is None or not client.alive:
+            client = TmuxControlClient(socket_name=socket_name)
+            client.start()
+            _clients[socket_name] = client
+        return client
+
+
+def close_control_clients():
+    """Close every pooled control connection"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
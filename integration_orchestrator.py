@@ -16,6 +16,8 @@ import requests
 from pathlib import Path
 import logging
 
+from core.db_pool import connect as db_connect
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,22 +34,10 @@ class IntegrationOrchestrator:
         ]
         self.api_base = 'http://localhost:5001'
         self.gateway_base = 'http://localhost:8888'
-        # Use write-ahead logging to prevent locking
-        self._init_database()
-
-    def _init_database(self):
-        """Initialize database with proper settings"""
-        conn = sqlite3.connect(self.db_path, timeout=30)
-        # Enable WAL mode to prevent locking
-        conn.execute('PRAGMA journal_mode=WAL')
-        conn.execute('PRAGMA synchronous=NORMAL')
-        conn.close()
 
     def _get_db_connection(self):
-        """Get a database connection with timeout"""
-        conn = sqlite3.connect(self.db_path, timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
-        return conn
+        """Get a pooled database connection"""
+        return db_connect(self.db_path)
 
     def verify_system_health(self) -> Dict[str, Any]:
         """Verifica che tutti i componenti siano attivi"""
@@ -19,6 +19,8 @@ sys.path.insert(0, str(Path(__file__).parent))  # Also add langgraph-test dir
 from shared_state.manager import SharedStateManager
 from shared_state.models import TaskPriority
 from config.settings import PROJECT_ROOT, AGENT_SESSIONS
+from core.pane_buffer import PaneLineBuffer
+from core.pane_stream import get_pane_streamer
 
 class SupervisorAgent:
     """Agent Supervisor - coordina tutti gli altri agenti"""
@@ -58,6 +60,15 @@ class SupervisorAgent:
                 self.agent_logs[agent_id] = []
             self.agent_logs[agent_id].append(log_entry)
 
+    def _pane_lines(self, session: str) -> Optional[PaneLineBuffer]:
+        """Streamed, ANSI-stripped output lines of a session (None if it cannot be streamed)"""
+        try:
+            stream = get_pane_streamer().watch(session)
+        except OSError as e:
+            self._log(f"⚠️ Pane streaming unavailable for {session}: {e}")
+            return None
+        return stream.lines if stream else None
+
     def send_command_properly(self, agent_id: str, command: str, wait_time: float = 2.0) -> bool:
         """
         Invia comando all'agente CORRETTAMENTE:
@@ -72,6 +83,8 @@ class SupervisorAgent:
 
         session = self.agents[agent_id]
         self._log(f"📤 Sending command: {command}", agent_id)
+        lines = self._pane_lines(session)
+        start = lines.next_line if lines else None
 
         try:
             # Step 1: Send command
@@ -92,7 +105,16 @@ class SupervisorAgent:
             # Step 3: Wait for response
             time.sleep(wait_time)
 
-            # Step 4: Capture output
+            # Step 4: Log the output written since the command was sent
+            if lines:
+                for _, line in lines.lines_since(start)[-10:]:
+                    if line.strip():
+                        self._log(f"📥 OUTPUT: {line.strip()}", agent_id)
+                for _, line in lines.errors_since(start):
+                    self._log(f"⚠️ ERROR: {line.strip()}", agent_id)
+                return True
+
+            # Not streamed: capture the screen
             result = subprocess.run([
                 "tmux", "capture-pane", "-t", session, "-p"
             ], capture_output=True, text=True, timeout=10)
@@ -163,13 +185,19 @@ class SupervisorAgent:
             if not agent_state:
                 return {"error": f"Agent {agent_id} not found in SharedState"}
 
-            # Capture terminal output
+            # Recent terminal output, from the stream if the pane is streamed
             session = self.agents[agent_id]
-            result = subprocess.run([
-                "tmux", "capture-pane", "-t", session, "-p"
-            ], capture_output=True, text=True, timeout=5)
-
-            terminal_output = result.stdout if result.returncode == 0 else "Error capturing output"
+            lines = self._pane_lines(session)
+            if lines:
+                terminal_active = True
+                recent_output = [line for _, line in lines.lines_since(lines.next_line - 5)]
+            else:
+                result = subprocess.run([
+                    "tmux", "capture-pane", "-t", session, "-p"
+                ], capture_output=True, text=True, timeout=5)
+                terminal_active = result.returncode == 0
+                terminal_output = result.stdout if terminal_active else "Error capturing output"
+                recent_output = terminal_output.split('\n')[-5:]  # Last 5 lines
 
             status = {
                 "agent_id": agent_id,
@@ -177,8 +205,8 @@ class SupervisorAgent:
                 "current_task": agent_state.current_task,
                 "last_activity": agent_state.last_activity,
                 "session": session,
-                "terminal_active": result.returncode == 0,
-                "recent_output": terminal_output.split('\n')[-5:],  # Last 5 lines
+                "terminal_active": terminal_active,
+                "recent_output": recent_output,
                 "logs_count": len(self.agent_logs.get(agent_id, []))
             }
 
@@ -7,16 +7,19 @@ Monitors Claude agents and automatically detects task completion
 import sys
 import os
 import time
-import subprocess
 import re
 from datetime import datetime, timedelta
 import threading
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-# Add shared_state to path
+# Add shared_state and the project root to path
 sys.path.append('/Users/erik/Desktop/claude-multiagent-system/langgraph-test')
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from shared_state.manager import SharedStateManager
+from core.pane_stream import PaneStream, get_pane_streamer
+from core.tmux_client import TMUXClient
 
 class TaskCompletionMonitor:
     """Monitors agents and automatically detects task completion"""
@@ -49,6 +52,15 @@ class TaskCompletionMonitor:
             r"task.*error",
         ]
 
+        # Matched against streamed pane output (bytes, one line at a time)
+        self._completion_regexes = [(p, re.compile(p.encode(), re.IGNORECASE))
+                                    for p in self.completion_patterns]
+        self._error_regexes = [(p, re.compile(p.encode(), re.IGNORECASE))
+                               for p in self.error_patterns]
+
+        # (task_id, agent_id) -> (stream, offset when the agent was first checked)
+        self._watched: Dict[Tuple[str, str], Tuple[PaneStream, int]] = {}
+
         # Timeout for stuck tasks (in minutes)
         self.task_timeout_minutes = 30
 
@@ -67,6 +79,9 @@ class TaskCompletionMonitor:
         self.monitoring = False
         if self.monitor_thread:
             self.monitor_thread.join()
+        for stream, _ in self._watched.values():
+            get_pane_streamer().unwatch(stream.session)
+        self._watched.clear()
         print("🤖 Task Completion Monitor stopped")
 
     def _monitor_loop(self):
@@ -93,7 +108,7 @@ class TaskCompletionMonitor:
         for agent_id in task.assigned_agents:
             if agent_id not in task.results:  # Agent hasn't completed yet
                 # Check agent's terminal output for completion signals
-                completion_detected = self._check_agent_output(agent_id)
+                completion_detected = self._check_agent_output(agent_id, task.task_id)
 
                 if completion_detected['completed']:
                     print(f"✅ Detected completion for agent {agent_id}")
@@ -115,7 +130,7 @@ class TaskCompletionMonitor:
                         completion_detected['error_message']
                     )
 
-    def _check_agent_output(self, agent_id: str) -> Dict[str, any]:
+    def _check_agent_output(self, agent_id: str, task_id: Optional[str] = None) -> Dict[str, any]:
         """Check agent's terminal output for completion/failure signals"""
         try:
             # Get session name from agent
@@ -125,40 +140,83 @@ class TaskCompletionMonitor:
 
             session_id = agent.session_id
 
-            # Capture recent terminal output
-            result = subprocess.run([
-                "tmux", "capture-pane", "-t", session_id, "-p"
-            ], capture_output=True, text=True, timeout=5)
-
-            if result.returncode != 0:
+            # Prefer the streamed output written since the agent was first checked
+            # for this task; each new line is scanned once
+            previous = self._watched.get((task_id, agent_id))
+            watched = self._watch(task_id, agent_id, session_id)
+            if watched and watched is previous:
+                return self._match_stream(*watched)
+
+            # Output from before streaming started is only on the screen, and
+            # panes that cannot be streamed (piped elsewhere) are always captured
+            recent_output = TMUXClient.capture_pane(session_id)
+            if recent_output is None:
                 return {'completed': False, 'failed': False}
-
-            recent_output = result.stdout.lower()
-
-            # Check for completion patterns
-            for pattern in self.completion_patterns:
-                if re.search(pattern, recent_output):
-                    return {
-                        'completed': True,
-                        'failed': False,
-                        'message': f"Automatic completion detected via pattern: {pattern}"
-                    }
-
-            # Check for error patterns
-            for pattern in self.error_patterns:
-                if re.search(pattern, recent_output):
-                    return {
-                        'completed': False,
-                        'failed': True,
-                        'error_message': f"Error detected via pattern: {pattern}"
-                    }
-
-            return {'completed': False, 'failed': False}
+            return self._match_text(recent_output.lower())
 
         except Exception as e:
             print(f"❌ Error checking agent {agent_id} output: {e}")
             return {'completed': False, 'failed': False}
 
+    def _watch(self, task_id: Optional[str], agent_id: str,
+               session_id: str) -> Optional[Tuple[PaneStream, int]]:
+        """Stream and start offset for an agent's part of a task, if streaming works"""
+        key = (task_id, agent_id)
+        watched = self._watched.get(key)
+        if watched and not watched[0].closed:
+            return watched
+
+        self._watched.pop(key, None)
+        try:
+            stream = get_pane_streamer().watch(session_id)
+        except OSError as e:
+            print(f"⚠️ Pane streaming unavailable for {session_id}, capturing instead: {e}")
+            return None
+        if stream is None:
+            return None
+        self._watched[key] = (stream, stream.end_offset)
+        return self._watched[key]
+
+    def _match_stream(self, stream: PaneStream, offset: int) -> Dict[str, any]:
+        for pattern, regex in self._completion_regexes:
+            if stream.wait_for(regex, offset, timeout=0) is not None:
+                return {
+                    'completed': True,
+                    'failed': False,
+                    'message': f"Automatic completion detected via pattern: {pattern}"
+                }
+
+        for pattern, regex in self._error_regexes:
+            if stream.wait_for(regex, offset, timeout=0) is not None:
+                return {
+                    'completed': False,
+                    'failed': True,
+                    'error_message': f"Error detected via pattern: {pattern}"
+                }
+
+        return {'completed': False, 'failed': False}
+
+    def _match_text(self, recent_output: str) -> Dict[str, any]:
+        # Check for completion patterns
+        for pattern in self.completion_patterns:
+            if re.search(pattern, recent_output):
+                return {
+                    'completed': True,
+                    'failed': False,
+                    'message': f"Automatic completion detected via pattern: {pattern}"
+                }
+
+        # Check for error patterns
+        for pattern in self.error_patterns:
+            if re.search(pattern, recent_output):
+                return {
+                    'completed': False,
+                    'failed': True,
+                    'error_message': f"Error detected via pattern: {pattern}"
+                }
+
+        return {'completed': False, 'failed': False}
+
     def _check_task_timeout(self, task):
         """Check if task has timed out"""
         try:
@@ -189,6 +247,7 @@ class TaskCompletionMonitor:
         """Mark a specific agent's part of the task as completed"""
         try:
             # Add result for this agent
+            self._watched.pop((task_id, agent_id), None)
             task = self.manager.state.current_task
             if task and task.task_id == task_id:
                 if not task.results:
@@ -216,6 +275,9 @@ class TaskCompletionMonitor:
     def _fail_agent_task(self, task_id: str, agent_id: str, error_message: str):
         """Mark a specific agent's part of the task as failed"""
         try:
+            for key in [key for key in self._watched if key[0] == task_id]:
+                del self._watched[key]
+
             # Update agent status
             self.manager.update_agent_status(agent_id, "error")
             agent = self.manager.state.agents[agent_id]
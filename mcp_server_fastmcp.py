@@ -6,7 +6,6 @@ Provides frontend state management and agent coordination
 
 import os
 import sys
-import sqlite3
 import json
 import hashlib
 import logging
@@ -17,6 +16,8 @@ from dataclasses import dataclass
 
 from mcp.server.fastmcp import FastMCP
 
+from core.db_pool import connect as db_connect
+
 # Configure logging to stderr to avoid stdio interference
 logging.basicConfig(
     level=logging.WARNING,
@@ -36,7 +37,7 @@ DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_system.d
 
 def init_database():
     """Initialize database with required tables"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     # Agent states table
@@ -168,7 +169,7 @@ def track_frontend_component(name: str, file_path: str, config: Optional[Dict[st
     if not file_hash:
         return {"status": "error", "message": f"File not found: {file_path}"}
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -199,7 +200,7 @@ def verify_frontend_component(name: str) -> ComponentStatus:
     Returns:
         ComponentStatus with current state
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -237,7 +238,7 @@ def verify_all_frontend() -> List[ComponentStatus]:
     Returns:
         List of ComponentStatus for all tracked components
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("SELECT name FROM frontend_components")
@@ -264,7 +265,7 @@ def track_api_endpoint(name: str, url: str, method: str = "GET", expected_keys:
     Returns:
         Status dict with tracking result
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -299,7 +300,7 @@ def init_agent(agent: str) -> AgentStatus:
     Returns:
         AgentStatus with initialization result
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     timestamp = datetime.now().isoformat()
@@ -330,7 +331,7 @@ def heartbeat(agent: str) -> Dict:
     Returns:
         Dict with heartbeat status
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     timestamp = datetime.now().isoformat()
@@ -363,7 +364,7 @@ def log_activity(agent: str, activity: str, category: str = "general") -> Activi
     Returns:
         Activity record
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     activity_id = f"{agent}_{int(datetime.now().timestamp())}"
@@ -398,7 +399,7 @@ def get_agent_status(agent: Optional[str] = None) -> List[AgentStatus]:
     Returns:
         List of AgentStatus
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     if agent:
@@ -438,7 +439,7 @@ def send_message(from_agent: str, to_agent: str, message: str) -> Dict:
     Returns:
         Dict with send status
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     timestamp = datetime.now().isoformat()
@@ -471,7 +472,7 @@ def read_inbox(agent: str, mark_as_read: bool = True) -> List[Dict]:
     Returns:
         List of messages
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -515,7 +516,7 @@ def get_recent_activities(limit: int = 10) -> List[Activity]:
     Returns:
         List of recent activities
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
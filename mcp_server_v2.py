@@ -7,7 +7,6 @@ Includes frontend state management and verification tools
 import asyncio
 import json
 import logging
-import sqlite3
 import hashlib
 from pathlib import Path
 from datetime import datetime
@@ -19,6 +18,8 @@ from mcp.server.models import InitializationOptions
 import mcp.server.stdio
 import mcp.types as types
 
+from core.db_pool import connect as db_connect
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,7 +33,7 @@ class FrontendStateManager:
 
     def init_db(self):
         """Initialize database with frontend tracking tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_connect(self.db_path)
         cursor = conn.cursor()
 
         # Frontend components tracking
@@ -85,7 +86,7 @@ class FrontendStateManager:
     def track_component(self, name: str, file_path: str, config: Dict) -> Dict:
         """Track a frontend component"""
         file_hash = self.get_file_hash(file_path)
-        conn = sqlite3.connect(self.db_path)
+        conn = db_connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -102,7 +103,7 @@ class FrontendStateManager:
 
     def verify_component(self, name: str) -> Dict:
         """Verify if component has changed"""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -128,7 +129,7 @@ class FrontendStateManager:
 
     def verify_all_components(self) -> List[Dict]:
         """Verify all tracked components"""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_connect(self.db_path)
         cursor = conn.cursor()
 
         cursor.execute("SELECT name FROM frontend_components")
@@ -395,7 +396,7 @@ class MCPServerV2:
 
     def init_agent(self, agent: str) -> Dict:
         """Initialize an agent"""
-        conn = sqlite3.connect("mcp_system.db")
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -411,7 +412,7 @@ class MCPServerV2:
 
     def heartbeat(self, agent: str) -> Dict:
         """Update agent heartbeat"""
-        conn = sqlite3.connect("mcp_system.db")
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -427,7 +428,7 @@ class MCPServerV2:
 
     def log_activity(self, agent: str, activity: str, category: str) -> Dict:
         """Log an agent activity"""
-        conn = sqlite3.connect("mcp_system.db")
+        conn = db_connect()
         cursor = conn.cursor()
 
         activity_id = f"{agent}_{int(datetime.now().timestamp())}"
@@ -445,7 +446,7 @@ class MCPServerV2:
 
     def get_agent_status(self, agent: Optional[str] = None) -> Dict:
         """Get agent status"""
-        conn = sqlite3.connect("mcp_system.db")
+        conn = db_connect()
         cursor = conn.cursor()
 
         if agent:
@@ -486,7 +487,7 @@ class MCPServerV2:
 
     def send_message(self, from_agent: str, to_agent: str, message: str) -> Dict:
         """Send message between agents"""
-        conn = sqlite3.connect("mcp_system.db")
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -512,7 +513,7 @@ class MCPServerV2:
 
     def read_inbox(self, agent: str) -> Dict:
         """Read messages for an agent"""
-        conn = sqlite3.connect("mcp_system.db")
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -5,12 +5,13 @@ MCP Terminal Bridge - Connects TMUX terminals to MCP system
 
 import asyncio
 import json
-import sqlite3
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
+from core.db_pool import connect as db_connect
+
 # MCP Tools available in terminals
 MCP_TOOLS = {
     "init_agent": "Initialize an agent in the MCP system",
@@ -25,7 +26,7 @@ MCP_TOOLS = {
 
 def init_database():
     """Initialize MCP database if needed"""
-    conn = sqlite3.connect('mcp_system.db')
+    conn = db_connect()
     cursor = conn.cursor()
 
     # Ensure tables exist
@@ -59,7 +60,7 @@ def init_database():
 
 def execute_mcp_tool(tool_name, agent_name, args):
     """Execute an MCP tool for an agent"""
-    conn = sqlite3.connect('mcp_system.db')
+    conn = db_connect()
     cursor = conn.cursor()
     timestamp = datetime.now().isoformat()
 
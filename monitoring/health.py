@@ -123,8 +123,8 @@ class HealthChecker:
             active_agents = 0
             agent_status = {}
 
-            for agent_id, session_name in AGENT_SESSIONS.items():
-                if TMUXClient.session_exists(session_name):
+            for agent_id, alive in TMUXClient.health_check().items():
+                if alive:
                     active_agents += 1
                     agent_status[agent_id] = "active"
                 else:
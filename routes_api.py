@@ -10,6 +10,8 @@ from functools import wraps
 import os
 import logging
 
+from core.db_pool import connect as db_connect
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -78,11 +80,10 @@ def health():
 @app.route('/api/mcp/status', methods=['GET'])
 def get_mcp_status():
     """Get MCP system status from database"""
-    import sqlite3
     import subprocess
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get recent activities
@@ -202,13 +203,12 @@ def login():
     password = data.get('password', '')
     api_key = data.get('api_key')
 
-    import sqlite3
     import hashlib
     import jwt
     import secrets
     from datetime import datetime, timedelta
 
-    conn = sqlite3.connect('mcp_system.db')
+    conn = db_connect()
     cursor = conn.cursor()
 
     # First check if agent exists
@@ -260,8 +260,7 @@ def login():
 def verify():
     """Verify token"""
     # Update last seen in database
-    import sqlite3
-    conn = sqlite3.connect('mcp_system.db')
+    conn = db_connect()
     cursor = conn.cursor()
     cursor.execute('''
         UPDATE agent_states
@@ -285,8 +284,7 @@ def logout():
     agent_id = request.user['agent_id']
 
     # Log logout activity
-    import sqlite3
-    conn = sqlite3.connect('mcp_system.db')
+    conn = db_connect()
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -312,10 +310,8 @@ def logout():
 @token_required
 def get_agents():
     """Get all agents status from database"""
-    import sqlite3
-
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get all agents with their current status and last activity
@@ -378,12 +374,11 @@ def get_agents():
 @token_required
 def get_agent(agent_id):
     """Get specific agent details from database"""
-    import sqlite3
     from datetime import datetime
     import subprocess
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get agent basic info
@@ -541,10 +536,8 @@ def agent_heartbeat(agent_id):
 @token_required
 def get_tasks():
     """Get all tasks from database"""
-    import sqlite3
-
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get all tasks with agent information
@@ -643,7 +636,6 @@ def get_tasks():
 @token_required
 def create_task():
     """Create new task in database"""
-    import sqlite3
     import uuid
     import json
     from datetime import datetime
@@ -654,7 +646,7 @@ def create_task():
         return jsonify({'error': 'Title required'}), 400
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Generate unique task ID
@@ -743,12 +735,11 @@ def create_task():
 @token_required
 def get_task(task_id):
     """Get specific task details from database"""
-    import sqlite3
     import json
     from datetime import datetime
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get task details with agent info
@@ -871,7 +862,6 @@ def get_task(task_id):
 @token_required
 def update_task(task_id):
     """Update task in database"""
-    import sqlite3
     import json
     from datetime import datetime
 
@@ -880,7 +870,7 @@ def update_task(task_id):
         return jsonify({'error': 'No update data provided'}), 400
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Check if task exists
@@ -1061,10 +1051,8 @@ def update_task(task_id):
 @token_required
 def get_messages():
     """Get messages from database for current user or agent"""
-    import sqlite3
-
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get username/agent from token
@@ -1146,7 +1134,6 @@ def get_messages():
 @token_required
 def send_message():
     """Send message and save to database"""
-    import sqlite3
     from datetime import datetime
 
     data = request.json
@@ -1155,7 +1142,7 @@ def send_message():
         return jsonify({'error': 'Recipient and content required'}), 400
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         sender = request.user.get('username', 'api')
@@ -1237,7 +1224,6 @@ def send_message():
 @token_required
 def system_status():
     """Get real system status from database and services"""
-    import sqlite3
     import subprocess
     from datetime import datetime
     import psutil
@@ -1255,7 +1241,7 @@ def system_status():
 
         # Check database connection
         try:
-            conn = sqlite3.connect('mcp_system.db')
+            conn = db_connect()
             cursor = conn.cursor()
 
             # Get database statistics
@@ -1379,12 +1365,11 @@ def system_status():
 @token_required
 def system_metrics():
     """Get real system metrics from database and system"""
-    import sqlite3
     from datetime import datetime, timedelta
     import psutil
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Time ranges for metrics
@@ -1593,7 +1578,6 @@ def system_metrics():
 @app.route('/api/analytics/performance', methods=['GET'])
 def analytics_performance():
     """Get performance analytics data for charts"""
-    import sqlite3
     from datetime import datetime, timedelta
     import random
 
@@ -1602,7 +1586,7 @@ def analytics_performance():
     time_range = request.args.get('timeRange', '1h')
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Determine time points based on range
@@ -1668,11 +1652,10 @@ def analytics_performance():
 @app.route('/api/analytics/agent-activity', methods=['GET'])
 def analytics_agent_activity():
     """Get agent activity analytics"""
-    import sqlite3
     from datetime import datetime, timedelta
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get activity by agent over last 24 hours
@@ -1704,11 +1687,10 @@ def analytics_agent_activity():
 @app.route('/api/analytics/queue-metrics', methods=['GET'])
 def analytics_queue_metrics():
     """Get queue metrics over time"""
-    import sqlite3
     from datetime import datetime, timedelta
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get task metrics over last 24 hours
@@ -1750,12 +1732,11 @@ def analytics_queue_metrics():
 @app.route('/api/system/health')
 def get_system_health():
     """Get system health status"""
-    import sqlite3
     from datetime import datetime
     import psutil
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get agent counts
@@ -1804,13 +1785,12 @@ def get_system_health():
 @app.route('/api/system/logs')
 def get_system_logs():
     """Get recent system logs from activities table"""
-    import sqlite3
     import json
 
     try:
         limit = request.args.get('limit', 10, type=int)
 
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get recent activities and format them as log entries
@@ -1876,11 +1856,10 @@ def static_files(filename):
 @app.route('/api/queue/tasks', methods=['GET'])
 def get_queue_tasks():
     """Get all queue tasks"""
-    import sqlite3
     import json
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get filter parameters
@@ -1935,10 +1914,8 @@ def get_queue_tasks():
 @app.route('/api/queue/status', methods=['GET'])
 def get_queue_status():
     """Get queue status and metrics"""
-    import sqlite3
-
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get queue metrics
@@ -1994,11 +1971,10 @@ def get_queue_status():
 @app.route('/api/queue/stats', methods=['GET'])
 def get_queue_stats():
     """Get detailed queue statistics"""
-    import sqlite3
     from datetime import datetime, timedelta
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get current queue stats
@@ -2061,7 +2037,6 @@ def get_queue_stats():
 @token_required
 def create_custom_agent():
     """Create a custom agent with builder"""
-    import sqlite3
     import json
     import uuid
     from datetime import datetime
@@ -2072,7 +2047,7 @@ def create_custom_agent():
         return jsonify({'error': 'Name and skills required'}), 400
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         agent_id = data.get('id', f'custom-{uuid.uuid4().hex[:8]}')
@@ -2163,7 +2138,6 @@ def deploy_custom_agent():
     """Deploy a custom agent"""
     import subprocess
     import json
-    import sqlite3
     from datetime import datetime
 
     data = request.json
@@ -2193,7 +2167,7 @@ def deploy_custom_agent():
                               f'echo "  - Skill loaded: {skill_name}"', 'Enter'])
 
         # Update database status
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -2242,7 +2216,6 @@ def deploy_custom_agent():
 def execute_custom_agent(agent_id):
     """Execute a custom agent with input"""
     import subprocess
-    import sqlite3
     import json
     from datetime import datetime
 
@@ -2251,7 +2224,7 @@ def execute_custom_agent(agent_id):
 
     try:
         # Get agent configuration
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -2372,11 +2345,10 @@ def test_custom_agent():
 @app.route('/api/knowledge/graph', methods=['GET'])
 def get_knowledge_graph():
     """Get the knowledge graph"""
-    import sqlite3
     import json
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         nodes = []
@@ -2573,14 +2545,12 @@ def get_knowledge_graph():
 @app.route('/api/knowledge/search', methods=['POST'])
 def search_knowledge():
     """Search the knowledge graph"""
-    import sqlite3
-
     data = request.json
     query = data.get('query', '')
     limit = data.get('limit', 10)
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Search in components and activities
@@ -2616,7 +2586,6 @@ def search_knowledge():
 @token_required
 def add_knowledge_node():
     """Add a node to the knowledge graph"""
-    import sqlite3
     import uuid
     from datetime import datetime
 
@@ -2626,7 +2595,7 @@ def add_knowledge_node():
         return jsonify({'error': 'Label required'}), 400
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         node_id = f'node-{uuid.uuid4().hex[:8]}'
@@ -2655,11 +2624,10 @@ def add_knowledge_node():
 @app.route('/api/knowledge/discover', methods=['POST'])
 def auto_discover_knowledge():
     """Auto-discover knowledge connections"""
-    import sqlite3
     import random
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Find potential connections between agents and activities
@@ -2691,11 +2659,10 @@ def auto_discover_knowledge():
 @app.route('/api/knowledge/export', methods=['GET'])
 def export_knowledge_graph():
     """Export the knowledge graph"""
-    import sqlite3
     import json
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get all data for export
@@ -2747,7 +2714,7 @@ def update_document(doc_id):
 def get_workflows():
     """Get saved workflows"""
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -2781,7 +2748,7 @@ def save_workflow():
         data = request.json
         workflow_id = f"workflow_{int(time.time())}"
 
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Store workflow as component
@@ -2814,7 +2781,7 @@ def save_workflow():
 def get_workflow(workflow_id):
     """Get a specific workflow"""
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -2848,7 +2815,7 @@ def execute_workflow(workflow_id):
     """Execute a saved workflow"""
     try:
         # Get workflow
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -2982,7 +2949,7 @@ def start_agent():
         subprocess.run(init_cmd, shell=True)
 
         # Update agent state in database
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
         cursor.execute('''
             INSERT OR REPLACE INTO agent_states (agent, status, last_seen)
@@ -3017,7 +2984,7 @@ def stop_agent():
         subprocess.run(cmd, shell=True, check=False)
 
         # Update agent state in database
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE agent_states SET status = 'inactive', last_seen = ?
@@ -3052,7 +3019,7 @@ def setup_agent_mcp():
         })
 
         # Store configuration in database
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Ensure agent state exists
@@ -3086,12 +3053,10 @@ def setup_agent_mcp():
 @app.route('/api/mcp/activities', methods=['GET'])
 def get_mcp_activities():
     """Get recent MCP activities"""
-    import sqlite3
-
     limit = request.args.get('limit', 50, type=int)
 
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -3124,7 +3089,7 @@ def get_mcp_activities():
 def get_inbox_messages():
     """Get inbox messages with filtering"""
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Get filters from query params
@@ -3189,7 +3154,7 @@ def send_inbox_message():
     """Send a new message through the inbox"""
     try:
         data = request.json
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         message_id = f"msg_{int(time.time())}_{data.get('to', 'unknown')}"
@@ -3239,7 +3204,7 @@ def send_inbox_message():
 def update_message_status(message_id, action):
     """Update message status (read/archive)"""
     try:
-        conn = sqlite3.connect('mcp_system.db')
+        conn = db_connect()
         cursor = conn.cursor()
 
         if action == 'read':
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+mcp_system.db access benchmark: sqlite3.connect per request vs core.db_pool
+
+The web frameworks are optional here, so each "request" is the database work
+of the /api/agents and /api/tasks handlers in routes_api.py (connect, query,
+fetch, close), run from a pool of worker threads like the servers use. A
+synthetic database in a temporary directory is used.
+
+Run directly: python tests/benchmark_db_pool.py
+"""
+
+import logging
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import db_pool
+
+logging.getLogger("core.db_pool").setLevel(logging.WARNING)
+
+AGENTS = ["supervisor", "master", "backend-api", "database", "frontend-ui",
+          "instagram", "testing", "queue-manager", "deployment"]
+
+AGENTS_QUERY = '''
+    SELECT a.agent as id, a.status, a.last_seen as last_heartbeat, a.current_task,
+           COUNT(act.id) as total_activities
+    FROM agent_states a
+    LEFT JOIN activities act ON act.agent = a.agent
+    GROUP BY a.agent
+    ORDER BY a.last_seen DESC
+'''
+
+TASKS_QUERY = '''
+    SELECT t.id, t.title, t.component, t.assigned_to, t.status, t.priority,
+           t.created_at, t.started_at, t.completed_at, t.metadata,
+           a.status as agent_status
+    FROM tasks t
+    LEFT JOIN agent_states a ON t.assigned_to = a.agent
+    ORDER BY t.priority DESC, t.created_at DESC
+'''
+
+
+def create_database(path: str, activities: int = 5000, tasks: int = 200):
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE agent_states (agent TEXT PRIMARY KEY, last_seen TEXT, status TEXT,
+                                   current_task TEXT);
+        CREATE TABLE activities (id TEXT PRIMARY KEY, agent TEXT, timestamp TEXT,
+                                 activity TEXT, category TEXT, status TEXT);
+        CREATE INDEX idx_activities_agent ON activities(agent);
+        CREATE TABLE tasks (id TEXT PRIMARY KEY, title TEXT NOT NULL, component TEXT,
+                            assigned_to TEXT, status TEXT DEFAULT 'pending',
+                            priority INTEGER DEFAULT 5, created_at TIMESTAMP,
+                            started_at TIMESTAMP, completed_at TIMESTAMP, metadata TEXT);
+    ''')
+    conn.executemany("INSERT INTO agent_states VALUES (?, '2025-09-20 10:00:00', 'active', NULL)",
+                     [(agent,) for agent in AGENTS])
+    conn.executemany("INSERT INTO activities VALUES (?, ?, '2025-09-20 10:00:00', 'work', 'task', 'ok')",
+                     [(f"act-{n}", AGENTS[n % len(AGENTS)]) for n in range(activities)])
+    conn.executemany("INSERT INTO tasks VALUES (?, ?, 'api', ?, 'pending', ?, '2025-09-20 10:00:00',"
+                     " NULL, NULL, '{\"description\": \"bench\"}')",
+                     [(f"task-{n}", f"Task {n}", AGENTS[n % len(AGENTS)], n % 10)
+                      for n in range(tasks)])
+    conn.commit()
+    conn.close()
+
+
+def requests_per_second(connect, query: str, threads: int = 8, seconds: float = 2.0) -> float:
+    """Requests completed per second by `threads` workers running query"""
+    done = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(index):
+        while time.perf_counter() < deadline:
+            conn = connect()
+            cursor = conn.cursor()
+            cursor.execute(query)
+            cursor.fetchall()
+            conn.close()
+            done[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(done) / seconds
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "mcp_system.db")
+        create_database(path)
+
+        print("\n[PERF] mcp_system.db requests/second (8 worker threads)")
+        print(f"  {'endpoint':<14}{'connect per request':>22}{'db_pool':>12}{'speedup':>10}")
+        for endpoint, query in (("/api/agents", AGENTS_QUERY), ("/api/tasks", TASKS_QUERY)):
+            before = requests_per_second(lambda: sqlite3.connect(path), query)
+            after = requests_per_second(lambda: db_pool.connect(path), query)
+            print(f"  {endpoint:<14}{before:>22.0f}{after:>12.0f}{after / before:>9.1f}x")
+
+        # Cost of the connection itself, without query work
+        before = requests_per_second(lambda: sqlite3.connect(path), "SELECT 1", threads=1)
+        after = requests_per_second(lambda: db_pool.connect(path), "SELECT 1", threads=1)
+        print(f"  {'SELECT 1':<14}{before:>22.0f}{after:>12.0f}{after / before:>9.1f}x")
+        print(f"  pool: {db_pool.pool_stats()}")
+        db_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+DistributedQueue benchmarks against fakeredis
+
+Run directly: python tests/benchmark_distributed_queue.py
+"""
+
+import logging
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fakeredis
+
+from core.distributed_queue import BinaryTaskCodec, DistributedQueue, PickleTaskCodec, Task
+from core.local_queue import LocalTaskQueue
+
+logging.getLogger("core.distributed_queue").setLevel(logging.WARNING)
+logging.getLogger("core.local_queue").setLevel(logging.WARNING)
+
+
+def percentile(values, pct):
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def benchmark_dequeue_latency(tasks: int = 300, interval: float = 0.005):
+    """Submit -> get latency (ms) with a worker blocked in get()"""
+    queue = DistributedQueue(redis_client=fakeredis.FakeStrictRedis())
+    latencies = []
+    done = threading.Event()
+
+    def worker():
+        while len(latencies) < tasks:
+            task = queue.get("bench", block=True, timeout=5)
+            if task:
+                latencies.append((time.time() - task.metadata["submitted"]) * 1000)
+        done.set()
+
+    threading.Thread(target=worker, daemon=True).start()
+    time.sleep(0.1)
+
+    for _ in range(tasks):
+        queue.submit(Task(agent="bench", metadata={"submitted": time.time()}))
+        time.sleep(interval)
+
+    done.wait(timeout=30)
+    return latencies
+
+
+def realistic_task() -> Task:
+    """Task shaped like a Claude agent command with context"""
+    return Task(
+        name="implement_endpoint",
+        agent="backend-api",
+        payload={
+            "command": "Implement the /api/tasks endpoint with pagination " * 4,
+            "context": {
+                "files": [f"api/module_{i}.py" for i in range(40)],
+                "notes": "Follow the repository conventions. " * 30,
+            },
+            "workflow_id": "wf-1234",
+            "step": 3,
+        },
+        dependencies=["task-a", "task-b"],
+        metadata={"submitted_by": "supervisor", "tenant": "default"},
+    )
+
+
+def benchmark_codecs(iterations: int = 5000):
+    """Encode/decode time (µs) and stored bytes per codec"""
+    task = realistic_task()
+    results = {}
+
+    for codec in (PickleTaskCodec(), BinaryTaskCodec(lazy_payload=False), BinaryTaskCodec()):
+        label = codec.name if codec.name == "pickle" or not codec.lazy_payload \
+            else "binary (lazy payload)"
+        data = codec.encode(task)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            codec.encode(task)
+        encode_us = (time.perf_counter() - start) / iterations * 1_000_000
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            decoded = codec.decode(data)
+            # Typical state transition: touch scalar fields, re-encode
+            decoded.state = 2
+            codec.encode(decoded)
+        roundtrip_us = (time.perf_counter() - start) / iterations * 1_000_000
+
+        results[label] = (len(data), encode_us, roundtrip_us)
+
+    return results
+
+
+def benchmark_dependency_release(waiting: int = 2000, completions: int = 200):
+    """Mean complete() time (ms) with many unrelated tasks waiting on dependencies"""
+    queue = DistributedQueue(redis_client=fakeredis.FakeStrictRedis())
+    blocker = queue.submit(Task(agent="blocked"))
+    for _ in range(waiting):
+        queue.submit(Task(agent="api", dependencies=[blocker]))
+
+    ids = [queue.submit(Task(agent="bench")) for _ in range(completions)]
+    for task_id in ids:
+        queue.submit(Task(agent="child", dependencies=[task_id]))
+    for _ in ids:
+        queue.get("bench", block=False)
+
+    start = time.perf_counter()
+    for task_id in ids:
+        queue.complete(task_id)
+    return (time.perf_counter() - start) / completions * 1000
+
+
+def benchmark_batch_submit(tasks: int = 1000):
+    """Seconds to submit tasks one by one vs. with submit_many"""
+    queue = DistributedQueue(redis_client=fakeredis.FakeStrictRedis())
+    start = time.perf_counter()
+    for i in range(tasks):
+        queue.submit(Task(agent=f"agent-{i % 9}"))
+    single = time.perf_counter() - start
+
+    queue = DistributedQueue(redis_client=fakeredis.FakeStrictRedis())
+    start = time.perf_counter()
+    queue.submit_many([Task(agent=f"agent-{i % 9}") for i in range(tasks)])
+    batched = time.perf_counter() - start
+
+    return single, batched
+
+
+def benchmark_backends(tasks: int = 2000):
+    """Mean submit + get + complete time (µs) per task for each backend"""
+    backends = {
+        "redis (fakeredis)": DistributedQueue(redis_client=fakeredis.FakeStrictRedis()),
+        "local": LocalTaskQueue(),
+    }
+    results = {}
+    for label, queue in backends.items():
+        start = time.perf_counter()
+        for _ in range(tasks):
+            queue.submit(Task(agent="bench"))
+            queue.complete(queue.get("bench", block=False).id)
+        results[label] = (time.perf_counter() - start) / tasks * 1_000_000
+    return results
+
+
+def benchmark_scheduling_jitter(tasks: int = 50, spacing: float = 0.02):
+    """Lateness (ms) of delayed tasks: dequeue time minus scheduled_at"""
+    queue = DistributedQueue(redis_client=fakeredis.FakeStrictRedis())
+    queue.start()
+    lateness = []
+    try:
+        base = time.time() + 0.2
+        queue.submit_many([Task(agent="bench", scheduled_at=base + i * spacing) for i in range(tasks)])
+        while len(lateness) < tasks:
+            task = queue.get("bench", block=True, timeout=5)
+            if not task:
+                break
+            lateness.append((time.time() - task.scheduled_at) * 1000)
+    finally:
+        queue.stop()
+    return lateness
+
+
+def main():
+    print("\n[PERF] Task codecs (realistic agent task)")
+    print(f"  {'codec':<22}{'bytes':>7}{'encode µs':>12}{'decode+update+encode µs':>26}")
+    for label, (size, encode_us, roundtrip_us) in benchmark_codecs().items():
+        print(f"  {label:<22}{size:>7}{encode_us:>12.2f}{roundtrip_us:>26.2f}")
+
+    latencies = benchmark_dequeue_latency()
+    print("\n[PERF] DistributedQueue dequeue latency (submit -> get, ms)")
+    print(f"  p50: {percentile(latencies, 50):.2f}  p99: {percentile(latencies, 99):.2f}  "
+          f"max: {max(latencies):.2f}")
+
+    single, batched = benchmark_batch_submit()
+    print("\n[PERF] Submitting 1000 tasks")
+    print(f"  submit() x1000: {single * 1000:.1f} ms  submit_many(): {batched * 1000:.1f} ms")
+
+    print("\n[PERF] submit + get + complete per task")
+    for label, micros in benchmark_backends().items():
+        print(f"  {label:<20}{micros:>10.1f} µs")
+
+    lateness = benchmark_scheduling_jitter()
+    print("\n[PERF] Delayed task lateness (dequeue - scheduled_at, ms)")
+    print(f"  p50: {percentile(lateness, 50):.2f}  p99: {percentile(lateness, 99):.2f}  "
+          f"max: {max(lateness):.2f}")
+
+    print("\n[PERF] complete() with 2000 unrelated tasks waiting on dependencies")
+    print(f"  {benchmark_dependency_release():.3f} ms per completion")
+
+
+if __name__ == "__main__":
+    main()
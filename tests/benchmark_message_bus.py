@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+MessageBus micro-benchmarks
+
+Run directly: python tests/benchmark_message_bus.py
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.message_bus import Event, EventHistory, EventType, MessageBus, MessageBusConfig
+
+logging.getLogger("core.message_bus").setLevel(logging.WARNING)
+
+AGENTS = ["supervisor", "master", "backend-api", "database", "frontend-ui",
+          "instagram", "testing", "queue-manager", "deployment"]
+
+
+def fresh_bus(config: MessageBusConfig = None) -> MessageBus:
+    """Create a MessageBus outside of the process-wide singleton"""
+    MessageBus._instance = None
+    return MessageBus(config)
+
+
+def benchmark_dispatch(subscribers: int, events: int = 2000, declarative: bool = True):
+    """Measure per-event dispatch latency with N subscribers"""
+    bus = fresh_bus()
+    event_types = list(EventType)
+
+    def handler(event):
+        pass
+
+    for i in range(subscribers):
+        event_type = event_types[i % len(event_types)]
+        source = AGENTS[i % len(AGENTS)]
+        if declarative:
+            bus.subscribe(event_type, handler, source=source)
+        else:
+            bus.subscribe(event_type, handler,
+                          filter_func=lambda e, s=source: e.source == s)
+
+    sample = [
+        Event(type=event_types[i % len(event_types)], source=AGENTS[i % len(AGENTS)])
+        for i in range(events)
+    ]
+
+    async def run():
+        times = []
+        for event in sample:
+            start = time.perf_counter()
+            await bus._dispatch_event(event)
+            times.append((time.perf_counter() - start) * 1_000_000)
+        return times
+
+    return asyncio.run(run())
+
+
+def benchmark_throughput(events: int = 50000, batched: bool = True,
+                         config: MessageBusConfig = None) -> float:
+    """Measure end-to-end publish -> handler throughput in events/second"""
+    bus = fresh_bus(config)
+    done = threading.Event()
+    received = [0]
+
+    def handler(event):
+        received[0] += 1
+        if received[0] == events:
+            done.set()
+
+    bus.subscribe(EventType.MESSAGE_SENT, handler)
+    bus.start()
+    time.sleep(0.1)
+
+    sample = [Event(type=EventType.MESSAGE_SENT, source="bench") for _ in range(events)]
+
+    start = time.perf_counter()
+    if batched:
+        for i in range(0, events, 1000):
+            bus.publish_many(sample[i:i + 1000])
+    else:
+        for event in sample:
+            bus.publish(event)
+    done.wait(timeout=60)
+    elapsed = time.perf_counter() - start
+
+    bus.stop()
+    return received[0] / elapsed
+
+
+def benchmark_history(capacity: int = 100_000, events: int = 200_000):
+    """Measure append cost and filtered query cost on a full ring buffer"""
+    history = EventHistory(capacity)
+    event_types = list(EventType)
+    sample = [
+        Event(type=event_types[i % len(event_types)], source=AGENTS[i % len(AGENTS)],
+              timestamp=1_000_000.0 + i)
+        for i in range(events)
+    ]
+
+    start = time.perf_counter()
+    for event in sample:
+        history.append(event)
+    append_us = (time.perf_counter() - start) / events * 1_000_000
+
+    since = sample[-500].timestamp
+    start = time.perf_counter()
+    for _ in range(1000):
+        result = history.query(event_type=EventType.TASK_CREATED, since=since)
+    query_us = (time.perf_counter() - start) / 1000 * 1_000_000
+
+    return append_us, query_us, len(result)
+
+
+def benchmark_fanout(handlers: int = 20, events: int = 20, concurrent: bool = True) -> float:
+    """Per-event latency (ms) with N handlers that each await 5ms of I/O"""
+    bus = fresh_bus(MessageBusConfig(concurrent_handlers=concurrent))
+
+    async def io_handler(event):
+        await asyncio.sleep(0.005)
+
+    for _ in range(handlers):
+        bus.subscribe(EventType.TASK_STARTED, io_handler)
+
+    async def run():
+        start = time.perf_counter()
+        for _ in range(events):
+            await bus._dispatch_event(Event(type=EventType.TASK_STARTED))
+        return (time.perf_counter() - start) / events * 1000
+
+    return asyncio.run(run())
+
+
+def benchmark_request_many(in_flight: int = 500) -> float:
+    """Time (ms) to complete N concurrent request/reply round trips"""
+    bus = fresh_bus()
+
+    def respond(event):
+        bus.publish(Event(type=EventType.MESSAGE_RECEIVED, source="agent",
+                          correlation_id=event.id))
+
+    bus.subscribe(EventType.MESSAGE_SENT, respond)
+    bus.start()
+    time.sleep(0.1)
+
+    requests = [Event(type=EventType.MESSAGE_SENT, source="supervisor") for _ in range(in_flight)]
+    start = time.perf_counter()
+    replies = bus.request_many(requests)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    bus.stop()
+    assert all(replies)
+    return elapsed
+
+
+def _echo_process(socket_path: str, ready):
+    """Child process: reply to every MESSAGE_SENT with MESSAGE_RECEIVED"""
+    from core.message_transport import UnixSocketTransport
+
+    logging.getLogger("core").setLevel(logging.WARNING)
+    bus = fresh_bus()
+    bus.start()
+    bus.attach_transport(UnixSocketTransport(socket_path, start_broker=False))
+
+    def echo(event):
+        bus.publish(Event(type=EventType.MESSAGE_RECEIVED, source="echo",
+                          correlation_id=event.id))
+
+    bus.subscribe(EventType.MESSAGE_SENT, echo)
+    ready.set()
+    while True:
+        time.sleep(1)
+
+
+def benchmark_transport(round_trips: int = 500):
+    """Cross-process round-trip latency through the Unix socket broker (µs)"""
+    import multiprocessing
+    import tempfile
+    from core.message_transport import EventBroker, UnixSocketTransport
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    broker = EventBroker(socket_path)
+    broker.start()
+
+    ctx = multiprocessing.get_context("spawn")
+    ready = ctx.Event()
+    child = ctx.Process(target=_echo_process, args=(socket_path, ready), daemon=True)
+    child.start()
+    ready.wait(timeout=10)
+
+    bus = fresh_bus()
+    bus.start()
+    bus.attach_transport(UnixSocketTransport(socket_path, start_broker=False))
+    replies = {}
+    bus.subscribe(EventType.MESSAGE_RECEIVED,
+                  lambda e: replies[e.correlation_id].set())
+    time.sleep(0.2)
+
+    times = []
+    for _ in range(round_trips):
+        event = Event(type=EventType.MESSAGE_SENT, source="bench")
+        replies[event.id] = threading.Event()
+        start = time.perf_counter()
+        bus.publish(event)
+        replies[event.id].wait(timeout=5)
+        times.append((time.perf_counter() - start) * 1_000_000)
+
+    child.terminate()
+    bus.stop()
+    broker.stop()
+    return times
+
+
+def main():
+    print("\n[PERF] MessageBus dispatch latency (µs per event)")
+    print(f"  {'subscribers':>11}  {'filter_func mean':>16}  {'indexed mean':>12}  {'indexed p99':>11}")
+
+    for subscribers in (10, 100, 1000):
+        legacy = benchmark_dispatch(subscribers, declarative=False)
+        indexed = benchmark_dispatch(subscribers, declarative=True)
+        p99 = statistics.quantiles(indexed, n=100)[98]
+        print(f"  {subscribers:>11}  {statistics.mean(legacy):>16.2f}  "
+              f"{statistics.mean(indexed):>12.2f}  {p99:>11.2f}")
+
+    print("\n[PERF] Fan-out to 20 async handlers doing 5ms of I/O (ms per event)")
+    print(f"  sequential: {benchmark_fanout(concurrent=False):.2f}")
+    print(f"  concurrent: {benchmark_fanout(concurrent=True):.2f}")
+
+    print("\n[PERF] request_many with 500 in-flight requests")
+    print(f"  total: {benchmark_request_many():.1f}ms")
+
+    times = benchmark_transport()
+    print("\n[PERF] Cross-process delivery via Unix socket broker (µs)")
+    print(f"  round trip median: {statistics.median(times):.0f}  "
+          f"p99: {statistics.quantiles(times, n=100)[98]:.0f}  "
+          f"(one way ≈ {statistics.median(times) / 2:.0f})")
+
+    append_us, query_us, matched = benchmark_history()
+    print("\n[PERF] Event history (100k ring buffer)")
+    print(f"  append: {append_us:.2f}µs/event")
+    print(f"  get_history(event_type, since) -> {matched} events: {query_us:.2f}µs")
+
+    print("\n[PERF] MessageBus publish throughput (events/second)")
+    print(f"  publish():      {benchmark_throughput(batched=False):>10.0f}")
+    print(f"  publish_many(): {benchmark_throughput(batched=True):>10.0f}")
+    linger = MessageBusConfig(batch_size=1024, flush_interval=0.002)
+    print(f"  publish_many() with 2ms linger: "
+          f"{benchmark_throughput(batched=True, config=linger):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+TMUXClient benchmarks: subprocess per command vs persistent control mode
+
+Run directly: python tests/benchmark_tmux_client.py (needs tmux)
+"""
+
+import logging
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import tmux_client
+from core.tmux_client import TMUXClient
+from core.pane_stream import PaneOutputStreamer
+from core.tmux_control import close_control_clients
+
+logging.getLogger("core.tmux_client").setLevel(logging.WARNING)
+logging.getLogger("core.tmux_control").setLevel(logging.WARNING)
+logging.getLogger("core.pane_stream").setLevel(logging.WARNING)
+
+SESSION = "bench-tmux-client"
+
+
+def time_calls(func, calls: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def benchmark_transports(calls: int = 200):
+    """Per-call cost of session_exists / capture_pane / send_keys"""
+    results = {}
+    for label, control in (("subprocess", False), ("control mode", True)):
+        tmux_client.TMUX_CONTROL_MODE = control
+        TMUXClient.session_exists(SESSION)  # Warm up (opens the control connection)
+        results[label] = {
+            "session_exists": time_calls(lambda: TMUXClient.session_exists(SESSION), calls),
+            "capture_pane": time_calls(lambda: TMUXClient.capture_pane(SESSION, lines=50), calls),
+            "send_keys": time_calls(lambda: TMUXClient.send_keys(SESSION, ""), calls),
+        }
+    return results
+
+
+def benchmark_broadcast(sessions: int = 20):
+    """Seconds to send one command to many sessions: one by one vs broadcast()"""
+    names = [f"{SESSION}-{i}" for i in range(sessions)]
+    for name in names:
+        TMUXClient.create_session(name, "cat")
+    try:
+        start = time.perf_counter()
+        for name in names:
+            TMUXClient.send_command(name, "ping")
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        TMUXClient.broadcast(names, "ping")
+        concurrent = time.perf_counter() - start
+    finally:
+        for name in names:
+            TMUXClient.kill_session(name)
+    return sequential, concurrent
+
+
+def benchmark_bulk_capture(sessions: int = 20, rounds: int = 20):
+    """ms to check liveness + capture 10 lines of every session: per session vs capture_all()"""
+    names = [f"{SESSION}-{i}" for i in range(sessions)]
+    for name in names:
+        TMUXClient.create_session(name, "cat")
+    try:
+        def per_session():
+            for name in names:
+                if TMUXClient.session_exists(name):
+                    TMUXClient.capture_pane(name, 10)
+
+        results = {}
+        for label, control in (("subprocess", False), ("control mode", True)):
+            tmux_client.TMUX_CONTROL_MODE = control
+            results[label] = (time_calls(per_session, rounds) / 1000,
+                              time_calls(lambda: TMUXClient.capture_all(names, 10), rounds) / 1000)
+    finally:
+        for name in names:
+            TMUXClient.kill_session(name)
+    return results
+
+
+def benchmark_completion_detection(runs: int = 10, poll_interval: float = 0.5):
+    """Marker seen -> detected latency (ms): capture_pane polling vs streamed output"""
+    TMUXClient.kill_session(f"{SESSION}-bash")
+    TMUXClient.create_session(f"{SESSION}-bash", "bash --norc --noprofile")
+    session = f"{SESSION}-bash"
+    polled, streamed = [], []
+    streamer = PaneOutputStreamer()
+    try:
+        stream = streamer.watch(session)
+        for run in range(runs):
+            # The typed command shows the marker in quotes; only its output counts
+            marker = f"### DONE:poll{run}"
+            TMUXClient.send_command(session, f"sleep 0.{run + 1}; echo '{marker}'")
+            emitted = time.perf_counter() + (run + 1) / 10
+            while marker not in TMUXClient.capture_pane(session).replace(f"'{marker}'", ""):
+                time.sleep(poll_interval)
+            polled.append(max(time.perf_counter() - emitted, 0) * 1000)
+
+            marker = f"### DONE:stream{run}"
+            offset = stream.end_offset
+            TMUXClient.send_command(session, f"sleep 0.{run + 1}; echo '{marker}'")
+            emitted = time.perf_counter() + (run + 1) / 10
+            stream.wait_for(re.compile(rb"(?<!')" + re.escape(marker.encode())), offset, timeout=5)
+            streamed.append(max(time.perf_counter() - emitted, 0) * 1000)
+    finally:
+        streamer.stop()
+        TMUXClient.kill_session(session)
+    return sum(polled) / runs, sum(streamed) / runs
+
+
+def benchmark_delivery(sessions: int = 10, commands: int = 10):
+    """
+    send_command under load (every session sending concurrently): fixed delay vs ack
+
+    Returns {mode: (avg latency ms, commands lost)}; a command is lost if its
+    output never shows up in the pane.
+    """
+    from core.pane_stream import get_pane_streamer
+
+    names = [f"{SESSION}-ack-{i}" for i in range(sessions)]
+    results = {}
+    try:
+        for mode in ("delay", "ack"):
+            for name in names:
+                TMUXClient.kill_session(name)
+                TMUXClient.create_session(name, "bash --norc --noprofile")
+            tmux_client.TMUX_DELIVERY_MODE = mode
+            tmux_client._delivery_stats.clear()
+
+            def send_all(name):
+                for n in range(commands):
+                    TMUXClient.send_command(name, f"echo {mode}-$(( {n} + 1000 ))")
+
+            threads = [threading.Thread(target=send_all, args=(name,)) for name in names]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            time.sleep(0.5)
+            lost = 0
+            for name in names:
+                output = TMUXClient.capture_pane(name, lines=200) or ""
+                lost += sum(f"\n{mode}-{n + 1000}" not in output for n in range(commands))
+            stats = TMUXClient.delivery_stats()
+            latency = sum(stats[name]["avg_latency_ms"] for name in names) / sessions
+            results[mode] = (latency, lost)
+    finally:
+        tmux_client.TMUX_DELIVERY_MODE = "delay"
+        for name in names:
+            get_pane_streamer().unwatch(name)
+            TMUXClient.kill_session(name)
+    return results
+
+
+def main():
+    TMUXClient.kill_session(SESSION)
+    if not TMUXClient.create_session(SESSION, "cat"):
+        print("tmux not available")
+        return
+
+    try:
+        print("\n[PERF] TMUXClient per-call cost (µs)")
+        print(f"  {'transport':<16}{'session_exists':>16}{'capture_pane':>14}{'send_keys':>12}")
+        for label, timings in benchmark_transports().items():
+            print(f"  {label:<16}{timings['session_exists']:>16.1f}"
+                  f"{timings['capture_pane']:>14.1f}{timings['send_keys']:>12.1f}")
+
+        sequential, concurrent = benchmark_broadcast()
+        print("\n[PERF] Sending one command to 20 sessions (control mode)")
+        print(f"  one by one: {sequential:.2f} s  broadcast(): {concurrent:.2f} s")
+
+        print("\n[PERF] Liveness + last 10 lines of 20 sessions (ms)")
+        for label, (per_session, bulk) in benchmark_bulk_capture().items():
+            print(f"  {label:<16}per session: {per_session:>7.1f}  capture_all(): {bulk:>6.1f}")
+
+        tmux_client.TMUX_CONTROL_MODE = False
+        polled, streamed = benchmark_completion_detection()
+        print("\n[PERF] Completion marker detection latency (ms, approx.)")
+        print(f"  capture_pane every 0.5 s: {polled:.0f}  streamed: {streamed:.0f}")
+
+        print("\n[PERF] send_command, 10 sessions x 10 commands concurrently")
+        for mode, (latency, lost) in benchmark_delivery().items():
+            print(f"  {mode:<8}avg latency: {latency:>6.1f} ms  lost: {lost}")
+    finally:
+        tmux_client.TMUX_CONTROL_MODE = False
+        close_control_clients()
+        TMUXClient.kill_session(SESSION)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Tests for the asyncio TMUX client
+"""
+
+import asyncio
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.tmux_client import AsyncTMUXClient, TMUXClient
+
+
+def fake_tmux(client, fail_on=None):
+    """Replace client._run, recording tmux argument lists"""
+    calls = []
+
+    async def run(args, timeout=10):
+        calls.append(args)
+        await asyncio.sleep(0)
+        return (fail_on not in args), ""
+
+    client._run = run
+    return calls
+
+
+class TestAsyncSending:
+    """Test ordered, coalesced, non-blocking sends"""
+
+    def test_queued_commands_are_coalesced(self):
+        client = AsyncTMUXClient()
+        calls = fake_tmux(client)
+
+        async def run():
+            return await asyncio.gather(*(client.send_command("s", f"cmd{n}", delay=0.01)
+                                          for n in range(3)))
+
+        assert asyncio.run(run()) == [True, True, True]
+        assert calls == [
+            ["send-keys", "-t", "s", "cmd0"],
+            ["send-keys", "-t", "s", "Enter", "cmd1"],
+            ["send-keys", "-t", "s", "Enter", "cmd2"],
+            ["send-keys", "-t", "s", "Enter"],
+        ]
+
+    def test_keys_merge_into_next_call(self):
+        client = AsyncTMUXClient()
+        calls = fake_tmux(client)
+
+        async def run():
+            return await asyncio.gather(client.send_keys("s", "C-c"), client.send_keys("s", "q"),
+                                        client.send_command("s", "ls", delay=0.01))
+
+        assert asyncio.run(run()) == [True, True, True]
+        assert calls == [["send-keys", "-t", "s", "C-c", "q", "ls"], ["send-keys", "-t", "s", "Enter"]]
+
+    def test_delay_does_not_block_event_loop(self):
+        client = AsyncTMUXClient()
+        fake_tmux(client)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.02)
+
+        async def run():
+            await asyncio.gather(client.send_command("s", "slow", delay=0.2), ticker())
+
+        asyncio.run(run())
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+    def test_sessions_send_in_parallel(self):
+        client = AsyncTMUXClient()
+        fake_tmux(client)
+
+        async def run():
+            return await asyncio.gather(*(client.send_command(f"s{n}", "hi", delay=0.1)
+                                          for n in range(20)))
+
+        start = time.time()
+        assert all(asyncio.run(run()))
+        assert time.time() - start < 0.5
+
+    def test_failed_text_skips_enter(self):
+        client = AsyncTMUXClient()
+        calls = fake_tmux(client, fail_on="bad")
+
+        async def run():
+            return await asyncio.gather(client.send_command("s", "bad", delay=0.01),
+                                        client.send_command("s", "good", delay=0.01))
+
+        assert asyncio.run(run()) == [False, True]
+        assert calls == [["send-keys", "-t", "s", "bad"], ["send-keys", "-t", "s", "good"],
+                         ["send-keys", "-t", "s", "Enter"]]
+
+    def test_timed_out_process_is_reaped(self, monkeypatch):
+        import core.tmux_client as tmux_client
+        monkeypatch.setattr(TMUXClient, "_control", staticmethod(lambda: None))
+        monkeypatch.setattr(tmux_client, "TMUX_BIN", "sleep")
+        procs = []
+        spawn = asyncio.create_subprocess_exec
+
+        async def create_subprocess_exec(*args, **kwargs):
+            procs.append(await spawn(*args, **kwargs))
+            return procs[-1]
+
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", create_subprocess_exec)
+
+        assert asyncio.run(AsyncTMUXClient()._run(["5"], timeout=0.1)) == (False, "")
+        assert procs[0].returncode is not None
+
+
+@pytest.mark.skipif(not shutil.which("tmux"), reason="TMUX not installed")
+class TestAsyncSnapshot:
+    """Test coalescing of concurrent snapshots"""
+
+    def test_identical_requests_share_one_capture(self):
+        client = AsyncTMUXClient()
+        captures = []
+
+        async def capture_all(sessions, lines=50):
+            captures.append(sessions)
+            await asyncio.sleep(0.05 if sessions == ["slow"] else 0)
+            return {session: f"{session} output" for session in sessions}
+
+        client.capture_all = capture_all
+
+        async def run():
+            slow = [asyncio.ensure_future(client.snapshot(["slow"])) for _ in range(3)]
+            await asyncio.sleep(0)
+            fast = await client.snapshot(["fast"])
+            # The other session set did not wait for the slow capture
+            assert not any(task.done() for task in slow)
+            return fast, await asyncio.gather(*slow)
+
+        fast, slow = asyncio.run(run())
+        assert fast == {"fast": "fast output"}
+        assert slow == [{"slow": "slow output"}] * 3
+        assert captures == [["slow"], ["fast"]]
+        assert not client._snapshots_inflight
+
+
+class TestAsyncTMUXClientIntegration:
+    """Integration tests with a real tmux server"""
+
+    SESSION = "pytest-async-tmux"
+
+    @pytest.fixture(autouse=True)
+    def session(self):
+        TMUXClient.kill_session(self.SESSION)
+        assert TMUXClient.create_session(self.SESSION, "bash --norc --noprofile")
+        yield
+        TMUXClient.kill_session(self.SESSION)
+
+    def test_send_and_capture(self):
+        client = AsyncTMUXClient()
+
+        async def run():
+            assert await client.session_exists(self.SESSION)
+            assert not await client.session_exists("pytest-async-missing")
+            assert await client.send_command(self.SESSION, "echo async-one")
+            assert await client.send_command(self.SESSION, "echo async-two")
+            await asyncio.sleep(0.3)
+            return await client.capture_pane(self.SESSION)
+
+        output = asyncio.run(run())
+        assert output.index("\nasync-one") < output.index("\nasync-two")
+
+    def test_snapshot(self):
+        client = AsyncTMUXClient()
+
+        async def run():
+            first = await client.snapshot([self.SESSION, "pytest-async-missing"], lines=5)
+            second = await client.snapshot([self.SESSION, "pytest-async-missing"], lines=5)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is second
+        assert first["pytest-async-missing"] is None
+        assert isinstance(first[self.SESSION], str)
@@ -0,0 +1,109 @@
+"""
+Tests for the pooled SQLite access layer
+"""
+
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import db_pool
+from core.db_pool import close_all, connect, pool_stats
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "mcp_system.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE agent_states (agent TEXT PRIMARY KEY, status TEXT)")
+    conn.execute("INSERT INTO agent_states VALUES ('supervisor', 'active')")
+    conn.commit()
+    conn.close()
+    yield path
+    close_all()
+
+
+class TestConnectionPool:
+    """Test per-thread reuse and connection settings"""
+
+    def test_close_returns_connection_for_reuse(self, db_path):
+        conn = connect(db_path)
+        conn.close()
+        assert connect(db_path) is conn
+
+    def test_nested_checkouts_get_separate_connections(self, db_path):
+        outer = connect(db_path)
+        inner = connect(db_path)
+        assert inner is not outer
+        inner.close()
+        outer.close()
+
+    def test_threads_get_their_own_connections(self, db_path):
+        conn = connect(db_path)
+        conn.close()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(connect(db_path)))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+
+    def test_pragmas_applied(self, db_path):
+        conn = connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] < 0
+        conn.close()
+
+    def test_uncommitted_changes_rolled_back_on_close(self, db_path):
+        conn = connect(db_path)
+        conn.execute("UPDATE agent_states SET status = 'busy'")
+        conn.close()
+
+        conn = connect(db_path)
+        assert conn.execute("SELECT status FROM agent_states").fetchone() == ("active",)
+        conn.close()
+
+    def test_row_factory_reset_on_checkout(self, db_path):
+        conn = connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.close()
+        assert connect(db_path).execute("SELECT agent FROM agent_states").fetchone() == ("supervisor",)
+
+    def test_connection_settings_restored_on_close(self, db_path):
+        conn = connect(db_path)
+        conn.isolation_level = None
+        conn.text_factory = bytes
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE agent_states SET status = 'busy'")
+        conn.close()
+
+        conn = connect(db_path)
+        assert not conn.in_transaction
+        assert conn.isolation_level == ""
+        assert conn.text_factory is str
+        assert conn.execute("SELECT status FROM agent_states").fetchone() == ("active",)
+        conn.close()
+
+    def test_close_all_discards_idle_connections(self, db_path):
+        conn = connect(db_path)
+        conn.close()
+        opened = pool_stats()["opened"]
+        close_all()
+
+        fresh = connect(db_path)
+        assert fresh is not conn
+        assert pool_stats()["opened"] == opened + 1
+        assert fresh.execute("SELECT COUNT(*) FROM agent_states").fetchone() == (1,)
+
+    def test_idle_connections_bounded(self, db_path):
+        conns = [connect(db_path) for _ in range(db_pool.MAX_IDLE_PER_THREAD + 2)]
+        for conn in conns:
+            conn.close()
+        assert len(db_pool._idle(str(db_path))) == db_pool.MAX_IDLE_PER_THREAD
+        with pytest.raises(sqlite3.ProgrammingError):
+            conns[-1].execute("SELECT 1")
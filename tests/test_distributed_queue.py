@@ -0,0 +1,705 @@
+"""
+Tests for the Redis-backed DistributedQueue (run against fakeredis)
+"""
+
+import dataclasses
+import json
+import pickle
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from core.distributed_queue import (
+    BinaryTaskCodec,
+    CodecError,
+    ConsistentHashRing,
+    DistributedQueue,
+    PickleTaskCodec,
+    ShardedDistributedQueue,
+    Task,
+    TaskPriority,
+    TaskState,
+)
+
+
+@pytest.fixture
+def queue():
+    """Queue backed by an isolated fakeredis server (background threads not started)"""
+    return DistributedQueue(redis_client=fakeredis.FakeStrictRedis())
+
+
+class TestDequeue:
+    """Test atomic, blocking dequeue"""
+
+    def test_priority_order(self, queue):
+        queue.submit(Task(name="low", agent="backend", priority=TaskPriority.LOW))
+        queue.submit(Task(name="normal", agent="backend"))
+        queue.submit(Task(name="critical", agent="backend", priority=TaskPriority.CRITICAL))
+        queue.submit(Task(name="normal-2", agent="backend"))
+
+        names = [queue.get("backend", block=False).name for _ in range(4)]
+        assert names == ["critical", "normal", "normal-2", "low"]
+        assert queue.get("backend", block=False) is None
+
+    def test_dequeue_marks_processing(self, queue):
+        task_id = queue.submit(Task(agent="backend"))
+        task = queue.get("backend", block=False)
+
+        assert task.id == task_id
+        assert task.state == TaskState.RUNNING
+        assert queue.redis.zscore(queue.PROCESSING_SET, task_id) > time.time()
+        assert queue.get_status(task_id)["state"] == "RUNNING"
+
+    def test_lease_covers_task_timeout_from_dequeue(self, queue):
+        task_id = queue.submit(Task(agent="backend", timeout=7200))
+        leases = []
+        decode = queue._decode_task
+
+        def decode_task(task_id, data):
+            # Lease as set by the dequeue script, before the task is decoded
+            leases.append(queue.redis.zscore(queue.PROCESSING_SET, task_id))
+            return decode(task_id, data)
+
+        queue._decode_task = decode_task
+        queue.get("backend", block=False)
+        assert leases[0] > time.time() + 7000
+        assert queue.redis.zscore(queue.PROCESSING_SET, task_id) > time.time() + 7000
+
+    def test_legacy_record_lease_uses_task_timeout(self, queue):
+        queue.codec = PickleTaskCodec()
+        task_id = queue.submit(Task(agent="backend", timeout=7200))
+        queue.codec = BinaryTaskCodec()
+
+        assert queue.get("backend", block=False).timeout == 7200
+        assert queue.redis.zscore(queue.PROCESSING_SET, task_id) > time.time() + 7000
+
+    def test_blocking_get_wakes_on_submit(self, queue):
+        timer = threading.Timer(0.1, lambda: queue.submit(Task(name="late", agent="db")))
+        timer.start()
+
+        start = time.time()
+        task = queue.get("db", block=True, timeout=2)
+        elapsed = time.time() - start
+        timer.join()
+
+        assert task is not None and task.name == "late"
+        assert elapsed < 1.0
+
+    def test_blocking_get_times_out(self, queue):
+        start = time.time()
+        assert queue.get("db", block=True, timeout=0.2) is None
+        assert 0.15 <= time.time() - start < 1.0
+
+    def test_signal_tokens_track_queue_length(self, queue):
+        for _ in range(5):
+            queue.submit(Task(agent="api"))
+        queue.get("api", block=False)
+        queue.get("api", block=True, timeout=1)
+
+        assert queue.redis.zcard(f"{queue.AGENT_QUEUE_PREFIX}api") == 3
+        assert queue.redis.llen(f"{queue.AGENT_SIGNAL_PREFIX}api") == 3
+
+    def test_cancel_removes_queued_task(self, queue):
+        task_id = queue.submit(Task(agent="api"))
+        queue.cancel(task_id)
+
+        assert queue.get("api", block=False) is None
+        assert queue.redis.llen(f"{queue.AGENT_SIGNAL_PREFIX}api") == 0
+
+    def test_migrates_legacy_list_queue(self, queue):
+        import pickle
+
+        queued = Task(agent="api", name="queued")
+        cancelled = Task(agent="api", name="cancelled")
+        queue.redis.rpush(f"{queue.AGENT_QUEUE_PREFIX}api", pickle.dumps(queued), pickle.dumps(cancelled))
+        cancelled.state = TaskState.CANCELLED
+        queue._save_task(cancelled)
+
+        queue._migrate_agent_queues()
+        new_id = queue.submit(Task(agent="api", priority=TaskPriority.LOW))
+
+        assert queue.get("api", block=False).id == queued.id
+        assert queue.get("api", block=False).id == new_id
+        assert queue.get("api", block=False) is None
+        assert not queue.redis.keys(f"{queue.LEGACY_QUEUE_PREFIX}*")
+
+    def test_concurrent_workers_get_each_task_once(self, queue):
+        for i in range(50):
+            queue.submit(Task(name=str(i), agent="worker"))
+
+        seen = []
+        lock = threading.Lock()
+
+        def consume():
+            while True:
+                task = queue.get("worker", block=True, timeout=0.2)
+                if not task:
+                    return
+                with lock:
+                    seen.append(task.name)
+
+        threads = [threading.Thread(target=consume) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(seen, key=int) == [str(i) for i in range(50)]
+
+
+class TestTaskCodec:
+    """Test the versioned binary task codec"""
+
+    def make_task(self):
+        return Task(
+            name="build", agent="backend", priority=TaskPriority.HIGH,
+            state=TaskState.RUNNING, payload={"command": "npm test", "files": ["a.py", "b.py"]},
+            retry_count=2, timeout=600, started_at=1700000000.5, result={"ok": True},
+            dependencies=["dep-1"], metadata={"workflow": "wf-1"}, ttl=3600
+        )
+
+    def test_round_trip(self):
+        codec = BinaryTaskCodec()
+        task = self.make_task()
+
+        decoded = codec.decode(codec.encode(task))
+
+        assert decoded.to_dict() == task.to_dict()
+        assert decoded.scheduled_at is None
+        assert decoded.completed_at is None
+        assert isinstance(decoded.priority, TaskPriority)
+
+    def test_schema_version_byte(self):
+        data = BinaryTaskCodec().encode(self.make_task())
+        assert data[0] == 1
+
+        with pytest.raises(CodecError):
+            BinaryTaskCodec().decode(bytes([99]) + data[1:])
+
+    def test_payload_decoded_lazily(self):
+        codec = BinaryTaskCodec()
+        data = codec.encode(self.make_task())
+
+        decoded = codec.decode(data)
+        assert not decoded.payload_decoded
+
+        # Re-encoding an untouched payload reuses the original bytes
+        decoded.state = TaskState.COMPLETED
+        assert codec.encode(decoded)[-20:] == data[-20:]
+        assert not decoded.payload_decoded
+
+        assert decoded.payload["command"] == "npm test"
+        assert decoded.payload_decoded
+
+    def test_decoded_payload_is_plain_dict(self):
+        codec = BinaryTaskCodec()
+        task = self.make_task()
+        data = codec.encode(task)
+
+        # Pickling an undecoded task keeps it lazy
+        assert pickle.loads(pickle.dumps(codec.decode(data))) == task
+        decoded = codec.decode(data)
+        assert type(decoded.payload) is dict
+        assert json.loads(json.dumps(decoded.payload)) == task.payload
+
+        # Dataclass helpers see the decoded payload like any other field
+        assert dataclasses.asdict(codec.decode(data))["payload"] == task.payload
+        assert dataclasses.replace(codec.decode(data), name="other").payload == task.payload
+        assert repr(codec.decode(data)) == repr(task)
+
+    def test_modified_payload_is_reencoded(self):
+        codec = BinaryTaskCodec()
+        decoded = codec.decode(codec.encode(self.make_task()))
+        decoded.payload["command"] = "pytest"
+
+        assert codec.decode(codec.encode(decoded)).payload["command"] == "pytest"
+
+    def test_reads_legacy_pickle_records(self):
+        legacy = PickleTaskCodec().encode(self.make_task())
+
+        assert BinaryTaskCodec().decode(legacy).name == "build"
+        with pytest.raises(CodecError):
+            BinaryTaskCodec(legacy_pickle=False).decode(legacy)
+
+    def test_smaller_than_pickle(self):
+        task = self.make_task()
+        assert len(BinaryTaskCodec().encode(task)) < len(PickleTaskCodec().encode(task))
+
+    def test_queue_stores_binary_records(self, queue):
+        task = self.make_task()
+        task.dependencies = []
+        task_id = queue.submit(task)
+        stored = queue.redis.get(f"{queue.TASK_PREFIX}{task_id}")
+
+        assert stored[0] == 1
+        assert queue.get("backend", block=False).payload["files"] == ["a.py", "b.py"]
+
+
+class TestDependencyIndex:
+    """Test release of dependent tasks through the reverse dependency index"""
+
+    def run(self, queue, agent):
+        task = queue.get(agent, block=False)
+        queue.complete(task.id)
+        return task
+
+    def test_dependent_waits_until_all_dependencies_complete(self, queue):
+        first = queue.submit(Task(name="first", agent="db"))
+        second = queue.submit(Task(name="second", agent="db"))
+        child = queue.submit(Task(name="child", agent="api", dependencies=[first, second]))
+
+        assert queue.get("api", block=False) is None
+        assert int(queue.redis.hget(queue.DEPS_REMAINING, child)) == 2
+
+        self.run(queue, "db")
+        assert queue.get("api", block=False) is None
+        assert int(queue.redis.hget(queue.DEPS_REMAINING, child)) == 1
+
+        self.run(queue, "db")
+        released = queue.get("api", block=False)
+        assert released.id == child
+        assert not queue.redis.hexists(queue.DEPS_REMAINING, child)
+        assert not queue.redis.exists(f"{queue.DEPS_WAITING_PREFIX}{first}")
+
+    def test_completed_dependency_does_not_block(self, queue):
+        dep = queue.submit(Task(agent="db"))
+        self.run(queue, "db")
+
+        child = queue.submit(Task(agent="api", dependencies=[dep, dep]))
+        assert queue.get("api", block=False).id == child
+
+    def test_fan_in_releases_all_waiters_at_once(self, queue):
+        dep = queue.submit(Task(agent="db"))
+        children = {queue.submit(Task(agent="api", dependencies=[dep])) for _ in range(50)}
+
+        self.run(queue, "db")
+
+        released = {queue.get("api", block=False).id for _ in range(50)}
+        assert released == children
+        assert queue.redis.zcard(f"{queue.AGENT_QUEUE_PREFIX}api") == 0
+
+    def test_cancelled_waiter_is_not_released(self, queue):
+        dep = queue.submit(Task(agent="db"))
+        child = queue.submit(Task(agent="api", dependencies=[dep]))
+        queue.cancel(child)
+
+        self.run(queue, "db")
+        assert queue.get("api", block=False) is None
+        assert queue.get_status(child)["state"] == "CANCELLED"
+
+
+class TestBatchOperations:
+    """Test pipelined submit_many / complete_many / fail_many"""
+
+    def count_round_trips(self, queue, monkeypatch):
+        calls = []
+        client = queue.redis
+        execute_command, pipeline = client.execute_command, client.pipeline
+
+        def counted_command(*args, **kwargs):
+            calls.append(args[0])
+            return execute_command(*args, **kwargs)
+
+        def counted_pipeline(*args, **kwargs):
+            calls.append("PIPELINE")
+            return pipeline(*args, **kwargs)
+
+        monkeypatch.setattr(client, "execute_command", counted_command)
+        monkeypatch.setattr(client, "pipeline", counted_pipeline)
+        return calls
+
+    def test_submit_many_uses_constant_round_trips(self, queue, monkeypatch):
+        tasks = [Task(agent=f"agent-{i % 5}", priority=TaskPriority.HIGH) for i in range(1000)]
+        calls = self.count_round_trips(queue, monkeypatch)
+
+        ids = queue.submit_many(tasks)
+
+        assert len(ids) == len(set(ids)) == 1000
+        assert len(calls) <= 3
+        metrics = queue._get_metrics()
+        assert metrics["tasks_submitted"] == 1000
+        assert metrics["tasks_submitted_high"] == 1000
+        assert sum(queue.redis.zcard(f"{queue.AGENT_QUEUE_PREFIX}agent-{i}") for i in range(5)) == 1000
+
+    def test_submit_many_indexes_dependencies(self, queue):
+        dep = queue.submit(Task(agent="db"))
+        ids = queue.submit_many([Task(agent="api"), Task(agent="api", dependencies=[dep])])
+
+        assert queue.get("api", block=False).id == ids[0]
+        assert queue.get("api", block=False) is None
+
+        task = queue.get("db", block=False)
+        queue.complete_many({task.id: "done"})
+        assert queue.get("api", block=False).id == ids[1]
+
+    def test_complete_many(self, queue, monkeypatch):
+        queue.submit_many([Task(agent="db") for _ in range(100)])
+        running = [queue.get("db", block=False) for _ in range(100)]
+        calls = self.count_round_trips(queue, monkeypatch)
+
+        queue.complete_many({task.id: {"n": i} for i, task in enumerate(running)})
+
+        assert len(calls) <= 3
+        assert queue.redis.zcard(queue.PROCESSING_SET) == 0
+        assert queue.redis.scard(queue.COMPLETED_SET) == 100
+        assert queue._get_metrics()["tasks_completed"] == 100
+        assert queue.get_status(running[7].id)["result"] == {"n": 7}
+
+    def test_fail_many_retries_then_fails(self, queue):
+        retry_id, final_id = queue.submit_many([Task(agent="db", max_retries=3),
+                                                Task(agent="db", max_retries=1)])
+        queue.get("db", block=False)
+        queue.get("db", block=False)
+
+        queue.fail_many({retry_id: "flaky", final_id: "broken"})
+
+        assert queue.get_status(retry_id)["state"] == "RETRYING"
+        assert queue.redis.zscore(queue.DELAYED_QUEUE, retry_id) is not None
+        assert queue.get_status(final_id)["state"] == "FAILED"
+        assert queue.redis.sismember(queue.FAILED_SET, final_id)
+        assert queue._get_metrics()["tasks_failed"] == 1
+
+    def test_broadcast(self, queue):
+        agents = ["backend-api", "database", "frontend-ui"]
+        task_ids = queue.broadcast("sync", {"cmd": "git pull"}, agents)
+
+        assert set(task_ids) == set(agents)
+        for agent in agents:
+            task = queue.get(agent, block=False)
+            assert task.id == task_ids[agent]
+            assert task.payload["cmd"] == "git pull"
+
+
+class TestQueueStatus:
+    """Test counter-based, cached queue status"""
+
+    def test_status_counts(self, queue):
+        queue.status_cache_ttl = 0
+        dep = queue.submit(Task(agent="db"))
+        queue.submit_many([Task(agent="api"), Task(agent="api"), Task(agent="ui", dependencies=[dep])])
+        queue.get("db", block=False)
+
+        status = queue.get_queue_status()
+        assert status["agent_queues"] == {"api": 2, "db": 0}
+        assert status["processing"] == 1
+        assert status["pending"] == status["waiting_on_dependencies"] == 1
+        assert status["metrics"]["tasks_submitted"] == 3
+
+    def test_status_does_not_scan_keyspace(self, queue, monkeypatch):
+        queue.submit(Task(agent="api"))
+        monkeypatch.setattr(queue.redis, "keys", lambda *a, **kw: pytest.fail("KEYS called"))
+
+        assert queue.get_queue_status()["agent_queues"] == {"api": 1}
+        queue._update_queue_metrics()
+        assert queue._get_metrics()["queue_size_api"] == 1
+
+    def test_snapshot_shared_within_ttl(self, queue, monkeypatch):
+        queue.submit(Task(agent="api"))
+        collected = []
+        collect = queue._collect_queue_status
+        monkeypatch.setattr(queue, "_collect_queue_status",
+                            lambda: collected.append(1) or collect())
+
+        threads = [threading.Thread(target=queue.get_queue_status) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(collected) == 1
+
+        queue._status_time -= queue.status_cache_ttl
+        queue.get_queue_status()
+        assert len(collected) == 2
+
+
+class TestLeases:
+    """Test visibility-timeout leases on processing tasks"""
+
+    def test_lease_follows_task_timeout(self, queue):
+        queue.submit(Task(agent="db", timeout=30))
+        task = queue.get("db", block=False)
+
+        expiry = queue.redis.zscore(queue.PROCESSING_SET, task.id)
+        assert expiry == pytest.approx(task.started_at + 30)
+
+    def test_heartbeat_extends_lease(self, queue):
+        queue.submit(Task(agent="db", timeout=1))
+        task = queue.get("db", block=False)
+
+        assert queue.heartbeat(task, seconds=600)
+        assert queue.redis.zscore(queue.PROCESSING_SET, task.id) > time.time() + 500
+        queue.complete(task.id)
+        assert not queue.heartbeat(task)
+
+    def test_expired_lease_is_reclaimed_once(self, queue):
+        queue.submit_many([Task(agent="db", timeout=30), Task(agent="db", timeout=30)])
+        stale = queue.get("db", block=False)
+        alive = queue.get("db", block=False)
+        queue.extend_lease(stale.id, -1)
+
+        assert queue.reclaim_expired() == [stale.id]
+        assert queue.reclaim_expired() == []
+        assert queue.get_status(stale.id)["state"] == "RETRYING"
+        assert queue.redis.zscore(queue.DELAYED_QUEUE, stale.id) is not None
+        assert queue.redis.zscore(queue.PROCESSING_SET, alive.id) is not None
+
+    def test_migrates_legacy_processing_set(self, queue):
+        queue.redis.sadd(queue.PROCESSING_SET, "old-task")
+        queue._migrate_processing_set()
+
+        assert queue.redis.type(queue.PROCESSING_SET) == b"zset"
+        assert queue.redis.zscore(queue.PROCESSING_SET, "old-task") > time.time()
+
+    def test_worker_heartbeats_long_task(self, queue):
+        from core.distributed_queue import TaskWorker
+
+        leases = []
+
+        def handler(task):
+            time.sleep(0.35)
+            leases.append(queue.redis.zscore(queue.PROCESSING_SET, task.id))
+            return "ok"
+
+        queue.submit(Task(agent="db", timeout=1))
+        task = queue.get("db", block=False)
+        worker = TaskWorker("db", queue, handler, heartbeat_interval=0.1)
+        assert worker._run_with_heartbeat(task) == "ok"
+        assert leases[0] > task.started_at + 1.2
+
+
+@pytest.fixture
+def sharded():
+    """Queue sharded across three independent fakeredis servers"""
+    clients = [fakeredis.FakeStrictRedis(server=fakeredis.FakeServer()) for _ in range(3)]
+    return ShardedDistributedQueue(clients, status_cache_ttl=0)
+
+
+def agents_on_distinct_shards(queue, count=2):
+    """Agent names whose queues live on different shards"""
+    agents = {}
+    for i in range(1000):
+        agent = f"agent-{i}"
+        agents.setdefault(queue.shard_index_for_agent(agent), agent)
+        if len(agents) == count:
+            return list(agents.values())
+    raise AssertionError("could not spread agents across shards")
+
+
+class TestShardedQueue:
+    """Test consistent-hash sharding across several Redis servers"""
+
+    def test_ring_moves_few_keys_when_adding_a_shard(self):
+        keys = [f"agent-{i}" for i in range(2000)]
+        before = ConsistentHashRing(4)
+        after = ConsistentHashRing(5)
+
+        moved = sum(before.get(key) != after.get(key) for key in keys)
+        assert moved < len(keys) * 0.35
+
+    def test_from_urls_needs_redis(self, monkeypatch):
+        monkeypatch.setattr("core.distributed_queue.REDIS_AVAILABLE", False)
+        with pytest.raises(ImportError, match="redis is required"):
+            ShardedDistributedQueue.from_urls(["redis://localhost:6379/1"])
+
+    def test_agents_spread_and_round_trip(self, sharded):
+        agents = [f"agent-{i}" for i in range(30)]
+        task_ids = sharded.broadcast("sync", {"cmd": "ls"}, agents)
+
+        used = {sharded.shard_index_for_agent(agent) for agent in agents}
+        assert len(used) == 3
+        for agent in agents:
+            task = sharded.get(agent, block=False)
+            assert task.id == task_ids[agent]
+            # Agent queue and record live only on the home shard
+            home = sharded.shard_for_agent(agent)
+            assert home.redis.exists(f"{home.TASK_PREFIX}{task.id}")
+
+        sharded.complete_many({task_id: "ok" for task_id in task_ids.values()})
+        assert sharded.get_status(task_ids["agent-3"])["state"] == "COMPLETED"
+
+    def test_complete_from_another_process(self, sharded):
+        task_id = sharded.submit(Task(agent="backend"))
+        sharded.get("backend", block=False)
+
+        # Fresh wrapper over the same servers has no cached locations
+        other = ShardedDistributedQueue([shard.redis for shard in sharded.shards])
+        other.complete(task_id, "done")
+        assert sharded.get_status(task_id)["result"] == "done"
+
+    def test_cross_shard_dependencies(self, sharded):
+        parent_agent, child_agent = agents_on_distinct_shards(sharded)
+        first = sharded.submit(Task(agent=parent_agent))
+        second = sharded.submit(Task(agent=parent_agent))
+        child = sharded.submit(Task(agent=child_agent, dependencies=[first, second]))
+
+        assert sharded.get(child_agent, block=False) is None
+        sharded.complete(sharded.get(parent_agent, block=False).id)
+        assert sharded.get(child_agent, block=False) is None
+        sharded.complete(sharded.get(parent_agent, block=False).id)
+
+        assert sharded.get(child_agent, block=False).id == child
+
+    def test_completed_remote_dependency_does_not_block(self, sharded):
+        parent_agent, child_agent = agents_on_distinct_shards(sharded)
+        dep = sharded.submit(Task(agent=parent_agent))
+        sharded.complete(sharded.get(parent_agent, block=False).id)
+
+        child = sharded.submit(Task(agent=child_agent, dependencies=[dep]))
+        assert sharded.get(child_agent, block=False).id == child
+
+    def test_aggregated_status(self, sharded):
+        agents = agents_on_distinct_shards(sharded, 3)
+        blocker = sharded.submit(Task(agent=agents[0]))
+        sharded.submit_many([Task(agent=agent) for agent in agents])
+        sharded.submit(Task(agent=agents[1], dependencies=[blocker]))
+        sharded.get(agents[2], block=False)
+
+        status = sharded.get_queue_status()
+        assert status["shards"] == 3
+        assert status["agent_queues"] == {agents[0]: 2, agents[1]: 1, agents[2]: 0}
+        assert status["processing"] == 1
+        assert status["waiting_on_dependencies"] == 1
+        assert status["metrics"]["tasks_submitted"] == 4
+
+
+class TestScheduler:
+    """Test the next-due delayed task scheduler"""
+
+    def test_future_task_waits_in_delayed_queue(self, queue):
+        task_id = queue.submit(Task(agent="api", scheduled_at=time.time() + 60))
+
+        assert queue.get("api", block=False) is None
+        assert queue.redis.zscore(queue.DELAYED_QUEUE, task_id) is not None
+        assert queue._move_due_tasks() == 0
+
+        assert queue._move_due_tasks(now=time.time() + 61) == 1
+        assert queue.get("api", block=False).id == task_id
+
+    def test_cancelled_delayed_task_is_not_scheduled(self, queue):
+        task_id = queue.submit(Task(agent="api", scheduled_at=time.time() + 5))
+        queue.cancel(task_id)
+        assert queue.redis.zscore(queue.DELAYED_QUEUE, task_id) is None
+
+        # Cancelled after the scheduler read the delayed queue
+        queue.redis.zadd(queue.DELAYED_QUEUE, {task_id: time.time()})
+        queue._move_due_tasks(now=time.time() + 6)
+        assert queue.get("api", block=False) is None
+        assert queue.get_status(task_id)["state"] == TaskState.CANCELLED.name
+
+    def test_earliest_insert_signals_scheduler(self, queue):
+        queue.submit(Task(agent="api", scheduled_at=time.time() + 60))
+        assert queue.redis.llen(queue.DELAYED_SIGNAL) == 1
+        queue.redis.delete(queue.DELAYED_SIGNAL)
+
+        # Later than the head: no wake-up needed
+        queue.submit(Task(agent="api", scheduled_at=time.time() + 120))
+        assert queue.redis.llen(queue.DELAYED_SIGNAL) == 0
+
+        queue.submit_many([Task(agent="api", scheduled_at=time.time() + 30) for _ in range(3)])
+        assert queue.redis.llen(queue.DELAYED_SIGNAL) == 1
+
+    def test_moves_due_tasks_in_batches(self, queue):
+        queue.scheduler_batch_size = 10
+        due = time.time() + 5
+        queue.submit_many([Task(agent="api", scheduled_at=due) for _ in range(25)])
+
+        later = due + 1
+        assert [queue._move_due_tasks(now=later) for _ in range(4)] == [10, 10, 5, 0]
+        assert queue.redis.zcard(f"{queue.AGENT_QUEUE_PREFIX}api") == 25
+
+    def test_due_task_checks_dependencies(self, queue):
+        dep = queue.submit(Task(agent="db"))
+        child = queue.submit(Task(agent="api", dependencies=[dep], scheduled_at=time.time() + 5))
+
+        queue._move_due_tasks(now=time.time() + 6)
+        assert queue.get("api", block=False) is None
+
+        queue.complete(queue.get("db", block=False).id)
+        assert queue.get("api", block=False).id == child
+
+    def test_scheduler_fires_on_time(self, queue):
+        queue.start()
+        try:
+            # A long-delayed head first, so the scheduler is asleep when the
+            # earlier task arrives
+            queue.submit(Task(agent="api", scheduled_at=time.time() + 60))
+            time.sleep(0.05)
+
+            due = time.time() + 0.2
+            queue.submit(Task(agent="api", name="soon", scheduled_at=due))
+            task = queue.get("api", block=True, timeout=2)
+            assert task.name == "soon"
+            assert time.time() - due < 0.1
+        finally:
+            queue.stop()
+
+
+class TestFairScheduling:
+    """Test weighted deficit round robin across tenants"""
+
+    def test_flood_does_not_starve_other_tenant(self, queue):
+        queue.submit_many([Task(agent="api", name="bulk", metadata={"tenant": "batch"})
+                           for _ in range(50)])
+        queue.submit_many([Task(agent="api", name="chat", metadata={"tenant": "interactive"})
+                           for _ in range(3)])
+
+        names = [queue.get("api", block=False).name for _ in range(6)]
+        assert names.count("chat") == 3
+        assert queue.get_queue_status()["agent_queues"] == {"api": 47}
+
+    def test_weights_split_dequeues(self, queue):
+        queue.set_tenant_weight("etl", 3)
+        queue.submit_many([Task(agent="api", metadata={"workflow_id": tenant})
+                           for tenant in ("etl", "reports") for _ in range(40)])
+
+        served = [queue.get("api", block=False).metadata["workflow_id"] for _ in range(40)]
+        assert served.count("etl") == 30
+        assert served.count("reports") == 10
+
+    def test_priority_order_within_tenant(self, queue):
+        queue.submit(Task(agent="api", name="low", priority=TaskPriority.LOW, metadata={"tenant": "a"}))
+        queue.submit(Task(agent="api", name="high", priority=TaskPriority.HIGH, metadata={"tenant": "a"}))
+
+        assert [queue.get("api", block=False).name for _ in range(2)] == ["high", "low"]
+        assert queue.get("api", block=False) is None
+
+    def test_tasks_without_ring_entry_are_served(self, queue):
+        # Queued by a version without tenant rings
+        task = Task(agent="api")
+        queue._save_task(task)
+        queue.redis.zadd(f"{queue.AGENT_QUEUE_PREFIX}api", {task.id: queue._queue_score(task)})
+
+        assert queue.get("api", block=False).id == task.id
+
+    def test_cancel_updates_tenant_queue(self, queue):
+        task_id = queue.submit(Task(agent="api", metadata={"tenant": "a"}))
+        queue.cancel(task_id)
+
+        assert queue.get("api", block=False) is None
+        assert queue.get_queue_status()["agent_queues"] == {"api": 0}
+        assert queue.redis.llen(f"{queue.AGENT_SIGNAL_PREFIX}api") == 0
+
+    def test_wait_time_metrics(self, queue):
+        queue.submit_many([Task(agent="api", metadata={"tenant": "a"}), Task(agent="api")])
+        time.sleep(0.02)
+        queue.get("api", block=False)
+        queue.get("api", block=False)
+
+        tenants = queue.get_queue_status()["tenants"]
+        assert set(tenants) == {"a", "default"}
+        assert tenants["a"]["dequeued"] == 1
+        assert tenants["a"]["avg_wait_ms"] >= 15
+        assert tenants["default"]["weight"] == 1.0
+
+    def test_rejects_tiny_weight(self, queue):
+        with pytest.raises(ValueError):
+            queue.set_tenant_weight("a", 0)
@@ -0,0 +1,228 @@
+"""
+Tests for the in-process LocalTaskQueue backend
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.distributed_queue import Task, TaskPriority, TaskState, TaskWorker
+from core.local_queue import LocalTaskQueue
+
+
+@pytest.fixture
+def queue():
+    """Local queue without the timer thread (tests drive _fire_due)"""
+    return LocalTaskQueue()
+
+
+class TestLocalQueue:
+    """Test the DistributedQueue API on the local backend"""
+
+    def test_priority_order(self, queue):
+        queue.submit(Task(name="low", agent="backend", priority=TaskPriority.LOW))
+        queue.submit(Task(name="normal", agent="backend"))
+        queue.submit(Task(name="critical", agent="backend", priority=TaskPriority.CRITICAL))
+        queue.submit(Task(name="normal-2", agent="backend"))
+
+        names = [queue.get("backend", block=False).name for _ in range(4)]
+        assert names == ["critical", "normal", "normal-2", "low"]
+        assert queue.get("backend", block=False) is None
+
+    def test_blocking_get_wakes_on_submit(self, queue):
+        timer = threading.Timer(0.05, lambda: queue.submit(Task(name="late", agent="db")))
+        timer.start()
+
+        start = time.time()
+        task = queue.get("db", block=True, timeout=2)
+        assert task.name == "late"
+        assert time.time() - start < 1
+
+    def test_blocking_get_times_out(self, queue):
+        start = time.time()
+        assert queue.get("db", block=True, timeout=0.1) is None
+        assert 0.08 < time.time() - start < 1
+
+    def test_dependencies(self, queue):
+        dep = queue.submit(Task(agent="db"))
+        child = queue.submit(Task(agent="api", dependencies=[dep, dep]))
+        assert queue.get("api", block=False) is None
+        assert queue.get_queue_status()["waiting_on_dependencies"] == 1
+
+        queue.complete(queue.get("db", block=False).id, "ok")
+        assert queue.get("api", block=False).id == child
+        assert queue.get_status(dep)["result"] == "ok"
+
+    def test_cancel(self, queue):
+        task_id = queue.submit(Task(agent="api"))
+        queue.cancel(task_id)
+
+        assert queue.get("api", block=False) is None
+        assert queue.get_status(task_id)["state"] == "CANCELLED"
+        assert queue.get_queue_status()["agent_queues"]["api"] == 0
+
+    def test_retry_is_delayed_then_requeued(self, queue):
+        task_id = queue.submit(Task(agent="api", max_retries=2))
+        queue.get("api", block=False)
+        queue.fail(task_id, "flaky")
+
+        assert queue.get_status(task_id)["state"] == "RETRYING"
+        assert queue.get("api", block=False) is None
+
+        queue._fire_due(time.time() + 3)
+        task = queue.get("api", block=False)
+        assert task.id == task_id
+        queue.fail(task_id, "still flaky")
+        assert queue.get_status(task_id)["state"] == "FAILED"
+        assert queue.get_queue_status()["failed"] == 1
+
+    def test_lease_expiry_and_heartbeat(self, queue):
+        queue.submit_many([Task(agent="api", timeout=30), Task(agent="api", timeout=30)])
+        stale = queue.get("api", block=False)
+        alive = queue.get("api", block=False)
+        queue.extend_lease(stale.id, -1)
+
+        assert queue.heartbeat(alive)
+        assert queue.reclaim_expired() == [stale.id]
+        assert queue.get_status(stale.id)["state"] == "RETRYING"
+        assert queue.get_queue_status()["processing"] == 1
+
+    def test_ttl_drops_records(self, queue):
+        task_id = queue.submit(Task(agent="api", ttl=1))
+        queue._fire_due(time.time() + 2)
+
+        assert queue.get_status(task_id) is None
+        assert queue.get("api", block=False) is None
+
+    def test_returned_task_is_a_copy(self, queue):
+        task_id = queue.submit(Task(agent="api"))
+        task = queue.get("api", block=False)
+        task.state = TaskState.COMPLETED
+
+        assert queue.get_status(task_id)["state"] == "RUNNING"
+
+    def test_timer_thread_fires_delayed_task(self, queue):
+        queue.start()
+        try:
+            task_id = queue.submit(Task(agent="api"))
+            queue.get("api", block=False)
+            with queue._lock:
+                task = queue._tasks[task_id]
+                task.state = TaskState.RETRYING
+                task.scheduled_at = time.time() + 0.05
+                queue._leases.pop(task_id)
+                queue._schedule(task)
+
+            assert queue.get("api", block=True, timeout=1).id == task_id
+        finally:
+            queue.stop()
+
+    def test_works_with_task_worker(self, queue):
+        done = threading.Event()
+
+        def handler(task):
+            done.set()
+            return task.payload["n"] * 2
+
+        task_id = queue.submit(Task(agent="api", payload={"n": 21}))
+        worker = TaskWorker("api", queue, handler)
+        worker.start()
+        try:
+            assert done.wait(2)
+            deadline = time.time() + 2
+            while queue.get_status(task_id)["state"] != "COMPLETED" and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            worker.stop()
+        assert queue.get_status(task_id)["result"] == 42
+
+
+class TestLocalQueueLog:
+    """Test the optional SQLite append log"""
+
+    def test_replay_restores_state(self, tmp_path):
+        path = str(tmp_path / "queue.db")
+        queue = LocalTaskQueue(log_path=path)
+        done = queue.submit(Task(agent="db"))
+        queue.complete(queue.get("db", block=False).id, "ok")
+        queued = queue.submit(Task(agent="api", priority=TaskPriority.HIGH))
+        waiting = queue.submit(Task(agent="api", dependencies=[queued]))
+        running = queue.submit(Task(agent="ui"))
+        queue.get("ui", block=False)
+        cancelled = queue.submit(Task(agent="ui"))
+        queue.cancel(cancelled)
+        queue.stop()
+
+        restored = LocalTaskQueue(log_path=path)
+        assert restored.get_status(done)["result"] == "ok"
+        assert restored.get_status(cancelled)["state"] == "CANCELLED"
+        # In-flight work is queued again after a crash
+        assert restored.get("ui", block=False).id == running
+        assert restored.get("ui", block=False) is None
+
+        restored.complete(restored.get("api", block=False).id)
+        assert restored.get("api", block=False).id == waiting
+        restored.stop()
+
+    def test_log_compacted_on_open(self, tmp_path):
+        path = str(tmp_path / "queue.db")
+        queue = LocalTaskQueue(log_path=path)
+        task_id = queue.submit(Task(agent="db"))
+        queue.complete(queue.get("db", block=False).id)
+        queue.stop()
+
+        restored = LocalTaskQueue(log_path=path)
+        rows = restored._log.execute("SELECT task_id FROM task_log").fetchall()
+        assert rows == [(task_id,)]
+        assert restored._log.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        restored.stop()
+
+
+class TestLocalScheduling:
+    """Test future scheduled_at on the local backend"""
+
+    def test_scheduled_task_fires(self, queue):
+        queue.start()
+        try:
+            due = time.time() + 0.1
+            task_id = queue.submit(Task(agent="api", scheduled_at=due))
+            assert queue.get("api", block=False) is None
+
+            assert queue.get("api", block=True, timeout=2).id == task_id
+            assert time.time() - due < 0.05
+        finally:
+            queue.stop()
+
+
+class TestLocalFairScheduling:
+    """Test tenant fair sharing on the local backend"""
+
+    def test_weights_split_dequeues(self, queue):
+        queue.set_tenant_weight("etl", 3)
+        queue.submit_many([Task(agent="api", metadata={"tenant": tenant})
+                           for tenant in ("etl", "reports") for _ in range(40)])
+
+        served = [queue.get("api", block=False).metadata["tenant"] for _ in range(40)]
+        assert served.count("etl") == 30
+        assert served.count("reports") == 10
+
+    def test_cancelled_tenant_leaves_ring(self, queue):
+        cancelled = queue.submit(Task(agent="api", metadata={"tenant": "a"}))
+        kept = queue.submit(Task(agent="api", metadata={"tenant": "b"}))
+        queue.cancel(cancelled)
+
+        assert queue.get("api", block=False).id == kept
+        assert queue.get("api", block=False) is None
+        assert not queue._rings["api"]
+
+    def test_wait_time_metrics(self, queue):
+        queue.submit(Task(agent="api", metadata={"tenant": "a"}))
+        queue.get("api", block=False)
+
+        assert queue.get_queue_status()["tenants"]["a"]["dequeued"] == 1
@@ -0,0 +1,523 @@
+"""
+Tests for the central MessageBus
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.message_bus import (
+    Event,
+    EventHistory,
+    EventLane,
+    EventType,
+    MessageBus,
+    MessageBusConfig,
+    OverflowPolicy,
+)
+
+
+@pytest.fixture
+def bus():
+    """Fresh, unstarted MessageBus (bypasses the process-wide singleton)"""
+    original = MessageBus._instance
+    MessageBus._instance = None
+    instance = MessageBus()
+    yield instance
+    instance.stop()
+    MessageBus._instance = original
+
+
+def dispatch(bus, event):
+    """Run the async dispatcher for a single event"""
+    asyncio.run(bus._dispatch_event(event))
+
+
+class TestSubscriptionIndex:
+    """Test dispatch index and declarative filters"""
+
+    def test_unfiltered_subscriber_receives_event(self, bus):
+        received = []
+        bus.subscribe(EventType.TASK_CREATED, received.append)
+
+        dispatch(bus, Event(type=EventType.TASK_CREATED, source="backend"))
+        dispatch(bus, Event(type=EventType.TASK_FAILED, source="backend"))
+
+        assert len(received) == 1
+        assert received[0].type == EventType.TASK_CREATED
+
+    def test_declarative_filters(self, bus):
+        by_source, by_agent, by_both = [], [], []
+        bus.subscribe(EventType.TASK_CREATED, by_source.append, source="backend")
+        bus.subscribe(EventType.TASK_CREATED, by_agent.append, agent="database")
+        bus.subscribe(EventType.TASK_CREATED, by_both.append,
+                      source="backend", agent="database")
+
+        dispatch(bus, Event(type=EventType.TASK_CREATED, source="backend", target="frontend"))
+        dispatch(bus, Event(type=EventType.TASK_CREATED, source="supervisor", target="database"))
+        dispatch(bus, Event(type=EventType.TASK_CREATED, source="backend", target="database"))
+
+        assert len(by_source) == 2
+        assert len(by_agent) == 2
+        assert len(by_both) == 1
+
+    def test_filter_func_still_supported(self, bus):
+        received = []
+        bus.subscribe(EventType.TASK_CREATED, received.append,
+                      filter_func=lambda e: e.payload.get("urgent"))
+
+        dispatch(bus, Event(type=EventType.TASK_CREATED, payload={"urgent": True}))
+        dispatch(bus, Event(type=EventType.TASK_CREATED, payload={}))
+
+        assert len(received) == 1
+
+    def test_unknown_filter_key_rejected(self, bus):
+        with pytest.raises(ValueError):
+            bus.subscribe(EventType.TASK_CREATED, print, tenant="acme")
+
+    def test_dispatch_preserves_subscription_order(self, bus):
+        order = []
+        bus.subscribe(EventType.AGENT_READY, lambda e: order.append("a"), source="backend")
+        bus.subscribe(EventType.AGENT_READY, lambda e: order.append("b"))
+        bus.subscribe(EventType.AGENT_READY, lambda e: order.append("c"), source="backend")
+
+        dispatch(bus, Event(type=EventType.AGENT_READY, source="backend"))
+
+        assert order == ["a", "b", "c"]
+
+    def test_async_handler_classified_once(self, bus):
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        sub_id = bus.subscribe(EventType.AGENT_BUSY, handler)
+        assert bus.subscriptions.get(sub_id).is_async is True
+
+        dispatch(bus, Event(type=EventType.AGENT_BUSY))
+        assert len(received) == 1
+
+    def test_unsubscribe(self, bus):
+        received = []
+        keyed = bus.subscribe(EventType.TASK_CREATED, received.append, source="backend")
+        plain = bus.subscribe(EventType.TASK_CREATED, received.append)
+
+        assert bus.unsubscribe(keyed) is True
+        assert bus.unsubscribe(keyed) is False
+        assert bus.unsubscribe(plain) is True
+        assert len(bus.subscriptions) == 0
+
+        dispatch(bus, Event(type=EventType.TASK_CREATED, source="backend"))
+        assert received == []
+
+    def test_handler_error_does_not_stop_dispatch(self, bus):
+        received = []
+
+        def broken(event):
+            raise RuntimeError("boom")
+
+        bus.subscribe(EventType.SYSTEM_ERROR, broken)
+        bus.subscribe(EventType.SYSTEM_ERROR, received.append)
+
+        dispatch(bus, Event(type=EventType.SYSTEM_ERROR))
+        assert len(received) == 1
+
+
+class TestMessageBusRunning:
+    """Test the running bus end to end"""
+
+    def test_publish_reaches_subscriber(self, bus):
+        received = []
+        bus.subscribe(EventType.TASK_COMPLETED, received.append, source="worker")
+        bus.start()
+        time.sleep(0.1)
+
+        bus.publish(bus.create_event(EventType.TASK_COMPLETED, "worker"))
+        bus.publish(bus.create_event(EventType.TASK_COMPLETED, "other"))
+
+        deadline = time.time() + 2
+        while not received and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert len(received) == 1
+        assert received[0].source == "worker"
+
+
+def wait_for(predicate, timeout: float = 2.0) -> bool:
+    """Poll until predicate is true or timeout expires"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestBatchedPublish:
+    """Test publish_many and the loop-side drain"""
+
+    def test_publish_many_delivers_in_order(self, bus):
+        received = []
+        bus.subscribe(EventType.MESSAGE_SENT, lambda e: received.append(e.payload["n"]))
+        bus.start()
+
+        events = [bus.create_event(EventType.MESSAGE_SENT, "agent", payload={"n": i})
+                  for i in range(500)]
+        bus.publish_many(events)
+
+        assert wait_for(lambda: len(received) == 500)
+        assert received == list(range(500))
+
+    def test_drain_respects_batch_size(self, bus):
+        bus.configure(MessageBusConfig(batch_size=10))
+        batches = []
+        original = bus._dispatch_batch
+
+        async def recording(batch):
+            batches.append(len(batch))
+            await original(batch)
+
+        bus._dispatch_batch = recording
+        # Queue before the loop starts so the first drain sees everything
+        bus.running = True
+        bus.publish_many([Event(type=EventType.MESSAGE_SENT) for _ in range(35)])
+        bus.running = False
+        bus.start()
+
+        assert wait_for(lambda: sum(batches) == 35)
+        assert max(batches) <= 10
+        assert len(batches) == 4
+
+    def test_events_published_before_loop_ready_are_kept(self, bus):
+        received = []
+        bus.subscribe(EventType.AGENT_READY, received.append)
+        bus.start()
+        bus.publish(Event(type=EventType.AGENT_READY))
+
+        assert wait_for(lambda: len(received) == 1)
+
+    def test_publish_many_records_history(self, bus):
+        bus.publish_many([Event(type=EventType.TASK_CREATED) for _ in range(3)])
+        assert len(bus.get_history(EventType.TASK_CREATED)) == 3
+
+
+class TestEventHistory:
+    """Test ring-buffer history and its indexes"""
+
+    def test_capacity_evicts_oldest(self):
+        history = EventHistory(capacity=5)
+        for i in range(12):
+            history.append(Event(type=EventType.TASK_CREATED, payload={"n": i}))
+
+        assert len(history) == 5
+        assert [e.payload["n"] for e in history.query()] == [7, 8, 9, 10, 11]
+
+    def test_query_by_type_and_source(self):
+        history = EventHistory(capacity=100)
+        for i in range(30):
+            history.append(Event(
+                type=EventType.TASK_CREATED if i % 2 else EventType.TASK_FAILED,
+                source=f"agent-{i % 3}",
+                payload={"n": i},
+            ))
+
+        created = history.query(event_type=EventType.TASK_CREATED)
+        assert [e.payload["n"] for e in created] == list(range(1, 30, 2))
+
+        agent0 = history.query(source="agent-0")
+        assert [e.payload["n"] for e in agent0] == list(range(0, 30, 3))
+
+        both = history.query(event_type=EventType.TASK_CREATED, source="agent-0")
+        assert [e.payload["n"] for e in both] == [3, 9, 15, 21, 27]
+
+        assert history.query(source="missing") == []
+
+    def test_indexes_follow_eviction(self):
+        history = EventHistory(capacity=4)
+        history.append(Event(type=EventType.AGENT_ERROR, source="db"))
+        for _ in range(4):
+            history.append(Event(type=EventType.AGENT_READY, source="api"))
+
+        assert history.query(event_type=EventType.AGENT_ERROR) == []
+        assert history.query(source="db") == []
+        assert len(history.query(event_type=EventType.AGENT_READY)) == 4
+
+    def test_query_since_and_limit(self):
+        history = EventHistory(capacity=100)
+        for i in range(10):
+            history.append(Event(type=EventType.MESSAGE_SENT, timestamp=100.0 + i,
+                                 payload={"n": i}))
+
+        recent = history.query(since=105.0)
+        assert [e.payload["n"] for e in recent] == [5, 6, 7, 8, 9]
+
+        typed = history.query(event_type=EventType.MESSAGE_SENT, since=107.0)
+        assert [e.payload["n"] for e in typed] == [7, 8, 9]
+
+        assert [e.payload["n"] for e in history.query(limit=2)] == [8, 9]
+        assert [e.payload["n"] for e in history.query(since=103.0, limit=3)] == [7, 8, 9]
+
+    def test_query_since_tolerates_out_of_order_timestamps(self):
+        history = EventHistory(capacity=10)
+        for ts in (10.0, 12.0, 11.0, 13.0):
+            history.append(Event(timestamp=ts))
+
+        assert [e.timestamp for e in history.query(since=11.0)] == [12.0, 11.0, 13.0]
+
+    def test_bus_history_uses_configured_capacity(self, bus):
+        bus.configure(MessageBusConfig(history_size=3))
+        for _ in range(5):
+            bus.publish(Event(type=EventType.TASK_CREATED), sync=True)
+
+        assert len(bus.get_history()) == 3
+
+
+class TestBackpressure:
+    """Test bounded lanes, overflow policies and subscriber queues"""
+
+    def make_events(self, count):
+        return [Event(type=EventType.MESSAGE_SENT, payload={"n": i}) for i in range(count)]
+
+    def numbers(self, events):
+        return [e.payload["n"] for e in events]
+
+    def test_drop_oldest(self):
+        lane = EventLane("test", 3, OverflowPolicy.DROP_OLDEST)
+        lane.put_many(self.make_events(5))
+
+        assert self.numbers(lane.take(10)) == [2, 3, 4]
+        assert lane.stats()["dropped"] == 2
+
+    def test_drop_newest(self):
+        lane = EventLane("test", 3, OverflowPolicy.DROP_NEWEST)
+        assert lane.put_many(self.make_events(5)) == 3
+
+        assert self.numbers(lane.take(10)) == [0, 1, 2]
+        assert lane.stats()["dropped"] == 2
+
+    def test_block_times_out_and_drops(self):
+        lane = EventLane("test", 2, OverflowPolicy.BLOCK, block_timeout=0.05)
+        start = time.time()
+        assert lane.put_many(self.make_events(3)) == 2
+
+        assert time.time() - start >= 0.05
+        assert lane.stats()["blocked"] == 1
+        assert lane.stats()["dropped"] == 1
+
+    def test_block_resumes_when_consumer_frees_space(self):
+        lane = EventLane("test", 1, OverflowPolicy.BLOCK, block_timeout=2.0)
+        lane.put_many(self.make_events(1))
+
+        consumer = threading.Timer(0.05, lambda: lane.take(1))
+        consumer.start()
+        assert lane.put_many([Event(payload={"n": 99})]) == 1
+        consumer.join()
+
+        assert self.numbers(lane.take(10)) == [99]
+
+    def test_spill_preserves_order(self, tmp_path):
+        lane = EventLane("test", 2, OverflowPolicy.SPILL, spill_dir=str(tmp_path))
+        lane.put_many(self.make_events(7))
+
+        assert len(lane) == 7
+        assert lane.stats()["spilled"] == 5
+
+        drained = []
+        while len(lane):
+            drained.extend(lane.take(2))
+
+        assert self.numbers(drained) == list(range(7))
+        assert list(tmp_path.iterdir()) == []
+
+    def test_slow_subscriber_does_not_delay_others(self, bus):
+        bus.configure(MessageBusConfig(subscriber_queue_size=100))
+        fast = []
+        release = threading.Event()
+
+        async def slow(event):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+
+        bus.subscribe(EventType.AGENT_BUSY, slow)
+        bus.subscribe(EventType.AGENT_BUSY, fast.append)
+        bus.start()
+
+        bus.publish_many([Event(type=EventType.AGENT_BUSY) for _ in range(5)])
+        assert wait_for(lambda: len(fast) == 5, timeout=1.0)
+
+        metrics = bus.get_metrics()
+        depths = [s["queue_depth"] for s in metrics["subscribers"].values()]
+        assert max(depths) >= 3
+        release.set()
+
+    def test_subscriber_queue_drops_when_full(self, bus):
+        bus.configure(MessageBusConfig(subscriber_queue_size=2,
+                                       subscriber_overflow_policy=OverflowPolicy.DROP_NEWEST))
+        release = threading.Event()
+
+        async def stuck(event):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+
+        sub_id = bus.subscribe(EventType.AGENT_BUSY, stuck)
+        bus.start()
+        bus.publish_many([Event(type=EventType.AGENT_BUSY) for _ in range(10)])
+
+        assert wait_for(lambda: bus.get_metrics()["subscribers"][sub_id]["dropped"] >= 7)
+        release.set()
+
+    def test_metrics_report_lanes_and_latency(self, bus):
+        bus.configure(MessageBusConfig(async_queue_size=50,
+                                       overflow_policy=OverflowPolicy.DROP_NEWEST))
+        sub_id = bus.subscribe(EventType.TASK_CREATED, lambda e: time.sleep(0.001))
+        bus.start()
+        bus.publish(Event(type=EventType.TASK_CREATED))
+
+        assert wait_for(lambda: bus.get_metrics()["subscribers"][sub_id]["delivered"] == 1)
+        metrics = bus.get_metrics()
+        assert metrics["lanes"]["async"]["capacity"] == 50
+        assert metrics["lanes"]["async"]["policy"] == "drop_newest"
+        assert metrics["subscribers"][sub_id]["latency_max_ms"] >= 1.0
+
+
+class TestConcurrentHandlers:
+    """Test concurrent execution, timeouts and sync offloading"""
+
+    def test_handlers_run_concurrently(self, bus):
+        bus.configure(MessageBusConfig(concurrent_handlers=True))
+
+        async def slow(event):
+            await asyncio.sleep(0.05)
+
+        for _ in range(10):
+            bus.subscribe(EventType.TASK_STARTED, slow)
+
+        start = time.perf_counter()
+        dispatch(bus, Event(type=EventType.TASK_STARTED))
+        assert time.perf_counter() - start < 0.3
+
+    def test_concurrency_limit(self, bus):
+        bus.configure(MessageBusConfig(concurrent_handlers=True, max_concurrency=3))
+        in_flight = [0]
+        peak = [0]
+        done = []
+
+        async def handler(event):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+            done.append(event)
+
+        for _ in range(10):
+            bus.subscribe(EventType.TASK_STARTED, handler)
+        bus.start()
+        bus.publish(Event(type=EventType.TASK_STARTED))
+
+        assert wait_for(lambda: len(done) == 10)
+        assert peak[0] == 3
+
+    def test_handler_timeout(self, bus):
+        bus.configure(MessageBusConfig(concurrent_handlers=True, handler_timeout=0.05))
+        fast = []
+
+        async def hang(event):
+            await asyncio.sleep(10)
+
+        slow_id = bus.subscribe(EventType.TASK_STARTED, hang)
+        bus.subscribe(EventType.TASK_STARTED, fast.append)
+
+        start = time.perf_counter()
+        dispatch(bus, Event(type=EventType.TASK_STARTED))
+
+        assert time.perf_counter() - start < 1.0
+        assert len(fast) == 1
+        assert bus.subscriptions.get(slow_id).stats.timeouts == 1
+
+    def test_sync_handlers_offloaded(self, bus):
+        bus.configure(MessageBusConfig(sync_handler_threads=2))
+        threads = []
+        bus.subscribe(EventType.TASK_STARTED, lambda e: threads.append(threading.current_thread().name))
+        bus.start()
+        bus.publish(Event(type=EventType.TASK_STARTED))
+
+        assert wait_for(lambda: threads)
+        assert threads[0].startswith("bus-handler")
+
+    def test_latency_histogram(self, bus):
+        sub_id = bus.subscribe(EventType.TASK_STARTED, lambda e: time.sleep(0.002))
+        for _ in range(5):
+            dispatch(bus, Event(type=EventType.TASK_STARTED))
+
+        stats = bus.subscriptions.get(sub_id).stats.to_dict()
+        assert sum(stats["latency_histogram"].values()) == 5
+        assert stats["latency_histogram"]["le_1ms"] == 0
+        assert stats["latency_p99_ms"] >= 5
+
+
+class TestRequestReply:
+    """Test correlation-id routed request/reply"""
+
+    def start_responder(self, bus, skip=()):
+        def respond(event):
+            if event.payload.get("n") in skip:
+                return
+            bus.publish(bus.create_event(EventType.MESSAGE_RECEIVED, "agent",
+                                         payload={"n": event.payload.get("n")},
+                                         correlation_id=event.correlation_id or event.id))
+
+        bus.subscribe(EventType.MESSAGE_SENT, respond)
+        bus.start()
+
+    def test_request_reply(self, bus):
+        self.start_responder(bus)
+        reply = bus.request_reply(Event(type=EventType.MESSAGE_SENT, payload={"n": 1}))
+
+        assert reply is not None
+        assert reply.payload == {"n": 1}
+        assert bus.get_metrics()["pending_replies"] == 0
+
+    def test_request_reply_timeout_cleans_up(self, bus):
+        bus.start()
+        assert bus.request_reply(Event(type=EventType.MESSAGE_SENT), timeout=0.05) is None
+        assert bus.get_metrics()["pending_replies"] == 0
+
+    def test_single_reply_subscription(self, bus):
+        self.start_responder(bus)
+        for i in range(5):
+            bus.request_reply(Event(type=EventType.MESSAGE_SENT, payload={"n": i}))
+
+        assert bus.subscriptions.count(EventType.MESSAGE_RECEIVED) == 1
+
+    def test_request_many(self, bus):
+        self.start_responder(bus, skip={3})
+        requests = [Event(type=EventType.MESSAGE_SENT, payload={"n": i}) for i in range(200)]
+
+        replies = bus.request_many(requests, timeout=0.5)
+
+        assert replies[3] is None
+        assert [r.payload["n"] for i, r in enumerate(replies) if i != 3] == \
+            [i for i in range(200) if i != 3]
+        assert bus.get_metrics()["pending_replies"] == 0
+
+    def test_request_many_async(self, bus):
+        self.start_responder(bus)
+
+        async def run():
+            requests = [Event(type=EventType.MESSAGE_SENT, payload={"n": i}) for i in range(50)]
+            return await bus.request_many_async(requests)
+
+        replies = asyncio.run(run())
+        assert [r.payload["n"] for r in replies] == list(range(50))
+
+    def test_request_many_async_empty(self, bus):
+        bus.start()
+        assert asyncio.run(bus.request_many_async([])) == []
+        assert bus.request_many([]) == []
@@ -0,0 +1,234 @@
+"""
+Tests for the cross-process MessageBus transport
+"""
+
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import message_transport
+from core.message_bus import Event, EventType, MessageBus
+from core.message_transport import (
+    FRAME_HEADER,
+    EventBroker,
+    FrameError,
+    FrameReader,
+    UnixSocketTransport,
+    encode_frame,
+)
+
+
+def new_bus() -> MessageBus:
+    """Separate MessageBus instance, as if in its own process"""
+    MessageBus._instance = None
+    bus = MessageBus()
+    bus.start()
+    return bus
+
+
+def wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "bus.sock")
+
+
+@pytest.fixture
+def buses():
+    original = MessageBus._instance
+    created = []
+    yield created
+    for bus in created:
+        bus.stop()
+    MessageBus._instance = original
+
+
+class TestFraming:
+    """Test binary frame encoding"""
+
+    def test_round_trip(self):
+        event = Event(type=EventType.TASK_CREATED, source="backend", target="database",
+                      payload={"task_id": "t1", "n": [1, 2]}, correlation_id="c1")
+        frame = encode_frame(event)
+
+        reader = FrameReader()
+        frames = reader.feed(frame)
+        decoded = reader.decode(frames[0])
+
+        assert decoded == event
+
+    def test_partial_and_coalesced_frames(self):
+        events = [Event(type=EventType.MESSAGE_SENT, payload={"n": i}) for i in range(3)]
+        stream = b"".join(encode_frame(e) for e in events)
+
+        reader = FrameReader()
+        frames = reader.feed(stream[:7])
+        frames += reader.feed(stream[7:])
+
+        assert [reader.decode(f).payload["n"] for f in frames] == [0, 1, 2]
+
+    def test_rejects_unknown_version(self):
+        with pytest.raises(FrameError):
+            FrameReader().feed(FRAME_HEADER.pack(0, 99, 0))
+
+
+class TestUnixSocketTransport:
+    """Test event delivery between bus instances"""
+
+    def test_event_reaches_other_bus(self, socket_path, buses):
+        publisher = new_bus()
+        buses.append(publisher)
+        publisher.attach_transport(UnixSocketTransport(socket_path))
+
+        subscriber = new_bus()
+        buses.append(subscriber)
+        subscriber.attach_transport(UnixSocketTransport(socket_path))
+
+        received = []
+        local = []
+        subscriber.subscribe(EventType.TASK_COMPLETED, received.append, source="worker")
+        publisher.subscribe(EventType.TASK_COMPLETED, local.append)
+        time.sleep(0.05)
+
+        publisher.publish(Event(type=EventType.TASK_COMPLETED, source="worker",
+                                payload={"ok": True}))
+
+        assert wait_for(lambda: received)
+        assert received[0].payload == {"ok": True}
+        assert received[0].remote
+        assert received[0].metadata == {}
+        assert wait_for(lambda: local)
+        # Remote events are not echoed back to the publisher
+        time.sleep(0.05)
+        assert len(local) == 1
+        assert len(subscriber.get_history(EventType.TASK_COMPLETED)) == 1
+
+    def test_first_transport_hosts_broker(self, socket_path, buses):
+        bus = new_bus()
+        buses.append(bus)
+        transport = UnixSocketTransport(socket_path)
+        bus.attach_transport(transport)
+
+        assert transport.broker is not None
+        bus.detach_transport()
+        assert not Path(socket_path).exists()
+
+    def test_standalone_broker(self, socket_path, buses):
+        broker = EventBroker(socket_path)
+        broker.start()
+        try:
+            first, second = new_bus(), new_bus()
+            buses.extend([first, second])
+            first.attach_transport(UnixSocketTransport(socket_path, start_broker=False))
+            second.attach_transport(UnixSocketTransport(socket_path, start_broker=False))
+
+            received = []
+            second.subscribe(EventType.AGENT_READY, received.append)
+            time.sleep(0.05)
+            first.publish_many([Event(type=EventType.AGENT_READY) for _ in range(50)])
+
+            assert wait_for(lambda: len(received) == 50)
+            assert broker.frames_relayed == 50
+        finally:
+            broker.stop()
+
+    def test_concurrent_connects_host_one_broker(self, socket_path):
+        transports = [UnixSocketTransport(socket_path) for _ in range(8)]
+        barrier = threading.Barrier(len(transports))
+        socks = []
+
+        def connect(transport):
+            barrier.wait()
+            socks.append(transport._connect())
+
+        threads = [threading.Thread(target=connect, args=(t,)) for t in transports]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        try:
+            hosts = [t for t in transports if t.broker]
+            assert len(hosts) == 1
+            assert len(socks) == len(transports)
+            assert wait_for(lambda: len(hosts[0].broker._clients) == len(transports))
+        finally:
+            for sock in socks:
+                sock.close()
+            for transport in transports:
+                transport.close()
+
+    def test_reconnects_when_host_exits(self, socket_path, buses):
+        host, other = new_bus(), new_bus()
+        buses.extend([host, other])
+        host_transport = UnixSocketTransport(socket_path)
+        host.attach_transport(host_transport)
+        transport = UnixSocketTransport(socket_path)
+        other.attach_transport(transport)
+        assert host_transport.broker and not transport.broker
+
+        host.detach_transport()
+        assert wait_for(lambda: transport.reconnects == 1)
+        assert transport.broker is not None
+
+        late = new_bus()
+        buses.append(late)
+        late.attach_transport(UnixSocketTransport(socket_path))
+        received = []
+        late.subscribe(EventType.AGENT_READY, received.append)
+        time.sleep(0.05)
+        other.publish(Event(type=EventType.AGENT_READY))
+        assert wait_for(lambda: received)
+
+    def test_counts_events_dropped_while_disconnected(self, socket_path, buses):
+        bus = new_bus()
+        buses.append(bus)
+        transport = UnixSocketTransport(socket_path)
+        transport.send([Event(type=EventType.AGENT_READY)])
+        assert transport.dropped == 1
+
+        bus.attach_transport(transport)
+        bus.publish(Event(type=EventType.AGENT_READY))
+        assert wait_for(lambda: transport.sent == 1)
+        assert transport.dropped == 1
+
+    def test_stalled_client_does_not_block_others(self, socket_path, buses, monkeypatch):
+        monkeypatch.setattr(message_transport, "MAX_CLIENT_BACKLOG", 256 * 1024)
+        broker = EventBroker(socket_path)
+        broker.start()
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            stalled.connect(socket_path)  # Never reads
+            first, second = new_bus(), new_bus()
+            buses.extend([first, second])
+            first.attach_transport(UnixSocketTransport(socket_path, start_broker=False))
+            second.attach_transport(UnixSocketTransport(socket_path, start_broker=False))
+
+            received = []
+            second.subscribe(EventType.AGENT_READY, received.append)
+            time.sleep(0.05)
+            payload = {"data": "x" * 1024}
+            start = time.time()
+            for _ in range(10):
+                first.publish_many([Event(type=EventType.AGENT_READY, payload=payload)
+                                    for _ in range(100)])
+
+            assert wait_for(lambda: len(received) == 1000, timeout=5)
+            assert time.time() - start < 2
+            assert broker.clients_dropped == 1
+        finally:
+            stalled.close()
+            broker.stop()
@@ -0,0 +1,121 @@
+"""
+Tests for the line-indexed pane output buffer
+"""
+
+import re
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.pane_buffer import PaneLineBuffer, clean_line, strip_ansi
+from core.pane_stream import PaneOutputStreamer, PaneStream
+from core.tmux_client import TMUXClient
+
+
+class TestCleaning:
+    """Test turning terminal output into displayed text"""
+
+    def test_strip_ansi(self):
+        assert strip_ansi("\x1b[1;32mok\x1b[0m \x1b]0;title\x07done") == "ok done"
+
+    def test_carriage_return_overwrites(self):
+        assert clean_line("\x1b[?2004l\r### END:1\r") == "### END:1"
+        assert clean_line("10%\r50%\r100%") == "100%"
+
+
+class TestPaneLineBuffer:
+    """Test numbering, bounds and queries"""
+
+    def test_lines_numbered_across_partial_writes(self):
+        buffer = PaneLineBuffer("s")
+        buffer.feed(b"one\r\ntw")
+        assert buffer.lines_since(0) == [(0, "one")]
+        buffer.feed(b"o\r\nthree\n")
+        assert buffer.lines_since(1) == [(1, "two"), (2, "three")]
+        assert buffer.next_line == 3
+
+    def test_split_utf8_sequence(self):
+        buffer = PaneLineBuffer("s")
+        data = "café\n".encode()
+        buffer.feed(data[:4])
+        buffer.feed(data[4:])
+        assert buffer.text_since(0) == "café"
+
+    def test_ring_keeps_numbers_monotonic(self):
+        buffer = PaneLineBuffer("s", max_lines=3, max_line_chars=5)
+        buffer.feed(b"".join(b"line%d\n" % n for n in range(10)))
+        assert buffer.first_line == 7
+        assert buffer.lines_since(0) == [(7, "line7"), (8, "line8"), (9, "line9")]
+        buffer.feed(b"x" * 100 + b"\n")
+        assert buffer.lines_since(10) == [(10, "xxxxx")]
+
+    def test_last_match(self):
+        buffer = PaneLineBuffer("s")
+        buffer.feed(b"status: idle\nstatus: busy\nother\n")
+        number, match = buffer.last_match(r"status: (\w+)")
+        assert (number, match.group(1)) == (1, "busy")
+        assert buffer.last_match(re.compile("status"), since=2) is None
+
+    def test_detectors(self):
+        buffer = PaneLineBuffer("s")
+        buffer.feed(b"$ echo '### TASK_END:t1'\n")
+        assert buffer.marker_line("### TASK_END:t1") is None
+
+        buffer.feed(b'### TASK_START:t1\nresult {"ok": true}\n{\n  "nested": {"n": 1}\n}\n'
+                    b"bash: foo: command not found\n### TASK_END:t1\n")
+        assert buffer.marker_line("### TASK_START:t1") == 1
+        assert buffer.marker_line("### TASK_END:t1", since=2) == 7
+        assert buffer.errors_since(0) == [(6, "bash: foo: command not found")]
+        assert buffer.json_since(0) == [(2, {"ok": True}), (3, {"nested": {"n": 1}})]
+        assert buffer.json_since(3) == [(3, {"nested": {"n": 1}})]
+
+    def test_shell_braces_are_not_json(self):
+        buffer = PaneLineBuffer("s")
+        buffer.feed(b'echo ${HOME}\n{"a": 1}\n')
+        assert buffer.json_since(0) == [(1, {"a": 1})]
+
+    def test_wait_for_lines(self):
+        buffer = PaneLineBuffer("s")
+        threading.Timer(0.05, buffer.feed, [b"a\n"]).start()
+        assert buffer.wait_for_lines(0, timeout=2) == 1
+        assert buffer.wait_for_lines(1, timeout=0.05) is None
+
+        threading.Timer(0.05, buffer.close).start()
+        assert buffer.wait_for_lines(1, timeout=2) is None
+
+    def test_fed_by_pane_stream(self):
+        stream = PaneStream("s")
+        stream.append(b"\x1b[32mhello\x1b[0m\r\n")
+        assert stream.lines.text_since(0) == "hello"
+        stream.close()
+        assert stream.lines.closed
+
+
+@pytest.mark.skipif(not shutil.which("tmux"), reason="TMUX not installed")
+class TestPaneLinesIntegration:
+    """Integration test with a real tmux pane"""
+
+    SESSION = "pytest-pane-buffer"
+
+    def test_markers_from_real_pane(self):
+        TMUXClient.kill_session(self.SESSION)
+        assert TMUXClient.create_session(self.SESSION, "bash --norc --noprofile")
+        streamer = PaneOutputStreamer()
+        try:
+            lines = streamer.watch(self.SESSION).lines
+            start = lines.next_line
+            TMUXClient.send_command(self.SESSION, "echo '### TASK_END:real'")
+
+            while lines.marker_line("### TASK_END:real", start) is None:
+                assert lines.wait_for_lines(lines.next_line, timeout=3) is not None
+            number = lines.marker_line("### TASK_END:real", start)
+            assert dict(lines.lines_since(start))[number] == "### TASK_END:real"
+        finally:
+            streamer.stop()
+            TMUXClient.kill_session(self.SESSION)
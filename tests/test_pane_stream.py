@@ -0,0 +1,125 @@
+"""
+Tests for streamed tmux pane output
+"""
+
+import re
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.pane_stream import PaneOutputStreamer, PaneStream
+from core.tmux_client import TMUXClient
+
+
+class TestPaneStream:
+    """Test the offset-addressed output buffer"""
+
+    def test_offsets_and_reads(self):
+        stream = PaneStream("s")
+        stream.append(b"one\ntw")
+        assert stream.end_offset == 6
+        assert stream.read(4) == (b"tw", 6)
+        assert stream.read_lines(0) == ("one\n", 4)
+        assert stream.read_lines(4) == ("", 4)
+
+        stream.append(b"o\n")
+        assert stream.read_lines(4) == ("two\n", 8)
+
+    def test_limit_drops_oldest_bytes(self):
+        stream = PaneStream("s", limit=8)
+        stream.append(b"0123456789")
+        assert stream.end_offset == 10
+        assert stream.read(0) == (b"23456789", 10)
+        assert stream.read(5) == (b"56789", 10)
+
+    def test_wait_for_output_wakes_on_append(self):
+        stream = PaneStream("s")
+        threading.Timer(0.05, stream.append, [b"x"]).start()
+
+        start = time.time()
+        assert stream.wait_for_output(0, timeout=2) == 1
+        assert time.time() - start < 1
+        assert stream.wait_for_output(1, timeout=0.05) is None
+
+    def test_wait_for_marker_after_offset(self):
+        stream = PaneStream("s")
+        stream.append(b"DONE old\n")
+        offset = stream.end_offset
+
+        threading.Timer(0.05, stream.append, [b"work\nDO"]).start()
+        threading.Timer(0.1, stream.append, [b"NE new\n"]).start()
+        end = stream.wait_for("DONE", offset, timeout=2)
+        assert stream.read(offset)[0][:end - offset].endswith(b"DONE")
+
+        assert stream.wait_for(re.compile(rb"missing"), 0, timeout=0.05) is None
+
+    def test_close_releases_waiters(self):
+        stream = PaneStream("s")
+        threading.Timer(0.05, stream.close).start()
+        assert stream.wait_for("never", 0, timeout=2) is None
+        assert stream.closed
+
+
+@pytest.mark.skipif(not shutil.which("tmux"), reason="TMUX not installed")
+class TestPaneOutputStreamer:
+    """Integration tests with a real tmux pane"""
+
+    SESSION = "pytest-pane-stream"
+
+    @pytest.fixture
+    def streamer(self):
+        TMUXClient.kill_session(self.SESSION)
+        assert TMUXClient.create_session(self.SESSION, "bash --norc --noprofile")
+        streamer = PaneOutputStreamer()
+        yield streamer
+        streamer.stop()
+        TMUXClient.kill_session(self.SESSION)
+
+    def test_streams_new_output(self, streamer):
+        stream = streamer.watch(self.SESSION)
+        assert streamer.watch(self.SESSION) is stream
+        offset = stream.end_offset
+
+        TMUXClient.send_command(self.SESSION, "echo '### MARK:1'")
+        # Only the command's output has the marker without the leading quote
+        end = stream.wait_for(re.compile(rb"(?<!')### MARK:1"), offset, timeout=3)
+        assert end is not None
+        assert b"### MARK:1" in stream.read(offset)[0]
+
+    def test_unwatch_stops_stream(self, streamer):
+        stream = streamer.watch(self.SESSION)
+        streamer.unwatch(self.SESSION)
+
+        assert stream.closed
+        assert streamer.get_stream(self.SESSION) is None
+
+    def test_refuses_pane_piped_elsewhere(self, streamer):
+        assert streamer.watch(self.SESSION) is not None
+        other = PaneOutputStreamer()
+        try:
+            assert other.watch(self.SESSION) is None
+        finally:
+            other.stop()
+
+    def test_replaced_pipe_closes_stream(self, streamer):
+        stream = streamer.watch(self.SESSION)
+        TMUXClient.send_command(self.SESSION, "echo ready")
+        assert stream.wait_for("ready", 0, timeout=3) is not None
+
+        # Another process taking over the pane's pipe
+        TMUXClient.pipe_pane(self.SESSION, "cat > /dev/null")
+        deadline = time.time() + 3
+        while not stream.closed and time.time() < deadline:
+            time.sleep(0.02)
+        assert stream.closed
+        assert streamer.get_stream(self.SESSION) is None
+
+    def test_missing_session(self, streamer):
+        assert streamer.watch("pytest-no-such-session") is None
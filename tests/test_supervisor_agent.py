@@ -0,0 +1,75 @@
+"""
+Tests for the supervisor agent's view of agent output
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory and langgraph-test to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "langgraph-test"))
+
+import supervisor_agent
+from core.pane_stream import PaneStream
+
+
+@pytest.fixture
+def supervisor(monkeypatch, tmp_path):
+    state = SimpleNamespace(agents={"backend-api": SimpleNamespace(
+        status=SimpleNamespace(value="busy"), current_task="t1", last_activity="now")})
+    monkeypatch.setattr(supervisor_agent, "SharedStateManager", lambda: SimpleNamespace(state=state))
+    monkeypatch.setattr(supervisor_agent, "PROJECT_ROOT", tmp_path)
+    streams = {}
+    monkeypatch.setattr(supervisor_agent, "get_pane_streamer",
+                        lambda: SimpleNamespace(watch=lambda s: streams.setdefault(s, PaneStream(s))))
+
+    runs = []
+
+    def run(args, **kwargs):
+        runs.append(args)
+        if args[-1] == "Enter":
+            streams[args[3]].append(b"$ npm test\r\n\x1b[31mbash: npm: command not found\x1b[0m\r\n$ ")
+        return subprocess.CompletedProcess(args, 0, stdout="stale screen\n", stderr="")
+
+    monkeypatch.setattr(supervisor_agent.subprocess, "run", run)
+    supervisor = supervisor_agent.SupervisorAgent()
+    supervisor.streams, supervisor.runs = streams, runs
+    return supervisor
+
+
+class TestAgentOutput:
+    """Test reading agent output from streamed pane lines"""
+
+    def test_logs_only_new_lines(self, supervisor):
+        session = supervisor.agents["backend-api"]
+        supervisor._pane_lines(session)
+        supervisor.streams[session].append(b"old output\r\n")
+
+        assert supervisor.send_command_properly("backend-api", "npm test", wait_time=0)
+        log = supervisor.get_logs("backend-api")
+        assert any(entry.endswith("📥 OUTPUT: bash: npm: command not found") for entry in log)
+        assert any(entry.endswith("⚠️ ERROR: bash: npm: command not found") for entry in log)
+        assert not any("old output" in entry for entry in log)
+        # No capture-pane round trip
+        assert all(args[1] == "send-keys" for args in supervisor.runs)
+
+    def test_status_from_stream(self, supervisor):
+        session = supervisor.agents["backend-api"]
+        supervisor._pane_lines(session)
+        supervisor.streams[session].append(b"".join(b"line %d\n" % n for n in range(8)))
+
+        status = supervisor.check_agent_status("backend-api")
+        assert status["terminal_active"]
+        assert status["recent_output"] == [f"line {n}" for n in range(3, 8)]
+
+    def test_capture_when_not_streamable(self, supervisor, monkeypatch):
+        monkeypatch.setattr(supervisor_agent, "get_pane_streamer",
+                            lambda: SimpleNamespace(watch=lambda s: None))
+
+        status = supervisor.check_agent_status("backend-api")
+        assert status["recent_output"] == ["stale screen", ""]
+        assert supervisor.runs[-1][1] == "capture-pane"
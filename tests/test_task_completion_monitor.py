@@ -0,0 +1,133 @@
+"""
+Tests for the task completion monitor's pane output checks
+"""
+
+import shutil
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory and langgraph-test to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "langgraph-test"))
+
+import task_completion_monitor
+from core.pane_stream import PaneOutputStreamer, PaneStream
+from core.tmux_client import TMUXClient
+
+
+class FakeStreamer:
+    """Stands in for the pane output streamer; watch() hands out PaneStreams"""
+
+    def __init__(self, streamable=True):
+        self.streamable = streamable
+        self.streams = {}
+
+    def watch(self, session):
+        if not self.streamable:
+            return None
+        stream = self.streams.get(session)
+        if stream is None or stream.closed:
+            stream = self.streams[session] = PaneStream(session)
+        return stream
+
+    def unwatch(self, session):
+        self.streams.pop(session).close()
+
+
+@pytest.fixture
+def monitor(monkeypatch):
+    state = SimpleNamespace(agents={"backend-api": SimpleNamespace(session_id="claude-backend-api")})
+    monkeypatch.setattr(task_completion_monitor, "SharedStateManager",
+                        lambda **kwargs: SimpleNamespace(state=state))
+    streamer = FakeStreamer()
+    monkeypatch.setattr(task_completion_monitor, "get_pane_streamer", lambda: streamer)
+    screen = {"text": ""}
+    captures = []
+
+    def capture_pane(session, lines=None):
+        captures.append(session)
+        return screen["text"]
+
+    monkeypatch.setattr(task_completion_monitor.TMUXClient, "capture_pane", staticmethod(capture_pane))
+    monitor = task_completion_monitor.TaskCompletionMonitor()
+    monitor.streamer, monitor.screen, monitor.captures = streamer, screen, captures
+    return monitor
+
+
+class TestAgentOutput:
+    """Test completion detection on streamed output with a capture fallback"""
+
+    def test_streamed_completion(self, monitor):
+        assert not monitor._check_agent_output("backend-api", "t1")["completed"]
+        stream = monitor.streamer.streams["claude-backend-api"]
+
+        stream.append(b"\x1b[32mworking\x1b[0m\r\n")
+        assert not monitor._check_agent_output("backend-api", "t1")["completed"]
+        stream.append(b"Task completed successfully\r\n")
+
+        result = monitor._check_agent_output("backend-api", "t1")
+        assert result["completed"]
+        assert result["message"].startswith("Automatic completion detected")
+        # Only the first check, before streaming started, captured the screen
+        assert monitor.captures == ["claude-backend-api"]
+
+    def test_first_check_sees_screen(self, monitor):
+        monitor.screen["text"] = "Task done\n$ "
+        assert monitor._check_agent_output("backend-api", "t1")["completed"]
+
+    def test_output_before_task_ignored(self, monitor):
+        monitor._check_agent_output("backend-api", "t1")
+        monitor.streamer.streams["claude-backend-api"].append(b"task failed\n")
+        assert monitor._check_agent_output("backend-api", "t1")["failed"]
+
+        # A new task scans only output written after its first check
+        assert not monitor._check_agent_output("backend-api", "t2")["failed"]
+        assert not monitor._check_agent_output("backend-api", "t2")["failed"]
+
+    def test_capture_when_not_streamable(self, monitor):
+        monitor.streamer.streamable = False
+        assert not monitor._check_agent_output("backend-api", "t1")["completed"]
+        monitor.screen["text"] = "finished the task"
+        assert monitor._check_agent_output("backend-api", "t1")["completed"]
+        assert len(monitor.captures) == 2
+
+    def test_closed_stream_is_rewatched(self, monitor):
+        monitor._check_agent_output("backend-api", "t1")
+        monitor.streamer.streams["claude-backend-api"].close()
+        monitor.screen["text"] = "task complete"
+
+        assert monitor._check_agent_output("backend-api", "t1")["completed"]
+        assert not monitor.streamer.streams["claude-backend-api"].closed
+
+
+@pytest.mark.skipif(not shutil.which("tmux"), reason="TMUX not installed")
+class TestAgentOutputIntegration:
+    """Integration test with a real tmux pane"""
+
+    SESSION = "pytest-completion-monitor"
+
+    def test_completion_streamed_from_real_pane(self, monkeypatch):
+        state = SimpleNamespace(agents={"backend-api": SimpleNamespace(session_id=self.SESSION)})
+        monkeypatch.setattr(task_completion_monitor, "SharedStateManager",
+                            lambda **kwargs: SimpleNamespace(state=state))
+        streamer = PaneOutputStreamer()
+        monkeypatch.setattr(task_completion_monitor, "get_pane_streamer", lambda: streamer)
+
+        TMUXClient.kill_session(self.SESSION)
+        assert TMUXClient.create_session(self.SESSION, "bash --norc --noprofile")
+        try:
+            monitor = task_completion_monitor.TaskCompletionMonitor()
+            assert not monitor._check_agent_output("backend-api", "t1")["completed"]
+            stream = streamer.get_stream(self.SESSION)
+            offset = stream.end_offset
+
+            # The typed command does not match the completion patterns; its output does
+            TMUXClient.send_command(self.SESSION, "echo tas''k done")
+            assert stream.wait_for(b"task done", offset, timeout=3) is not None
+            assert monitor._check_agent_output("backend-api", "t1")["completed"]
+        finally:
+            streamer.stop()
+            TMUXClient.kill_session(self.SESSION)
@@ -8,12 +8,15 @@ import time
 from unittest.mock import patch, MagicMock, call
 import subprocess
 import sys
+import threading
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.tmux_client import TMUXClient
+from core import tmux_client
+from core.tmux_client import TMUXClient, get_all_agent_outputs
+from config.settings import AGENT_SESSIONS
 
 
 class TestTMUXClient:
@@ -192,16 +195,277 @@ class TestTMUXClient:
                     mock_create.assert_called_once_with("test-session", "claude")
 
     def test_health_check(self):
-        """Test health check for all agents"""
-        with patch.object(TMUXClient, 'session_exists') as mock_exists:
-            # Simulate some healthy and some unhealthy
-            mock_exists.side_effect = [True, False, True, True, False, True, True, False, True]
+        """Test health check for all agents uses one tmux call"""
+        tmux_client._snapshots.clear()
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = "claude-supervisor\nclaude-testing\n"
 
             health = TMUXClient.health_check()
 
-            assert "supervisor" in health
-            assert isinstance(health["supervisor"], bool)
-            assert len(health) > 0
+            assert health["supervisor"] is True
+            assert health["testing"] is True
+            assert health["master"] is False
+            assert len(health) == len(AGENT_SESSIONS)
+            mock_run.assert_called_once()
+
+
+class TestConcurrentBroadcast:
+    """Test parallel broadcast with per-session ordering"""
+
+    @staticmethod
+    def slow_send(log, delay=0.1):
+        lock = threading.Lock()
+
+        def send(session, command, delay_arg=None):
+            time.sleep(delay)
+            with lock:
+                log.append((session, command))
+            return True
+        return send
+
+    def test_broadcast_overlaps_delays(self):
+        log = []
+        sessions = [f"s{i}" for i in range(20)]
+        with patch.object(TMUXClient, 'send_command', side_effect=self.slow_send(log)):
+            start = time.time()
+            results = TMUXClient.broadcast(sessions, "hello")
+            elapsed = time.time() - start
+
+        assert results == {session: True for session in sessions}
+        assert len(log) == 20
+        assert elapsed < 1.0  # Sequential would be 2s
+
+    def test_per_session_order_kept(self):
+        log = []
+        with patch.object(TMUXClient, 'send_command', side_effect=self.slow_send(log, 0.01)):
+            futures = [TMUXClient.send_command_async(session, str(n))
+                       for n in range(10) for session in ("a", "b")]
+            for future in futures:
+                assert future.result() is True
+
+        for session in ("a", "b"):
+            assert [cmd for s, cmd in log if s == session] == [str(n) for n in range(10)]
+
+    def test_kill_session_closes_lane(self):
+        with patch.object(TMUXClient, 'send_command', return_value=True):
+            assert TMUXClient.send_command_async("lane-killed", "ls").result() is True
+        assert "lane-killed" in tmux_client._session_lanes
+
+        with patch('subprocess.run', return_value=MagicMock(returncode=0)):
+            TMUXClient.kill_session("lane-killed")
+
+        assert "lane-killed" not in tmux_client._session_lanes
+        deadline = time.time() + 2
+        while any(t.name.startswith("tmux-lane-killed") for t in threading.enumerate()):
+            assert time.time() < deadline
+            time.sleep(0.01)
+
+    def test_idle_lanes_bounded(self, monkeypatch):
+        monkeypatch.setattr(tmux_client, "MAX_SESSION_LANES", 4)
+        sessions = [f"lane-{n}" for n in range(10)]
+        with patch.object(TMUXClient, 'send_command', return_value=True):
+            for session in sessions:
+                TMUXClient.send_command_async(session, "ls").result()
+
+        assert len(tmux_client._session_lanes) == 4
+        assert list(tmux_client._session_lanes)[-4:] == sessions[-4:]
+
+    def test_broadcast_to_agents_maps_agents(self):
+        with patch.object(TMUXClient, 'send_command', return_value=True) as mock_send:
+            results = TMUXClient.broadcast_to_agents("msg", exclude=["supervisor"])
+
+        assert "supervisor" not in results
+        sessions = {call_args[0][0] for call_args in mock_send.call_args_list}
+        assert "claude-supervisor" not in sessions
+        assert len(sessions) == len(results)
+
+
+class TestBulkCapture:
+    """Test capturing every pane in one tmux round trip"""
+
+    @pytest.fixture(autouse=True)
+    def clear_snapshots(self):
+        tmux_client._snapshots.clear()
+        tmux_client._snapshots_inflight.clear()
+        yield
+        tmux_client._snapshots.clear()
+        tmux_client._snapshots_inflight.clear()
+
+    @staticmethod
+    def fake_tmux(live, panes):
+        """subprocess.run stand-in for list-sessions and chained captures"""
+        def run(cmd, **kwargs):
+            result = MagicMock(returncode=0)
+            if "list-sessions" in cmd:
+                result.stdout = "".join(f"{session}\n" for session in live)
+            else:
+                targets = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-t"]
+                result.stdout = "".join(f"{tmux_client._CAPTURE_DELIMITER}\n{panes[t]}"
+                                        for t in targets)
+            return result
+        return run
+
+    def test_capture_all_uses_two_calls(self):
+        panes = {"a": "a1\na2\n", "b": "b1\n"}
+        with patch('subprocess.run', side_effect=self.fake_tmux(["a", "b"], panes)) as mock_run:
+            snapshot = TMUXClient.capture_all(["a", "b", "gone"], lines=5)
+
+        assert snapshot == {"a": "a1\na2\n", "b": "b1\n", "gone": None}
+        assert mock_run.call_count == 2
+        assert mock_run.call_args[0][0].count("capture-pane") == 2
+
+    def test_liveness_only_is_one_call(self):
+        with patch('subprocess.run', side_effect=self.fake_tmux(["a"], {})) as mock_run:
+            assert TMUXClient.capture_all(["a", "b"], lines=0) == {"a": "", "b": None}
+        mock_run.assert_called_once()
+
+    def test_snapshot_shared_between_callers(self):
+        live = list(AGENT_SESSIONS.values())
+        panes = {session: f"{session} output\n" for session in live}
+        with patch('subprocess.run', side_effect=self.fake_tmux(live, panes)) as mock_run:
+            threads = [threading.Thread(target=get_all_agent_outputs) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            outputs = get_all_agent_outputs()
+
+        assert mock_run.call_count == 2
+        assert outputs["supervisor"] == "claude-supervisor output\n"
+
+    def test_slow_snapshot_does_not_block_other_sessions(self):
+        started, release = threading.Event(), threading.Event()
+
+        def capture_all(sessions, lines):
+            if sessions == ["slow"]:
+                started.set()
+                release.wait(5)
+            return {session: f"{session} output\n" for session in sessions}
+
+        with patch.object(TMUXClient, 'capture_all', side_effect=capture_all) as mock_capture:
+            results = []
+            waiters = [threading.Thread(target=lambda: results.append(TMUXClient.snapshot(["slow"])))
+                       for _ in range(3)]
+            for thread in waiters:
+                thread.start()
+            assert started.wait(5)
+
+            # Another session set is served while the slow capture is running
+            assert TMUXClient.snapshot(["fast"]) == {"fast": "fast output\n"}
+
+            release.set()
+            for thread in waiters:
+                thread.join()
+
+        assert results == [{"slow": "slow output\n"}] * 3
+        assert mock_capture.call_count == 2
+        assert not tmux_client._snapshots_inflight
+
+    def test_failed_snapshot_is_not_cached(self):
+        with patch.object(TMUXClient, 'capture_all', side_effect=RuntimeError("tmux gone")):
+            with pytest.raises(RuntimeError):
+                TMUXClient.snapshot(["a"])
+        assert not tmux_client._snapshots_inflight
+        with patch.object(TMUXClient, 'capture_all', return_value={"a": "x"}):
+            assert TMUXClient.snapshot(["a"]) == {"a": "x"}
+
+
+class TestAcknowledgedDelivery:
+    """Test sending Enter only once the pane echoed the text"""
+
+    @pytest.fixture(autouse=True)
+    def ack_mode(self, monkeypatch):
+        monkeypatch.setattr(tmux_client, "TMUX_DELIVERY_MODE", "ack")
+        monkeypatch.setattr(tmux_client, "TMUX_ACK_TIMEOUT", 0.01)
+        tmux_client._delivery_stats.clear()
+        yield
+        tmux_client._delivery_stats.clear()
+
+    @staticmethod
+    def fake_pane(echoes, screen=""):
+        """
+        Streamer and send_keys stand-ins: typed text is echoed into a real
+        PaneStream on the attempts listed in echoes (raw bytes, True, False,
+        or "close" to close the stream instead)
+        """
+        from core.pane_stream import PaneStream
+
+        stream = PaneStream("s")
+        stream.append(screen.encode())
+        streamer = MagicMock()
+        streamer.watch.return_value = stream
+        keys = []
+
+        def send_keys(session, text):
+            keys.append(text)
+            if text not in ("Enter", "C-u"):
+                echo = echoes.pop(0)
+                if echo == "close":
+                    stream.close()
+                elif echo:
+                    stream.append(echo if isinstance(echo, bytes) else f"$ {text}".encode())
+            return True
+
+        return (patch('core.pane_stream.get_pane_streamer', return_value=streamer),
+                patch.object(TMUXClient, 'send_keys', side_effect=send_keys), keys)
+
+    def test_enter_sent_after_echo(self):
+        streamer, send_keys, keys = self.fake_pane([True])
+        with streamer, send_keys, patch('time.sleep') as mock_sleep:
+            assert TMUXClient.send_command("s", "echo hi") is True
+
+        mock_sleep.assert_not_called()
+        assert keys == ["echo hi", "Enter"]
+        assert TMUXClient.delivery_stats()["s"]["success_rate"] == 1.0
+
+    def test_retries_with_backoff(self):
+        streamer, send_keys, keys = self.fake_pane([False, True])
+        with streamer, send_keys, patch.object(tmux_client, '_echo_seen',
+                                               wraps=tmux_client._echo_seen) as mock_seen:
+            assert TMUXClient.send_command("s", "echo hi") is True
+
+        assert keys == ["echo hi", "C-u", "echo hi", "Enter"]
+        assert [c.args[3] for c in mock_seen.call_args_list] == [0.01, 0.02]
+        assert TMUXClient.delivery_stats()["s"]["retries"] == 1
+
+    def test_wrapped_echo_confirms(self):
+        # Line wrapping and redraw escapes split the echoed text
+        streamer, send_keys, keys = self.fake_pane([b"$ echo h\x1b[K\r\ni \x08"])
+        with streamer, send_keys:
+            assert TMUXClient.send_command("s", "echo hi") is True
+        assert keys[-1] == "Enter"
+
+    def test_earlier_echo_does_not_confirm(self):
+        # The screen already shows the same command from a previous send
+        streamer, send_keys, keys = self.fake_pane([False, False, False], screen="$ echo hi\r\nhi\r\n")
+        with streamer, send_keys, patch.object(TMUXClient, 'capture_pane', return_value="$ echo hi\nhi\n"):
+            assert TMUXClient.send_command("s", "echo hi") is False
+
+        assert "Enter" not in keys
+        stats = TMUXClient.delivery_stats()["s"]
+        assert (stats["sent"], stats["failed"], stats["retries"]) == (1, 1, 2)
+
+    def test_closed_stream_falls_back_in_one_delivery(self):
+        streamer, send_keys, keys = self.fake_pane(["close"])
+        with streamer, send_keys, patch.object(TMUXClient, '_send_with_delay',
+                                               return_value=True) as mock_send:
+            assert TMUXClient.send_command("s", "echo hi") is True
+
+        mock_send.assert_called_once_with("s", "echo hi", tmux_client.TMUX_COMMAND_DELAY)
+        assert keys == ["echo hi", "C-u"]
+        stats = TMUXClient.delivery_stats()["s"]
+        assert (stats["sent"], stats["delivered"], stats["retries"]) == (1, 1, 1)
+
+    def test_explicit_delay_keeps_fixed_delay(self):
+        with patch('subprocess.run') as mock_run, patch('time.sleep') as mock_sleep, \
+                patch('core.pane_stream.get_pane_streamer') as mock_streamer:
+            mock_run.return_value.returncode = 0
+            assert TMUXClient.send_command("s", "echo hi", delay=0.5) is True
+
+        mock_sleep.assert_called_once_with(0.5)
+        mock_streamer.assert_not_called()
+        assert TMUXClient.delivery_stats()["s"]["delivered"] == 1
 
 
 class TestTMUXClientIntegration:
@@ -241,6 +505,31 @@ class TestTMUXClientIntegration:
             # Clean up
             TMUXClient.kill_session(test_session)
 
+    @pytest.mark.skipif(
+        not Path("/opt/homebrew/bin/tmux").exists() and not Path("/usr/bin/tmux").exists(),
+        reason="TMUX not installed"
+    )
+    def test_real_acknowledged_delivery(self, monkeypatch):
+        """Test ack mode delivers every command to a real shell"""
+        from core.pane_stream import get_pane_streamer
+
+        test_session = "pytest-tmux-ack"
+        monkeypatch.setattr(tmux_client, "TMUX_DELIVERY_MODE", "ack")
+        TMUXClient.kill_session(test_session)
+
+        try:
+            assert TMUXClient.create_session(test_session, "bash --norc --noprofile")
+            for n in range(5):
+                assert TMUXClient.send_command(test_session, f"echo ack-$(( {n} * 10 ))")
+
+            stream = get_pane_streamer().get_stream(test_session)
+            assert stream.wait_for("ack-40", 0, timeout=3) is not None
+            stats = TMUXClient.delivery_stats()[test_session]
+            assert stats["delivered"] == 5 and stats["failed"] == 0
+        finally:
+            get_pane_streamer().unwatch(test_session)
+            TMUXClient.kill_session(test_session)
+
 
 if __name__ == "__main__":
     # Run basic tests
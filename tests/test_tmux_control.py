@@ -0,0 +1,137 @@
+"""
+Tests for the persistent tmux control-mode connection
+"""
+
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import tmux_client
+from core.tmux_client import TMUXClient
+from core.tmux_control import CONTROL_SESSION, TmuxControlClient, TmuxControlError, quote
+
+pytestmark = pytest.mark.skipif(not shutil.which("tmux"), reason="TMUX not installed")
+
+SOCKET = "pytest-tmux-control"
+_run = subprocess.run
+
+
+def tmux(*args):
+    return _run(["tmux", "-L", SOCKET, *args], capture_output=True, text=True)
+
+
+@pytest.fixture
+def control():
+    """Control client on a private tmux server with one bash session"""
+    tmux("new-session", "-d", "-s", "work", "bash --norc --noprofile")
+    client = TmuxControlClient(socket_name=SOCKET)
+    client.start()
+    yield client
+    client.close()
+    tmux("kill-server")
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class TestQuote:
+    """Test argument quoting for the tmux parser"""
+
+    def test_single_quotes_escaped(self):
+        assert quote("it's") == "'it'\\''s'"
+
+    def test_newline_rejected(self):
+        with pytest.raises(ValueError):
+            quote("a\nb")
+
+
+class TestTmuxControlClient:
+    """Test command multiplexing over one tmux -C pipe"""
+
+    def test_command_output(self, control):
+        assert control.command("display-message", "-p", "it's #{session_name}") == [
+            f"it's {CONTROL_SESSION}"]
+
+    def test_error_reply(self, control):
+        ok, lines = control.try_command("has-session", "-t", "missing")
+        assert ok is False
+        assert "missing" in lines[0]
+        with pytest.raises(TmuxControlError):
+            control.command("has-session", "-t", "missing")
+
+    def test_replies_match_commands_in_order(self, control):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda n: control.command("display-message", "-p", str(n)),
+                                    range(50)))
+        assert results == [[str(n)] for n in range(50)]
+
+    def test_notifications_reach_listeners(self, control):
+        seen = []
+        control.add_listener(lambda name, rest: seen.append(name))
+        tmux("new-session", "-d", "-s", "extra")
+
+        assert wait_for(lambda: "sessions-changed" in seen)
+
+    def test_closed_connection_raises(self, control):
+        control.close()
+        assert not control.alive
+        with pytest.raises(TmuxControlError):
+            control.command("list-sessions")
+
+
+class TestTMUXClientControlMode:
+    """Test TMUXClient routed through the control connection"""
+
+    @pytest.fixture
+    def client(self, control, monkeypatch):
+        monkeypatch.setattr(tmux_client, "TMUX_CONTROL_MODE", True)
+        monkeypatch.setattr(tmux_client, "get_control_client", lambda: control)
+        monkeypatch.setattr(subprocess, "run",
+                            lambda *a, **kw: pytest.fail("subprocess used in control mode"))
+        return TMUXClient
+
+    def test_send_and_capture(self, client):
+        assert client.session_exists("work")
+        assert not client.session_exists("missing")
+
+        start = time.time()
+        assert client.send_command("work", "echo 'control mode'")
+        assert time.time() - start >= 0.1  # Mandatory delay kept
+
+        assert wait_for(lambda: "control mode\n" in client.capture_pane("work"))
+        assert client.capture_pane("work", lines=5).endswith("\n")
+
+    def test_list_sessions_hides_control_session(self, client):
+        assert client.list_sessions() == ["work"]
+        assert CONTROL_SESSION in tmux("list-sessions", "-F", "#{session_name}").stdout
+
+    def test_capture_all_in_one_exchange(self, client, control, monkeypatch):
+        exchanges = []
+        try_commands = control.try_commands
+        monkeypatch.setattr(control, "try_commands",
+                            lambda commands, **kw: exchanges.append(commands) or try_commands(commands, **kw))
+
+        snapshot = client.capture_all(["work", "missing"], lines=5)
+        assert snapshot["work"] is not None and snapshot["missing"] is None
+        assert client.capture_all(["work", "missing"], lines=0) == {"work": "", "missing": None}
+        assert len(exchanges) == 2
+
+    def test_send_to_missing_session_fails(self, client):
+        assert client.send_command("missing", "echo hi") is False
+        assert client.send_keys("missing", "C-c") is False
+        assert client.capture_pane("missing") is None